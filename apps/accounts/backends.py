@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+UserModel = get_user_model()
+
+
+class ProfileModelBackend(ModelBackend):
+    """
+    ModelBackend that loads the user's Profile in the same query.
+
+    Nearly every page reads ``request.user.profile.role`` (views, the
+    role_required decorator, the navbar in base.html). Joining the profile
+    when the session user is resolved removes that extra query from every
+    authenticated request.
+    """
+
+    def _user_queryset(self):
+        return UserModel._default_manager.select_related('profile')
+
+    def get_user(self, user_id):
+        try:
+            user = self._user_queryset().get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        try:
+            user = await self._user_queryset().aget(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,134 @@
+import csv
+import json
+from itertools import islice
+from pathlib import Path
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.accounts.models import Profile
+from apps.projects.sharding import replicate_users
+
+USER_FIELDS = ('username', 'email', 'first_name', 'last_name')
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk-create users and their profiles from a CSV or JSONL file. '
+        'Columns/keys: username (required), email, first_name, last_name, '
+        'role (ADMIN or RESEARCHER, default RESEARCHER), password. '
+        'Existing usernames are skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (with header row) or JSONL file to import.')
+        parser.add_argument(
+            '--format', choices=['csv', 'jsonl'],
+            help='Input format (default: inferred from the file extension).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Rows inserted per bulk_create (default: 1000).',
+        )
+        parser.add_argument(
+            '--default-password',
+            help=(
+                'Password for rows without one. It is hashed once and shared by '
+                'those rows, so users should change it after first sign-in. '
+                'Without it such rows get an unusable password.'
+            ),
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Validate the file without writing anything.')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'{path} does not exist.')
+        fmt = options['format'] or ('jsonl' if path.suffix.lower() in ('.jsonl', '.ndjson') else 'csv')
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive.')
+
+        # Hashing is deliberately slow (PBKDF2); do it once for the shared default.
+        default_hash = make_password(options['default_password']) if options['default_password'] else None
+
+        created = skipped = 0
+        seen = set()
+        with path.open(newline='', encoding='utf-8') as handle:
+            rows = self._read_rows(handle, fmt)
+            while batch := list(islice(rows, batch_size)):
+                batch_created, batch_skipped = self._import_batch(
+                    batch, seen, default_hash, batch_size, options['dry_run'],
+                )
+                created += batch_created
+                skipped += batch_skipped
+
+        verb = 'Would create' if options['dry_run'] else 'Created'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {created} user(s); skipped {skipped}.'))
+
+    def _read_rows(self, handle, fmt):
+        if fmt == 'csv':
+            for line_no, row in enumerate(csv.DictReader(handle), start=2):
+                yield line_no, row
+            return
+        for line_no, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except ValueError as exc:
+                raise CommandError(f'Line {line_no}: invalid JSON ({exc}).')
+
+    def _import_batch(self, batch, seen, default_hash, batch_size, dry_run):
+        wanted = {}
+        skipped = 0
+        for line_no, row in batch:
+            username = (row.get('username') or '').strip()
+            if not username:
+                raise CommandError(f'Line {line_no}: username is required.')
+            role = (row.get('role') or Profile.Role.RESEARCHER).strip().upper()
+            if role not in Profile.Role.values:
+                raise CommandError(f'Line {line_no}: unknown role "{role}".')
+            if username in seen:
+                skipped += 1
+                continue
+            seen.add(username)
+            wanted[username] = (row, role)
+
+        existing = set(User.objects.filter(username__in=wanted).values_list('username', flat=True))
+        skipped += len(existing)
+
+        users, roles = [], {}
+        for username, (row, role) in wanted.items():
+            if username in existing:
+                continue
+            user = User(**{field: (row.get(field) or '').strip() for field in USER_FIELDS})
+            if row.get('password'):
+                user.password = make_password(row['password'])
+            elif default_hash:
+                user.password = default_hash
+            else:
+                user.set_unusable_password()
+            users.append(user)
+            roles[username] = role
+
+        if dry_run or not users:
+            return len(users), skipped
+
+        # bulk_create skips post_save, so profiles (and the users' copies on
+        # project shards) are created here in bulk instead of one signal
+        # round-trip per user.
+        with transaction.atomic():
+            User.objects.bulk_create(users, batch_size=batch_size)
+            if any(user.pk is None for user in users):
+                ids = dict(User.objects.filter(username__in=roles).values_list('username', 'pk'))
+                for user in users:
+                    user.pk = ids[user.username]
+            Profile.objects.bulk_create(
+                [Profile(user_id=user.pk, role=roles[user.username]) for user in users],
+                batch_size=batch_size,
+            )
+            replicate_users(users)
+        return len(users), skipped
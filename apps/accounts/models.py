@@ -13,3 +13,27 @@ class Profile(models.Model):
     def __str__(self):
         return f'{self.user.username} — {self.get_role_display()}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = {
+            f.attname: self.__dict__[f.attname]
+            for f in self._meta.concrete_fields
+            if f.attname in self.__dict__
+        }
+
+    def changed_fields(self):
+        """Return the attnames modified since this profile was loaded or last saved."""
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return [f.attname for f in self._meta.concrete_fields if not f.primary_key]
+        return [
+            name for name, value in loaded.items()
+            if name != self._meta.pk.attname and getattr(self, name) != value
+        ]
+
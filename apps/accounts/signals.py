@@ -7,9 +7,19 @@ from apps.accounts.models import Profile
 
 @receiver(post_save, sender=User)
 def create_or_update_profile(sender, instance, created, **kwargs):
-    """Auto-create a Profile when a new User is created."""
+    """
+    Auto-create a Profile when a new User is created.
+
+    On later saves (e.g. the ``last_login`` update on every sign-in) the
+    profile is written only if it was loaded on this user and edited.
+    """
     if created:
         Profile.objects.create(user=instance)
-    else:
-        instance.profile.save()
+        return
 
+    if not User.profile.related.is_cached(instance):
+        return
+    profile = instance.profile
+    changed = profile.changed_fields()
+    if changed:
+        profile.save(update_fields=changed)
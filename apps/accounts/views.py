@@ -3,9 +3,13 @@ from django.contrib.auth import login, logout, update_session_auth_hash
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import AuthenticationForm, PasswordChangeForm, SetPasswordForm
 from django.shortcuts import redirect, render
+from django.utils import timezone
 
 from apps.accounts.forms import RegistrationForm
 from apps.accounts.models import Profile
+from apps.projects.models import ResearchProject
+from apps.projects.sharding import project_databases
+from apps.stats import rollups
 
 
 # ──────────────────────────────────────────────
@@ -149,7 +153,32 @@ def admin_dashboard(request):
     if request.user.profile.role != Profile.Role.ADMIN:
         messages.warning(request, 'You do not have access to the admin dashboard.')
         return redirect('accounts:dashboard')
-    return render(request, 'accounts/admin_dashboard.html')
+
+    # Every figure comes from precomputed rollups (see apps/stats), so the
+    # page costs the same few indexed reads however large the platform grows.
+    today = rollups.day_bucket(timezone.localdate())
+    values = rollups.read(rollups.GLOBAL, today)
+    activity = rollups.daily_series([rollups.MESSAGES, rollups.DOCUMENTS, rollups.ACTIVE_USERS])
+    peak = max((day[rollups.MESSAGES] + day[rollups.DOCUMENTS] for _, day in activity), default=0) or 1
+
+    busiest = rollups.top_projects(rollups.MESSAGES)
+    # The projects may sit on any shard (see apps/projects/sharding.py).
+    titles = {}
+    for database in project_databases():
+        titles.update(
+            ResearchProject.objects.using(database)
+            .filter(pk__in=[pk for pk, _ in busiest]).values_list('pk', 'title')
+        )
+
+    return render(request, 'accounts/admin_dashboard.html', {
+        'stats': values[rollups.GLOBAL],
+        'today': values[today],
+        'activity': [
+            (day, counts, round(100 * (counts[rollups.MESSAGES] + counts[rollups.DOCUMENTS]) / peak))
+            for day, counts in activity
+        ],
+        'busiest_projects': [(pk, titles[pk], count) for pk, count in busiest if pk in titles],
+    })
 
 
 @login_required
@@ -158,5 +187,8 @@ def researcher_dashboard(request):
     if request.user.profile.role != Profile.Role.RESEARCHER:
         messages.warning(request, 'You do not have access to the researcher dashboard.')
         return redirect('accounts:dashboard')
-    return render(request, 'accounts/researcher_dashboard.html')
+    values = rollups.read(rollups.user_bucket(request.user.pk))
+    return render(request, 'accounts/researcher_dashboard.html', {
+        'stats': values[rollups.user_bucket(request.user.pk)],
+    })
 
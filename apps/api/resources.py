@@ -0,0 +1,123 @@
+from dataclasses import dataclass
+
+from django.contrib.auth.models import User
+from django.db.models import Prefetch, aprefetch_related_objects
+from django.urls import reverse
+
+
+# ──────────────────────────────────────────────
+# Resources
+#
+# Each resource lists the fields the API can return and, for each field,
+# what the query has to load for it: columns for ``only()``, relations to
+# join and relations to prefetch. A request for ``?fields=id,title`` then
+# selects just those columns and skips the joins and prefetches of every
+# other field, so a page always costs the same, fixed number of queries.
+# ──────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class ApiField:
+    """How to read one output field from an instance, and what its query must load."""
+    value: object
+    columns: tuple = ()
+    select: tuple = ()
+    prefetch: tuple = ()
+
+
+def _column(name):
+    return ApiField(lambda obj: getattr(obj, name), columns=(name,))
+
+
+def _foreign_key(relation):
+    return ApiField(lambda obj: getattr(obj, f'{relation}_id'), columns=(relation,))
+
+
+def _username(relation):
+    return ApiField(
+        lambda obj: getattr(obj, relation).username,
+        columns=(f'{relation}__username',),
+        select=(relation,),
+    )
+
+
+class Resource:
+    """The output fields of one model and the queries that load them."""
+
+    def __init__(self, time_field, fields):
+        self.time_field = time_field
+        self.fields = fields
+
+    def parse_fields(self, param):
+        """The field names asked for by ``?fields=`` (all when empty); ValueError on unknown names."""
+        if not param:
+            return list(self.fields)
+        names = list(dict.fromkeys(name.strip() for name in param.split(',') if name.strip()))
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ValueError(
+                f'Unknown field(s): {", ".join(unknown)}. Available: {", ".join(self.fields)}.'
+            )
+        return names
+
+    def queryset(self, queryset, names):
+        """``queryset`` loading only what ``names`` need, plus the pagination key."""
+        fields = [self.fields[name] for name in names]
+        columns = {'pk', self.time_field}.union(*(field.columns for field in fields))
+        joins = set().union(*(field.select for field in fields))
+        queryset = queryset.only(*columns)
+        if joins:
+            queryset = queryset.select_related(*joins)
+        return queryset
+
+    async def prefetch(self, objects, names):
+        """Run the prefetches ``names`` need: one query per relation and database."""
+        lookups = [lookup for name in names for lookup in self.fields[name].prefetch]
+        if not lookups or not objects:
+            return
+        # A prefetch follows the first instance's database; batch by shard.
+        by_database = {}
+        for obj in objects:
+            by_database.setdefault(obj._state.db, []).append(obj)
+        for batch in by_database.values():
+            await aprefetch_related_objects(batch, *lookups)
+
+    def serialize(self, obj, names):
+        return {name: self.fields[name].value(obj) for name in names}
+
+
+PROJECTS = Resource('created_at', {
+    'id': _column('id'),
+    'title': _column('title'),
+    'description': _column('description'),
+    'status': _column('status'),
+    'created_by': _username('created_by'),
+    'researchers': ApiField(
+        lambda project: [user.username for user in project.researchers.all()],
+        prefetch=(Prefetch('researchers', queryset=User.objects.only('id', 'username').order_by('username')),),
+    ),
+    'created_at': _column('created_at'),
+})
+
+DOCUMENTS = Resource('uploaded_at', {
+    'id': _column('id'),
+    'project_id': _foreign_key('project'),
+    'title': _column('title'),
+    'filename': ApiField(lambda document: document.filename, columns=('original_name', 'file')),
+    'size': _column('size'),
+    'sha256': _column('sha256'),
+    'text_status': _column('text_status'),
+    'uploaded_by': _username('uploaded_by'),
+    'uploaded_at': _column('uploaded_at'),
+    'download_url': ApiField(
+        lambda document: reverse('documents:document_download', args=[document.project_id, document.pk]),
+        columns=('project',),
+    ),
+})
+
+MESSAGES = Resource('created_at', {
+    'id': _column('id'),
+    'project_id': _foreign_key('project'),
+    'sender': _username('sender'),
+    'message': _column('message'),
+    'created_at': _column('created_at'),
+})
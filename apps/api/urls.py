@@ -0,0 +1,12 @@
+from django.urls import path
+
+from apps.api import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('projects/', views.project_list, name='project_list'),
+    path('projects/<int:project_id>/', views.project_detail, name='project_detail'),
+    path('projects/<int:project_id>/documents/', views.document_list, name='document_list'),
+    path('projects/<int:project_id>/messages/', views.message_list, name='message_list'),
+]
@@ -0,0 +1,160 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_safe
+
+from apps.api.resources import DOCUMENTS, MESSAGES, PROJECTS
+from apps.communication.models import ProjectMessage
+from apps.documents.models import Document
+from apps.projects.access import ais_admin, arequest_user, auser_can_access_project
+from apps.projects.models import ResearchProject
+from apps.projects.pagination import DEFAULT_PAGE_SIZE, akeyset_paginate
+from apps.projects.sharding import project_databases
+from researchcollab.instrumentation import query_budget
+
+MAX_PAGE_SIZE = 100
+
+
+# ──────────────────────────────────────────────
+# Helpers
+#
+# List responses are ``{"next": url, "previous": url, "results": [...]}``.
+# ``next`` walks to older rows and ``previous`` back to newer ones, with the
+# same keyset cursors as the HTML pages; ``?limit=`` sets the page size and
+# ``?fields=`` the fields of each result. Results are encoded one at a time
+# as the response streams out, never as one document in memory.
+# ──────────────────────────────────────────────
+
+def _json_error(message, status):
+    return JsonResponse({'error': message}, status=status)
+
+
+async def _authorize(request, project_id=None):
+    """Return ``(user, None)`` for a request allowed to proceed, else ``(None, error response)``."""
+    user = await arequest_user(request)
+    if not user.is_authenticated:
+        return None, _json_error('Authentication required.', 401)
+    if project_id is None:
+        return user, None
+    try:
+        await ResearchProject.objects.only('pk').aget(pk=project_id)
+    except ResearchProject.DoesNotExist:
+        return None, _json_error('Project not found.', 404)
+    if not await auser_can_access_project(user, project_id):
+        return None, _json_error('You do not have permission to access this project.', 403)
+    return user, None
+
+
+def _page_size(request):
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError('limit must be an integer.')
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f'limit must be between 1 and {MAX_PAGE_SIZE}.')
+    return limit
+
+
+def _page_url(request, **cursor):
+    params = request.GET.copy()
+    params.pop('after', None)
+    params.pop('before', None)
+    params.update(cursor)
+    return request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+
+
+async def _stream_results(resource, page, names, head):
+    yield head
+    for index, obj in enumerate(page):
+        yield (',' if index else '') + json.dumps(resource.serialize(obj, names), cls=DjangoJSONEncoder)
+    yield ']}'
+
+
+async def _list_response(request, resource, queryset, databases=None):
+    """Stream one keyset page of ``queryset`` as a JSON list response."""
+    try:
+        names = resource.parse_fields(request.GET.get('fields'))
+        per_page = _page_size(request)
+    except ValueError as exc:
+        return _json_error(str(exc), 400)
+
+    page = await akeyset_paginate(
+        resource.queryset(queryset, names),
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+        per_page=per_page,
+        time_field=resource.time_field,
+        databases=databases,
+    )
+    await resource.prefetch(page.items, names)
+
+    head = '{"next":%s,"previous":%s,"results":[' % (
+        json.dumps(_page_url(request, after=page.next_cursor) if page.has_next else None),
+        json.dumps(_page_url(request, before=page.prev_cursor) if page.has_previous else None),
+    )
+    return StreamingHttpResponse(_stream_results(resource, page, names, head), content_type='application/json')
+
+
+# ──────────────────────────────────────────────
+# Projects
+# ──────────────────────────────────────────────
+
+@require_safe
+@query_budget(5, per_shard=2)
+async def project_list(request):
+    """
+    Projects, newest first.
+    ADMIN → every project. RESEARCHER → the projects they are assigned to.
+    """
+    user, error = await _authorize(request)
+    if error:
+        return error
+    projects = ResearchProject.objects.all() if await ais_admin(user) else user.assigned_projects.all()
+    return await _list_response(request, PROJECTS, projects, databases=project_databases())
+
+
+@require_safe
+@query_budget(6)
+async def project_detail(request, project_id):
+    """One project, to ADMINs and its researchers."""
+    user, error = await _authorize(request)
+    if error:
+        return error
+    try:
+        names = PROJECTS.parse_fields(request.GET.get('fields'))
+    except ValueError as exc:
+        return _json_error(str(exc), 400)
+
+    try:
+        project = await PROJECTS.queryset(ResearchProject.objects.all(), names).aget(pk=project_id)
+    except ResearchProject.DoesNotExist:
+        return _json_error('Project not found.', 404)
+    if not await auser_can_access_project(user, project):
+        return _json_error('You do not have permission to access this project.', 403)
+    await PROJECTS.prefetch([project], names)
+    return JsonResponse(PROJECTS.serialize(project, names))
+
+
+# ──────────────────────────────────────────────
+# Documents and messages
+# ──────────────────────────────────────────────
+
+@require_safe
+@query_budget(6)
+async def document_list(request, project_id):
+    """A project's documents, newest first, to ADMINs and its researchers."""
+    _, error = await _authorize(request, project_id)
+    if error:
+        return error
+    return await _list_response(request, DOCUMENTS, Document.objects.filter(project_id=project_id))
+
+
+@require_safe
+@query_budget(6)
+async def message_list(request, project_id):
+    """A project's messages, newest first, to ADMINs and its researchers."""
+    _, error = await _authorize(request, project_id)
+    if error:
+        return error
+    return await _list_response(request, MESSAGES, ProjectMessage.objects.filter(project_id=project_id))
@@ -6,3 +6,5 @@ class CommunicationConfig(AppConfig):
     name = 'apps.communication'
     verbose_name = 'Communication'
 
+    def ready(self):
+        import apps.communication.signals  # noqa: F401
@@ -0,0 +1,23 @@
+import asyncio
+
+from django.core.management.base import BaseCommand
+
+from apps.communication.realtime import serve_broker
+
+
+class Command(BaseCommand):
+    help = (
+        'Run the local real-time relay used by '
+        'apps.communication.realtime.SocketBroker to fan events out across worker processes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on (default: 127.0.0.1).')
+        parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765).')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Real-time broker listening on {options["host"]}:{options["port"]}')
+        try:
+            asyncio.run(serve_broker(options['host'], options['port']))
+        except KeyboardInterrupt:
+            pass
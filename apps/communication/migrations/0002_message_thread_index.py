@@ -0,0 +1,20 @@
+# Generated by Django 5.2.11 on 2026-10-18 13:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communication', '0001_initial'),
+        ('projects', '0002_project_keyset_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='projectmessage',
+            index=models.Index(fields=['project', 'created_at', 'id'], name='message_thread_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-18 14:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communication', '0002_message_thread_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectmessage',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.contrib.auth.models import User
 from django.db import models
 
 from apps.projects.models import ResearchProject
+from apps.projects.sharding import ShardedQuerySet
 
 
 class ProjectMessage(models.Model):
@@ -17,9 +18,18 @@ class ProjectMessage(models.Model):
     )
     message = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped by apps/communication/signals.py on edits; keys the cached bubble.
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    # Retries lookups that miss after the project moved shard (apps/projects/sharding.py).
+    objects = ShardedQuerySet.as_manager()
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Thread pagination walks (project, created_at, id) — see apps/projects/pagination.py
+            models.Index(fields=['project', 'created_at', 'id'], name='message_thread_idx'),
+        ]
         verbose_name = 'Project Message'
         verbose_name_plural = 'Project Messages'
 
@@ -0,0 +1,261 @@
+import asyncio
+import json
+import logging
+import socket
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+# ──────────────────────────────────────────────
+# Real-time pub/sub
+#
+# Views and signals publish small JSON events to a per-project channel;
+# the Server-Sent Events endpoint subscribes to that channel and streams the
+# events to connected browsers. ``publish`` is synchronous and thread-safe so
+# it can be called from regular (sync) views; subscriptions are asyncio-native
+# and live on the ASGI event loop.
+#
+# The backend is selected with settings.REALTIME_BROKER:
+#   InProcessBroker → fan-out inside one process (single worker / dev).
+#   SocketBroker    → fan-out across worker processes via ``manage.py runbroker``.
+# ──────────────────────────────────────────────
+
+SUBSCRIPTION_QUEUE_SIZE = 100
+BROKER_MAX_BUFFER = 1024 * 1024
+
+
+def project_channel(project_id):
+    """Name of the channel carrying events for one project."""
+    return f'project:{project_id}'
+
+
+class Subscription:
+    """
+    An async iterator of events published to one channel.
+
+    Events are handed over from any thread with ``call_soon_threadsafe``. If a
+    slow client lets the queue fill up, the oldest event is dropped — clients
+    resynchronise from the ``since`` endpoint, so a gap is never fatal.
+    """
+
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=SUBSCRIPTION_QUEUE_SIZE)
+        self._closed = False
+
+    def deliver(self, event):
+        """Queue ``event`` for this subscriber. Safe to call from any thread."""
+        if self._closed:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The subscriber's loop has shut down.
+            self.close()
+
+    def _put(self, event):
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(event)
+
+    async def get(self):
+        return await self._queue.get()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self.broker.unsubscribe(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.get()
+
+
+class BaseBroker:
+    """Interface every real-time backend implements."""
+
+    def publish(self, channel, event):
+        raise NotImplementedError
+
+    def subscribe(self, channel):
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+
+class InProcessBroker(BaseBroker):
+    """Deliver events to subscribers living in the current process only."""
+
+    def __init__(self, **options):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, event):
+        self.dispatch(channel, event)
+
+    def dispatch(self, channel, event):
+        """Hand ``event`` to every local subscriber of ``channel``."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+
+class SocketBroker(InProcessBroker):
+    """
+    Relay events between worker processes through a local broker process.
+
+    A stand-in for Redis pub/sub on a single host: every worker publishes
+    newline-delimited JSON to ``manage.py runbroker`` and keeps one listener
+    connection open, through which the broker echoes every event back to all
+    workers for local fan-out. If the broker is unreachable, events are still
+    delivered to subscribers in the publishing process.
+    """
+
+    def __init__(self, location='127.0.0.1:8765', **options):
+        super().__init__(**options)
+        host, _, port = location.rpartition(':')
+        self.address = (host or '127.0.0.1', int(port))
+        self._local = threading.local()
+        self._listener = None
+
+    def publish(self, channel, event):
+        line = json.dumps({'op': 'publish', 'channel': channel, 'event': event}).encode() + b'\n'
+        for _attempt in range(2):
+            try:
+                self._publisher_socket().sendall(line)
+                return
+            except OSError:
+                self._reset_publisher_socket()
+        logger.warning('Real-time broker at %s:%s is unreachable; delivering locally only.', *self.address)
+        self.dispatch(channel, event)
+
+    def _publisher_socket(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is None:
+            sock = socket.create_connection(self.address, timeout=2)
+            self._local.sock = sock
+        return sock
+
+    def _reset_publisher_socket(self):
+        sock = getattr(self._local, 'sock', None)
+        self._local.sock = None
+        if sock is not None:
+            sock.close()
+
+    def subscribe(self, channel):
+        subscription = super().subscribe(channel)
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        return subscription
+
+    async def _listen(self):
+        """Receive events relayed by the broker and fan them out locally."""
+        backoff = 0.5
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(*self.address)
+            except OSError:
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 10)
+                continue
+            backoff = 0.5
+            try:
+                writer.write(b'{"op": "subscribe"}\n')
+                await writer.drain()
+                while line := await reader.readline():
+                    try:
+                        message = json.loads(line)
+                        self.dispatch(message['channel'], message['event'])
+                    except (ValueError, KeyError):
+                        logger.warning('Dropping malformed broker message: %r', line[:200])
+            except OSError:
+                logger.warning('Lost connection to real-time broker; reconnecting.')
+            finally:
+                writer.close()
+
+
+async def serve_broker(host='127.0.0.1', port=8765):
+    """Run the relay used by ``SocketBroker`` until cancelled."""
+    listeners = set()
+
+    async def handle(reader, writer):
+        try:
+            while line := await reader.readline():
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                if message.get('op') == 'subscribe':
+                    listeners.add(writer)
+                elif message.get('op') == 'publish':
+                    relay = json.dumps({'channel': message.get('channel'), 'event': message.get('event')}).encode() + b'\n'
+                    for listener in list(listeners):
+                        # A listener that stopped reading is cut loose; it reconnects on its own.
+                        if listener.transport.get_write_buffer_size() > BROKER_MAX_BUFFER:
+                            listeners.discard(listener)
+                            listener.close()
+                            continue
+                        listener.write(relay)
+        except OSError:
+            pass
+        finally:
+            listeners.discard(writer)
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+# ──────────────────────────────────────────────
+# Broker lookup
+# ──────────────────────────────────────────────
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Return the process-wide broker configured in settings.REALTIME_BROKER."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                config = settings.REALTIME_BROKER
+                backend = import_string(config['BACKEND'])
+                options = {k.lower(): v for k, v in config.items() if k != 'BACKEND'}
+                _broker = backend(**options)
+    return _broker
+
+
+def publish_project_event(project_id, event):
+    """Publish ``event`` to everyone watching ``project_id``. Never raises."""
+    try:
+        get_broker().publish(project_channel(project_id), event)
+    except Exception:
+        logger.exception('Failed to publish real-time event for project %s', project_id)
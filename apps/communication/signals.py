@@ -0,0 +1,39 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from apps.communication.models import ProjectMessage
+from apps.communication.realtime import publish_project_event
+
+
+@receiver(post_save, sender=ProjectMessage)
+def broadcast_new_message(sender, instance, created, raw=False, using=None, **kwargs):
+    """Push newly posted messages to everyone watching the project."""
+    if not created or raw:
+        return
+    event = {
+        'type': 'message',
+        'project': instance.project_id,
+        'id': instance.pk,
+        'sender': instance.sender.username,
+        'created_at': instance.created_at.isoformat(),
+    }
+    transaction.on_commit(lambda: publish_project_event(instance.project_id, event), using=using)
+
+
+@receiver(pre_save, sender=ProjectMessage)
+def keep_stored_version(sender, instance, raw=False, **kwargs):
+    # A stale in-memory version must not overwrite bumps made since loading.
+    if not raw and not instance._state.adding:
+        instance.version = F('version')
+
+
+@receiver(post_save, sender=ProjectMessage)
+def message_edited(sender, instance, created, raw=False, using=None, **kwargs):
+    """Give an edited message a new version so its cached bubble is re-rendered."""
+    if created or raw:
+        return
+    ProjectMessage.objects.using(using).filter(pk=instance.pk).update(version=F('version') + 1)
+    # Reloaded from the database on next access.
+    instance.__dict__.pop('version', None)
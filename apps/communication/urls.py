@@ -10,5 +10,15 @@ urlpatterns = [
         views.project_messages,
         name='project_messages',
     ),
+    path(
+        'project/<int:project_id>/messages/since/',
+        views.project_messages_since,
+        name='project_messages_since',
+    ),
+    path(
+        'project/<int:project_id>/events/',
+        views.project_events,
+        name='project_events',
+    ),
 ]
 
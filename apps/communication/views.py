@@ -1,22 +1,71 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseForbidden
-from django.shortcuts import get_object_or_404, redirect, render
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import aprefetch_related_objects, prefetch_related_objects
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseForbidden,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import aget_object_or_404, get_object_or_404, redirect, render
+from django.views.decorators.http import require_GET
 
-from apps.accounts.models import Profile
 from apps.communication.forms import ProjectMessageForm
+from apps.communication.realtime import get_broker, project_channel
+from apps.projects.access import ais_admin, arequest_user, auser_can_access_project, user_can_access_project
+from apps.projects.conditional import not_modified, project_validators, with_validators
+from apps.projects.fragments import arender_fragments, render_fragments
 from apps.projects.models import ResearchProject
+from apps.projects.pagination import akeyset_paginate
+from apps.projects.sharding import project_atomic
+from researchcollab.instrumentation import query_budget
+
+MESSAGES_PER_PAGE = 50
+SINCE_LIMIT = 100
+EVENTS_KEEPALIVE_SECONDS = 15
 
 
 # ──────────────────────────────────────────────
 # Helpers
 # ──────────────────────────────────────────────
 
-def _user_can_access_project(user, project):
-    """Return True if the user is ADMIN or an assigned researcher."""
-    if user.profile.role == Profile.Role.ADMIN:
-        return True
-    return user in project.researchers.all()
+def _bubble_key(user):
+    return lambda msg: (msg.pk, msg.version, msg.sender_id == user.pk)
+
+
+def _render_bubbles(request, thread):
+    """Rendered message bubbles for ``thread``, reusing cached ones (see apps/projects/fragments.py)."""
+    return render_fragments(
+        request, 'communication/_message.html', thread, 'msg',
+        key_parts=_bubble_key(request.user),
+        prepare=lambda missed: prefetch_related_objects(missed, 'sender'),
+    )
+
+
+@sync_to_async
+def _apost_message(msg):
+    # One transaction with its statistics, so reconcile_stats never counts
+    # a message whose counters have yet to be bumped.
+    with project_atomic(msg.project_id):
+        msg.save()
+
+
+async def _arender_bubbles(request, thread):
+    """Async ``_render_bubbles``."""
+    async def prepare(missed):
+        await aprefetch_related_objects(missed, 'sender')
+
+    return await arender_fragments(
+        request, 'communication/_message.html', thread, 'msg',
+        key_parts=_bubble_key(request.user),
+        prepare=prepare,
+    )
 
 
 def _forbidden_response(msg='You do not have permission to access this discussion.'):
@@ -31,39 +80,158 @@ def _forbidden_response(msg='You do not have permission to access this discussio
 # ──────────────────────────────────────────────
 
 @login_required
-def project_messages(request, project_id):
+@query_budget(6)
+async def project_messages(request, project_id):
     """
     Display the message thread for a project and handle new message posts.
 
     Access control:
         ADMIN      → can access any project's discussion.
         RESEARCHER → can access only if assigned to the project.
+
+    Only the newest page of the thread is rendered; ``?after=`` walks back
+    into older history and ``?before=`` forward again. Unchanged pages are
+    answered with a 304 (see apps/projects/conditional.py).
     """
-    project = get_object_or_404(ResearchProject, pk=project_id)
+    user = await arequest_user(request)
+    project = await aget_object_or_404(ResearchProject, pk=project_id)
 
-    if not _user_can_access_project(request.user, project):
+    if not await auser_can_access_project(user, project):
         return _forbidden_response()
 
+    admin = await ais_admin(user)
+    etag, last_modified = project_validators(request, project, admin)
+    if response := not_modified(request, etag, last_modified):
+        return response
+
     # Handle new message submission
     if request.method == 'POST':
         form = ProjectMessageForm(request.POST)
         if form.is_valid():
             msg = form.save(commit=False)
             msg.project = project
-            msg.sender = request.user
-            msg.save()
+            msg.sender = user
+            await _apost_message(msg)
             messages.success(request, 'Message posted.')
             return redirect('communication:project_messages', project_id=project.pk)
     else:
         form = ProjectMessageForm()
 
-    thread = project.messages.select_related('sender').all()
+    page = await akeyset_paginate(
+        project.messages.all(),
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+        per_page=MESSAGES_PER_PAGE,
+    )
+    # Pages are fetched newest-first; the thread reads oldest → newest.
+    thread = page.items[::-1]
+    bubbles = await _arender_bubbles(request, thread)
 
     context = {
         'project': project,
         'thread': thread,
+        'bubbles': bubbles,
+        'page': page,
+        'last_id': thread[-1].pk if thread else 0,
         'form': form,
-        'is_admin': request.user.profile.role == Profile.Role.ADMIN,
+        'is_admin': admin,
     }
-    return render(request, 'communication/project_messages.html', context)
+    response = render(request, 'communication/project_messages.html', context)
+    return with_validators(request, response, etag, last_modified)
+
+
+# ──────────────────────────────────────────────
+# Incremental updates  (GET messages newer than an id)
+# ──────────────────────────────────────────────
+
+@login_required
+@require_GET
+def project_messages_since(request, project_id):
+    """
+    Return messages posted after ``?after_id=`` as JSON, oldest first.
+
+    Lets an open thread poll for new messages without re-rendering the page.
+    Each entry carries the rendered bubble so clients don't duplicate the
+    template. At most ``SINCE_LIMIT`` messages are returned per call;
+    ``has_more`` tells the client to poll again immediately.
+    """
+    project = get_object_or_404(ResearchProject, pk=project_id)
+
+    if not user_can_access_project(request.user, project):
+        return _forbidden_response()
+
+    try:
+        after_id = int(request.GET.get('after_id', 0))
+    except ValueError:
+        return HttpResponseBadRequest('after_id must be an integer.')
+
+    rows = list(
+        project.messages
+        .select_related('sender')
+        .filter(pk__gt=after_id)
+        .order_by('pk')[:SINCE_LIMIT + 1]
+    )
+    has_more = len(rows) > SINCE_LIMIT
+    rows = rows[:SINCE_LIMIT]
+
+    payload = [
+        {
+            'id': msg.pk,
+            'sender': msg.sender.username,
+            'message': msg.message,
+            'created_at': msg.created_at.isoformat(),
+            'html': html,
+        }
+        for msg, html in zip(rows, _render_bubbles(request, rows))
+    ]
+    return JsonResponse({
+        'messages': payload,
+        'last_id': rows[-1].pk if rows else after_id,
+        'has_more': has_more,
+    })
+
+
+# ──────────────────────────────────────────────
+# Live events  (Server-Sent Events, ASGI only)
+# ──────────────────────────────────────────────
+
+async def _event_stream(subscription):
+    """Yield SSE frames for ``subscription`` until the client disconnects."""
+    try:
+        yield 'retry: 5000\n\n'
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), EVENTS_KEEPALIVE_SECONDS)
+            except TimeoutError:
+                # Comment frames keep proxies from closing an idle stream.
+                yield ': keep-alive\n\n'
+                continue
+            yield f'event: {event["type"]}\ndata: {json.dumps(event)}\n\n'
+    finally:
+        subscription.close()
+
+
+@login_required
+async def project_events(request, project_id):
+    """
+    Stream new messages and document uploads for a project as Server-Sent Events.
+
+    Message events carry only ids and metadata; the client fetches the
+    rendered bubbles from ``project_messages_since``. Under WSGI a
+    long-lived stream would pin a worker, so the endpoint answers 204 and
+    the page keeps polling instead.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    user = await request.auser()
+    project = await aget_object_or_404(ResearchProject, pk=project_id)
+
+    if not await auser_can_access_project(user, project):
+        return _forbidden_response()
 
+    subscription = get_broker().subscribe(project_channel(project.pk))
+    response = StreamingHttpResponse(_event_stream(subscription), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,14 +1,14 @@
 from django.contrib import admin
 
-from apps.documents.models import Document
+from apps.documents.models import Blob, Document, UploadSession
 
 
 @admin.register(Document)
 class DocumentAdmin(admin.ModelAdmin):
     list_display = ('title', 'project', 'uploaded_by', 'filename', 'uploaded_at')
-    list_filter = ('project', 'uploaded_at')
+    list_filter = ('project', 'uploaded_at', 'text_status')
     search_fields = ('title', 'project__title', 'uploaded_by__username')
-    readonly_fields = ('uploaded_at',)
+    readonly_fields = ('uploaded_at', 'original_name', 'sha256', 'text_status')
     date_hierarchy = 'uploaded_at'
 
     @admin.display(description='File')
@@ -16,3 +16,18 @@ class DocumentAdmin(admin.ModelAdmin):
         """Show just the filename in the admin list."""
         return obj.filename
 
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ('filename', 'project', 'uploaded_by', 'received_bytes', 'total_size', 'updated_at')
+    list_filter = ('project',)
+    search_fields = ('filename', 'title', 'uploaded_by__username')
+    readonly_fields = ('received_bytes', 'next_chunk', 'created_at', 'updated_at')
+
+
+@admin.register(Blob)
+class BlobAdmin(admin.ModelAdmin):
+    list_display = ('sha256', 'size', 'ref_count', 'created_at')
+    search_fields = ('sha256',)
+    readonly_fields = ('sha256', 'size', 'ref_count', 'created_at')
@@ -6,3 +6,5 @@ class DocumentsConfig(AppConfig):
     name = 'apps.documents'
     verbose_name = 'Documents'
 
+    def ready(self):
+        import apps.documents.signals  # noqa: F401
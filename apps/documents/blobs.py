@@ -0,0 +1,55 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from apps.documents.models import Blob
+from apps.documents.storage import blob_name, document_storage
+from apps.documents.tasks import delete_unreferenced_blob
+
+# ──────────────────────────────────────────────
+# Blob reference counting
+#
+# Each Document holding a content-addressed file owns one reference to its
+# Blob. The bytes are removed by a background task queued with the release
+# of the last reference, so only once that release has committed.
+#
+# Saving content first reserves its row (``reserve_blob``). The deletion task
+# takes the same row before it checks for references, so it waits for an
+# upload that is about to reuse the bytes and then leaves them alone.
+# ──────────────────────────────────────────────
+
+
+def reserve_blob(sha256, size):
+    """
+    Lock the row of blob ``sha256`` for the rest of the caller's transaction,
+    creating it without references if missing. Call before relying on the
+    stored bytes; the reference itself is added by ``acquire_blob``.
+    """
+    with transaction.atomic():
+        Blob.objects.select_for_update().get_or_create(pk=sha256, defaults={'size': size, 'ref_count': 0})
+
+
+def acquire_blob(sha256, size=None):
+    """Add a reference to the blob ``sha256``, creating its row on first use."""
+    if Blob.objects.filter(pk=sha256).update(ref_count=F('ref_count') + 1):
+        return
+    if size is None:
+        size = document_storage().size(blob_name(sha256))
+    try:
+        with transaction.atomic():
+            Blob.objects.create(sha256=sha256, size=size, ref_count=1)
+    except IntegrityError:
+        # Another upload of the same content created the row first.
+        Blob.objects.filter(pk=sha256).update(ref_count=F('ref_count') + 1)
+
+
+def release_blob(sha256):
+    """Drop a reference to ``sha256``; delete the bytes once nothing refers to them."""
+    with transaction.atomic():
+        blob = Blob.objects.select_for_update().filter(pk=sha256).first()
+        if blob is None:
+            return
+        if blob.ref_count > 1:
+            Blob.objects.filter(pk=sha256).update(ref_count=F('ref_count') - 1)
+            return
+        blob.delete()
+        delete_unreferenced_blob.enqueue(sha256)
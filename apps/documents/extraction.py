@@ -0,0 +1,161 @@
+import io
+import logging
+import os
+
+from django.db import router, transaction
+
+from apps.documents.models import Document, DocumentText
+from apps.projects.sharding import project_scope
+
+try:
+    import pypdf
+except ImportError:  # PDF extraction is optional.
+    pypdf = None
+
+logger = logging.getLogger(__name__)
+
+# ──────────────────────────────────────────────
+# Text extraction
+#
+# Text is produced as a stream of chunks of at most CHUNK_CHARS characters
+# and written in small batches, so memory use is bounded by the chunk size
+# no matter how large the file is. Documents sharing content (same sha256)
+# reuse the text already extracted for the first copy.
+# ──────────────────────────────────────────────
+
+CHUNK_CHARS = 16_000
+WRITE_BATCH = 20
+TEXT_EXTENSIONS = {'.txt', '.md', '.csv', '.tsv', '.json', '.tex', '.rst'}
+PDF_EXTENSIONS = {'.pdf'}
+
+
+class UnsupportedFormat(Exception):
+    """The document's file type has no extractor."""
+
+
+class ExtractorUnavailable(Exception):
+    """The extractor for this file type needs an optional package that is not installed."""
+
+
+def _rechunk(pieces):
+    """Re-cut an iterable of strings into chunks of at most CHUNK_CHARS."""
+    buffer = ''
+    for piece in pieces:
+        buffer += piece
+        while len(buffer) >= CHUNK_CHARS:
+            yield buffer[:CHUNK_CHARS]
+            buffer = buffer[CHUNK_CHARS:]
+    if buffer.strip():
+        yield buffer
+
+
+def _iter_plain_text(fh):
+    reader = io.TextIOWrapper(fh, encoding='utf-8', errors='replace')
+    while piece := reader.read(CHUNK_CHARS):
+        yield piece
+
+
+def _iter_pdf_text(fh):
+    # Pages are extracted one at a time; only the current page's text is held.
+    reader = pypdf.PdfReader(fh)
+    for page in reader.pages:
+        yield (page.extract_text() or '') + '\n'
+
+
+def iter_text_chunks(document):
+    """Yield the text of ``document``'s file in chunks of at most CHUNK_CHARS."""
+    extension = os.path.splitext(document.filename)[1].lower()
+    if extension in TEXT_EXTENSIONS:
+        pieces = _iter_plain_text
+    elif extension in PDF_EXTENSIONS:
+        if pypdf is None:
+            raise ExtractorUnavailable('pypdf is not installed')
+        pieces = _iter_pdf_text
+    else:
+        raise UnsupportedFormat(extension or 'no extension')
+
+    with document.file.storage.open(document.file.name, 'rb') as fh:
+        yield from _rechunk(pieces(fh))
+
+
+def _copy_existing_text(document):
+    """Reuse text extracted for another document with identical content."""
+    if not document.sha256:
+        return False
+    source = (
+        Document.objects
+        .filter(sha256=document.sha256, text_status=Document.TextStatus.READY)
+        .exclude(pk=document.pk)
+        .values_list('pk', flat=True)
+        .first()
+    )
+    if source is None:
+        return False
+    chunks = DocumentText.objects.filter(document_id=source).values_list('index', 'text')
+    batch = []
+    for index, text in chunks.iterator(chunk_size=WRITE_BATCH):
+        batch.append(DocumentText(document=document, index=index, text=text))
+        if len(batch) >= WRITE_BATCH:
+            DocumentText.objects.bulk_create(batch)
+            batch = []
+    DocumentText.objects.bulk_create(batch)
+    return True
+
+
+def extract_document_text(document_id, project_id=None):
+    """
+    Extract and store the text of one document, replacing earlier results.
+    Returns the resulting ``Document.TextStatus``. ``project_id`` locates the
+    document when projects are sharded.
+    """
+    with project_scope(project_id):
+        return _extract_document_text(document_id)
+
+
+def _extract_document_text(document_id):
+    try:
+        document = Document.objects.get(pk=document_id)
+    except Document.DoesNotExist:
+        return None
+
+    status = Document.TextStatus.READY
+    database = router.db_for_write(DocumentText, instance=document)
+    with transaction.atomic(using=database):
+        DocumentText.objects.filter(document=document).delete()
+        if not _copy_existing_text(document):
+            try:
+                # Savepoint: a failure half-way discards the chunks written so far.
+                with transaction.atomic(using=database):
+                    batch = []
+                    for index, text in enumerate(iter_text_chunks(document)):
+                        batch.append(DocumentText(document=document, index=index, text=text))
+                        if len(batch) >= WRITE_BATCH:
+                            DocumentText.objects.bulk_create(batch)
+                            batch = []
+                    DocumentText.objects.bulk_create(batch)
+            except UnsupportedFormat:
+                status = Document.TextStatus.UNSUPPORTED
+            except ExtractorUnavailable as exc:
+                # Left pending so the backfill command picks it up once installed.
+                logger.warning('Cannot extract text from document %s: %s', document_id, exc)
+                status = Document.TextStatus.PENDING
+            except Exception:
+                logger.exception('Text extraction failed for document %s', document_id)
+                status = Document.TextStatus.FAILED
+
+        document.text_status = status
+        # A regular save so post_save receivers (search indexing) see the new text.
+        document.save(update_fields=['text_status'])
+    return status
+
+
+def document_text_excerpt(document, limit):
+    """Return the first ``limit`` characters of a document's extracted text."""
+    parts, length = [], 0
+    for text in document.text_chunks.order_by('index').values_list('text', flat=True).iterator(chunk_size=4):
+        parts.append(text[:limit - length])
+        length += len(parts[-1])
+        if length >= limit:
+            break
+    return ''.join(parts)
+
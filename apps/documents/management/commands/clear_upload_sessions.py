@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.documents.models import UploadSession
+from apps.documents.uploads import abort_session
+from apps.projects.sharding import project_databases
+
+
+class Command(BaseCommand):
+    help = 'Delete chunked-upload sessions (and their partial files) that have not received data recently.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=int, default=24,
+            help='Remove sessions idle for longer than this many hours (default: 24).',
+        )
+
+    def handle(self, *args, **options):
+        if options['hours'] < 0:
+            raise CommandError('--hours must not be negative.')
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        removed = 0
+        for database in project_databases():
+            for session in UploadSession.objects.using(database).filter(updated_at__lt=cutoff).iterator():
+                abort_session(session)
+                removed += 1
+        self.stdout.write(self.style.SUCCESS(f'Removed {removed} stale upload session(s).'))
@@ -0,0 +1,62 @@
+import os
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.documents.blobs import acquire_blob
+from apps.documents.models import Document
+from apps.documents.storage import blob_hash, document_storage
+
+
+class Command(BaseCommand):
+    help = (
+        'Move documents stored under the old one-copy-per-upload layout into '
+        'content-addressed blobs, merging identical files. Safe to re-run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be converted without changing anything.')
+        parser.add_argument('--keep-originals', action='store_true', help='Leave the old files in place after conversion.')
+
+    def handle(self, *args, **options):
+        storage = document_storage()
+        pending = Document.objects.filter(sha256='').exclude(file='').only('pk', 'file', 'original_name')
+
+        converted = missing = 0
+        saved_bytes = 0
+        seen = set()
+        for document in pending.iterator():
+            old_name = document.file.name
+            if not storage.exists(old_name):
+                self.stderr.write(f'Document {document.pk}: {old_name} is missing; skipped.')
+                missing += 1
+                continue
+
+            size = storage.size(old_name)
+            if options['dry_run']:
+                converted += 1
+                continue
+
+            with storage.open(old_name, 'rb') as fh:
+                new_name = storage.save(old_name, fh)
+            sha256 = blob_hash(new_name)
+            if sha256 in seen or Document.objects.filter(sha256=sha256).exists():
+                saved_bytes += size
+            seen.add(sha256)
+
+            with transaction.atomic():
+                Document.objects.filter(pk=document.pk).update(
+                    file=new_name,
+                    sha256=sha256,
+                    original_name=document.original_name or os.path.basename(old_name),
+                )
+                acquire_blob(sha256, size)
+            if not options['keep_originals'] and old_name != new_name:
+                storage.delete(old_name)
+            converted += 1
+
+        verb = 'Would convert' if options['dry_run'] else 'Converted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {converted} document(s); {missing} missing; '
+            f'{saved_bytes / 1048576:.1f} MB saved by de-duplication.'
+        ))
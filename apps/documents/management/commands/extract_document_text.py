@@ -0,0 +1,56 @@
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from apps.documents.extraction import extract_document_text
+from apps.documents.models import Document
+from apps.projects.sharding import project_databases
+
+
+class Command(BaseCommand):
+    help = (
+        'Extract text from existing documents across a pool of worker processes. '
+        'By default only documents still pending or previously failed are processed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Worker processes (default: number of CPUs).',
+        )
+        parser.add_argument('--all', action='store_true', help='Re-extract every document, including finished ones.')
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        if workers < 1:
+            raise CommandError('--workers must be positive.')
+
+        ids, project_ids = [], []
+        for database in project_databases():
+            documents = Document.objects.using(database)
+            if not options['all']:
+                documents = documents.filter(text_status__in=[Document.TextStatus.PENDING, Document.TextStatus.FAILED])
+            for pk, project_id in documents.order_by('pk').values_list('pk', 'project_id'):
+                ids.append(pk)
+                project_ids.append(project_id)
+        if not ids:
+            self.stdout.write('Nothing to extract.')
+            return
+
+        # Children must open their own connections rather than share the parent's.
+        connections.close_all()
+        results = Counter()
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+            for done, status in enumerate(pool.map(extract_document_text, ids, project_ids, chunksize=4), start=1):
+                results[status] += 1
+                if done % 100 == 0:
+                    self.stdout.write(f'{done}/{len(ids)} documents processed…')
+
+        summary = ', '.join(
+            f'{count} {Document.TextStatus(status).label.lower()}' for status, count in results.items() if status
+        )
+        self.stdout.write(self.style.SUCCESS(f'Processed {len(ids)} document(s): {summary}.'))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.11 on 2026-10-18 14:16
+
+from django.db import migrations, models
+
+
+def fill_sizes(apps, schema_editor):
+    """Record the size of existing files (missing files stay at 0)."""
+    Document = apps.get_model('documents', 'Document')
+    for document in Document.objects.exclude(file='').only('pk', 'file').iterator():
+        try:
+            size = document.file.size
+        except OSError:
+            continue
+        Document.objects.filter(pk=document.pk).update(size=size)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0004_document_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='size',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_sizes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.11 on 2026-10-18 14:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0005_document_size'),
+        ('projects', '0004_projectshard'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['project', 'uploaded_at', 'id'], name='document_list_idx'),
+        ),
+    ]
@@ -1,10 +1,21 @@
+import os
+import uuid
+
 from django.contrib.auth.models import User
 from django.db import models
 
+from apps.documents.storage import blob_hash, document_storage
 from apps.projects.models import ResearchProject
+from apps.projects.sharding import ShardedQuerySet
 
 
 class Document(models.Model):
+    class TextStatus(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        READY = 'READY', 'Ready'
+        UNSUPPORTED = 'UNSUPPORTED', 'Unsupported format'
+        FAILED = 'FAILED', 'Failed'
+
     project = models.ForeignKey(
         ResearchProject,
         on_delete=models.CASCADE,
@@ -16,19 +27,134 @@ class Document(models.Model):
         related_name='uploaded_documents',
     )
     title = models.CharField(max_length=255)
-    file = models.FileField(upload_to='project_documents/')
+    file = models.FileField(upload_to='project_documents/', storage=document_storage)
+    original_name = models.CharField(max_length=255, blank=True)
+    sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    size = models.PositiveBigIntegerField(default=0)
+    text_status = models.CharField(
+        max_length=12,
+        choices=TextStatus.choices,
+        default=TextStatus.PENDING,
+    )
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    # Retries lookups that miss after the project moved shard (apps/projects/sharding.py).
+    objects = ShardedQuerySet.as_manager()
+
     class Meta:
         ordering = ['-uploaded_at']
+        indexes = [
+            # The API pages documents by (project, uploaded_at, id) — see apps/projects/pagination.py
+            models.Index(fields=['project', 'uploaded_at', 'id'], name='document_list_idx'),
+        ]
         verbose_name = 'Document'
         verbose_name_plural = 'Documents'
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_sha256 = instance.__dict__.get('sha256')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Store the upload now (rather than in FileField.pre_save) so the
+        # content hash is known before the row is written.
+        if self.file and not self.file._committed:
+            self.original_name = os.path.basename(self.file.name)
+            self.file.save(self.original_name, self.file.file, save=False)
+        if self.file:
+            self.sha256 = blob_hash(self.file.name) or self.sha256
+            if not self.size:
+                self.size = self.file.size
+        super().save(*args, **kwargs)
+
     @property
     def filename(self):
-        """Return just the file name from the full path."""
-        return self.file.name.split('/')[-1]
+        """Return the name the file was uploaded with."""
+        return self.original_name or self.file.name.split('/')[-1]
+
+
+class DocumentText(models.Model):
+    """
+    One bounded chunk of text extracted from a document's file.
+
+    Written by apps/documents/extraction.py; feeds search indexing and
+    previews without ever loading a whole file into memory.
+    """
+    document = models.ForeignKey(
+        Document,
+        on_delete=models.CASCADE,
+        related_name='text_chunks',
+    )
+    index = models.PositiveIntegerField()
+    text = models.TextField()
+
+    class Meta:
+        ordering = ['document', 'index']
+        verbose_name = 'Document Text'
+        verbose_name_plural = 'Document Text'
+        constraints = [
+            models.UniqueConstraint(fields=['document', 'index'], name='document_text_chunk_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.document_id} #{self.index}'
+
+
+class Blob(models.Model):
+    """
+    One stored file, shared by every Document with the same content.
+
+    Keyed by SHA-256 and deliberately not a foreign key from Document, so
+    documents can live in another database than the blob index.
+    """
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Blob'
+        verbose_name_plural = 'Blobs'
+
+    def __str__(self):
+        return f'{self.sha256[:12]}… ({self.ref_count} reference(s))'
+
+
+class UploadSession(models.Model):
+    """
+    A chunked, resumable upload in progress.
+
+    Chunks are appended to a temporary file (see apps/documents/uploads.py);
+    the Document row is only created when the session is completed.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    project = models.ForeignKey(
+        ResearchProject,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions',
+    )
+    uploaded_by = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions',
+    )
+    title = models.CharField(max_length=255)
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField(null=True, blank=True)
+    received_bytes = models.PositiveBigIntegerField(default=0)
+    next_chunk = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Upload Session'
+        verbose_name_plural = 'Upload Sessions'
+
+    def __str__(self):
+        return f'{self.filename} ({self.received_bytes} bytes received)'
 
@@ -0,0 +1,155 @@
+import mimetypes
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+# ──────────────────────────────────────────────
+# Document delivery
+#
+# Access control happens in the view; everything here is about moving bytes
+# efficiently: validators for conditional GET, single byte-range requests
+# for resumable downloads, and optional hand-off to the front proxy
+# (settings.DOCUMENT_SENDFILE_BACKEND) so Python workers never stream files.
+# ──────────────────────────────────────────────
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _validators(document):
+    """Return ``(size, etag, last_modified_timestamp)`` for the stored file."""
+    storage, name = document.file.storage, document.file.name
+    size = storage.size(name)
+    try:
+        modified = storage.get_modified_time(name)
+    except (NotImplementedError, OSError):
+        modified = document.uploaded_at
+    if document.sha256:
+        # Content-addressed: the digest identifies the bytes exactly.
+        etag = f'"{document.sha256}"'
+    else:
+        etag = f'"{size:x}-{int(modified.timestamp() * 1_000_000):x}"'
+    return size, etag, int(modified.timestamp())
+
+
+def _parse_range(header, size):
+    """
+    Parse a single ``bytes=`` range against a file of ``size`` bytes.
+
+    Returns ``(start, end)`` inclusive, ``None`` if the header should be
+    ignored (absent, malformed or multi-range — a full 200 is always a valid
+    answer), or ``False`` if the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.replace(' ', '')) if header else None
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if size == 0:
+        # An empty file has no byte a range could select.
+        return False
+    if not first:
+        # Suffix range: the final N bytes.
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _if_range_matches(request, etag, last_modified):
+    """Honour If-Range: only serve a partial response if the client's copy is current."""
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def _iter_range(fh, start, length, block_size=FileResponse.block_size):
+    try:
+        fh.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = fh.read(min(block_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        fh.close()
+
+
+def _offload_response(document, content_type):
+    """Let nginx (X-Accel-Redirect) or Apache/lighttpd (X-Sendfile) send the file."""
+    response = HttpResponse(content_type=content_type)
+    if settings.DOCUMENT_SENDFILE_BACKEND == 'nginx':
+        prefix = settings.DOCUMENT_SENDFILE_PREFIX.rstrip('/')
+        response['X-Accel-Redirect'] = f'{prefix}/{quote(document.file.name)}'
+    else:
+        response['X-Sendfile'] = document.file.path
+    return response
+
+
+def serve_document(request, document):
+    """
+    Return a response delivering ``document``'s file to an authorised user.
+
+    Sends strong ETag / Last-Modified validators, answers conditional
+    requests with 304 (or 412), supports a single HTTP Range, and hands the
+    transfer to the front proxy when a sendfile backend is configured.
+    """
+    size, etag, last_modified = _validators(document)
+
+    conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if conditional is not None:
+        conditional['ETag'] = etag
+        conditional['Last-Modified'] = http_date(last_modified)
+        return conditional
+
+    filename = document.filename
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    if settings.DOCUMENT_SENDFILE_BACKEND:
+        # The proxy handles Range and Content-Length itself.
+        response = _offload_response(document, content_type)
+    else:
+        byte_range = None
+        if _if_range_matches(request, etag, last_modified):
+            byte_range = _parse_range(request.headers.get('Range'), size)
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+        fh = document.file.storage.open(document.file.name, 'rb')
+        if byte_range is None:
+            response = FileResponse(fh, content_type=content_type)
+            response['Content-Length'] = size
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                _iter_range(fh, start, end - start + 1),
+                status=206,
+                content_type=content_type,
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = end - start + 1
+
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # Per-user authorisation: caches may keep a copy but must revalidate.
+    response['Cache-Control'] = 'private, no-cache'
+    return response
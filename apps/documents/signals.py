@@ -0,0 +1,55 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.communication.realtime import publish_project_event
+from apps.documents.blobs import acquire_blob, release_blob
+from apps.documents.models import Document
+from apps.documents.tasks import delete_stored_file, extract_text
+
+
+@receiver(post_save, sender=Document)
+def broadcast_new_document(sender, instance, created, raw=False, using=None, **kwargs):
+    """Push newly uploaded documents to everyone watching the project."""
+    if not created or raw:
+        return
+    event = {
+        'type': 'document',
+        'project': instance.project_id,
+        'id': instance.pk,
+        'title': instance.title,
+        'uploaded_by': instance.uploaded_by.username,
+        'uploaded_at': instance.uploaded_at.isoformat(),
+    }
+    transaction.on_commit(lambda: publish_project_event(instance.project_id, event), using=using)
+
+
+@receiver(post_save, sender=Document)
+def queue_text_extraction(sender, instance, created, raw=False, **kwargs):
+    """Extract the text of new uploads in the background."""
+    if created and not raw:
+        extract_text.enqueue(instance.pk, instance.project_id)
+
+
+@receiver(post_save, sender=Document)
+def track_blob_reference(sender, instance, raw=False, **kwargs):
+    """Move the document's blob reference when its content changes."""
+    if raw:
+        return
+    previous = getattr(instance, '_stored_sha256', None)
+    if instance.sha256 != previous:
+        if instance.sha256:
+            acquire_blob(instance.sha256)
+        if previous:
+            release_blob(previous)
+    instance._stored_sha256 = instance.sha256
+
+
+@receiver(post_delete, sender=Document)
+def release_blob_reference(sender, instance, **kwargs):
+    """Drop the deleted document's reference; the last one removes the bytes."""
+    if instance.sha256:
+        release_blob(instance.sha256)
+    elif instance.file:
+        # Legacy per-upload file that was never converted to a blob.
+        delete_stored_file.enqueue(instance.file.name)
@@ -0,0 +1,113 @@
+import hashlib
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, storages
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+
+# ──────────────────────────────────────────────
+# Content-addressed document storage
+#
+# Every file is stored once, under the SHA-256 of its bytes:
+#
+#     blobs/ab/cd/abcdef0123…      (two levels of 256-way fan-out)
+#
+# Saving content that already exists writes nothing and returns the existing
+# name, so the same paper uploaded to ten projects occupies disk once. The
+# original file name lives on Document.original_name; reference counts live
+# on the Blob model (apps/documents/blobs.py), which decides when the bytes
+# can finally be removed.
+# ──────────────────────────────────────────────
+
+BLOB_DIR = 'blobs'
+HASH_BLOCK_SIZE = 1024 * 1024
+BLOB_NAME_RE = re.compile(rf'^{BLOB_DIR}/[0-9a-f]{{2}}/[0-9a-f]{{2}}/([0-9a-f]{{64}})$')
+
+
+def blob_name(sha256):
+    """Storage name for the blob with digest ``sha256``."""
+    return f'{BLOB_DIR}/{sha256[:2]}/{sha256[2:4]}/{sha256}'
+
+
+def blob_hash(name):
+    """Return the digest encoded in a blob storage name, or None for legacy paths."""
+    match = BLOB_NAME_RE.match(name or '')
+    return match.group(1) if match else None
+
+
+def hash_content(content):
+    """SHA-256 of a File, read in chunks; the file is rewound afterwards."""
+    hasher = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks(HASH_BLOCK_SIZE):
+        hasher.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return hasher.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage that names files by content hash and never stores a duplicate.
+
+    The requested name is ignored. If ``content`` carries a precomputed
+    ``sha256`` attribute (set by the hashing upload handlers or the chunked
+    upload session) the bytes are not read twice.
+    """
+
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        from apps.documents.blobs import reserve_blob
+
+        sha256 = getattr(content, 'sha256', None) or hash_content(content)
+        target = blob_name(sha256)
+        # Keeps delete_unreferenced_blob off these bytes until the caller's
+        # transaction, and with it the new reference, has committed.
+        reserve_blob(sha256, content.size)
+        if self.exists(target):
+            return target
+        stored = self._save(target, content)
+        if stored != target:
+            # Lost a race with an identical upload; keep the first copy.
+            self.delete(stored)
+        return target
+
+
+def document_storage():
+    """Storage used by Document.file (settings.STORAGES['documents'])."""
+    return storages['documents']
+
+
+# ──────────────────────────────────────────────
+# Upload handlers
+#
+# Hash each uploaded file while it streams in, so the storage can pick the
+# blob name without re-reading a possibly large temporary file.
+# ──────────────────────────────────────────────
+
+class HashingUploadMixin:
+    def new_file(self, *args, **kwargs):
+        # Before super(): MemoryFileUploadHandler raises StopFutureHandlers there.
+        self._hasher = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        if getattr(self, '_hasher', None) is not None:
+            self._hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        if uploaded is not None and getattr(self, '_hasher', None) is not None:
+            uploaded.sha256 = self._hasher.hexdigest()
+        return uploaded
+
+
+class HashingMemoryFileUploadHandler(HashingUploadMixin, MemoryFileUploadHandler):
+    """MemoryFileUploadHandler that records the SHA-256 of small uploads."""
+
+
+class HashingTemporaryFileUploadHandler(HashingUploadMixin, TemporaryFileUploadHandler):
+    """TemporaryFileUploadHandler that records the SHA-256 of large uploads."""
@@ -0,0 +1,39 @@
+from django.db import transaction
+
+from apps.documents.extraction import extract_document_text
+from apps.documents.models import Blob, Document
+from apps.documents.storage import blob_name, document_storage
+from apps.projects.sharding import project_databases
+from apps.tasks.queue import task
+
+
+@task(max_attempts=3, max_concurrency=2, retry_delay=30)
+def extract_text(document_id, project_id=None):
+    """Extract a document's text; failures are retried before being recorded."""
+    status = extract_document_text(document_id, project_id)
+    if status == Document.TextStatus.FAILED:
+        raise RuntimeError(f'Text extraction failed for document {document_id}.')
+
+
+@task(priority=-10)
+def delete_unreferenced_blob(sha256):
+    """Remove a blob's bytes unless it was referenced or reserved again after its release."""
+    with transaction.atomic():
+        # Creating the row locks it: an upload reserving the same content
+        # waits until the bytes are gone and then writes them again.
+        blob, created = Blob.objects.select_for_update().get_or_create(
+            pk=sha256, defaults={'size': 0, 'ref_count': 0},
+        )
+        if not created:
+            return
+        if not any(
+            Document.objects.using(database).filter(sha256=sha256).exists() for database in project_databases()
+        ):
+            document_storage().delete(blob_name(sha256))
+        blob.delete()
+
+
+@task(priority=-10)
+def delete_stored_file(name):
+    """Remove a legacy (pre-blob) document file."""
+    document_storage().delete(name)
@@ -0,0 +1,203 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+
+from apps.documents.models import Document, UploadSession
+from apps.projects.sharding import project_atomic
+
+# ──────────────────────────────────────────────
+# Chunked, resumable uploads
+#
+# Protocol (JSON endpoints in apps/documents/views.py):
+#   1. POST   …/uploads/                     → start a session
+#   2. PUT    …/uploads/<id>/chunks/<n>/     → append chunk n (0-based, in order)
+#   3. POST   …/uploads/<id>/complete/       → verify and create the Document
+#   GET …/uploads/<id>/ reports progress so an interrupted client can resume
+#   from ``next_chunk``; DELETE aborts.
+#
+# Chunks are appended to one temporary file per session. The SHA-256 is
+# updated as each chunk streams in; hash state lives in process memory and is
+# rebuilt from the temporary file if a chunk lands on a worker that has not
+# seen the session (or after a restart).
+# ──────────────────────────────────────────────
+
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """A chunked-upload request that cannot be applied; carries an HTTP status."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+_hashers = {}
+_hashers_lock = threading.Lock()
+
+
+def temp_path(session):
+    """Location of the partial file for ``session``."""
+    return Path(settings.DOCUMENT_UPLOAD_TEMP_DIR) / f'{session.pk}.part'
+
+
+def _hasher_for(session, path):
+    """Return a SHA-256 object covering exactly the first ``received_bytes`` of ``path``."""
+    with _hashers_lock:
+        cached = _hashers.get(session.pk)
+    if cached and cached[0] == session.received_bytes:
+        # Work on a copy so a chunk that fails half-way can't corrupt the cache.
+        return cached[1].copy()
+
+    hasher = hashlib.sha256()
+    remaining = session.received_bytes
+    if remaining:
+        with path.open('rb') as fh:
+            while remaining > 0:
+                block = fh.read(min(READ_BLOCK_SIZE, remaining))
+                if not block:
+                    break
+                hasher.update(block)
+                remaining -= len(block)
+    return hasher
+
+
+def _remember_hasher(session, hasher):
+    with _hashers_lock:
+        _hashers[session.pk] = (session.received_bytes, hasher)
+
+
+def _forget_hasher(session):
+    with _hashers_lock:
+        _hashers.pop(session.pk, None)
+
+
+def start_session(project, user, title, filename, total_size=None):
+    """Create an upload session and its empty temporary file."""
+    title = (title or '').strip()
+    filename = os.path.basename((filename or '').strip())
+    if not title:
+        raise UploadError('A title is required.')
+    if not filename:
+        raise UploadError('A filename is required.')
+    if total_size is not None:
+        try:
+            total_size = int(total_size)
+        except (TypeError, ValueError):
+            raise UploadError('size must be an integer.')
+        if total_size < 0 or total_size > settings.DOCUMENT_UPLOAD_MAX_SIZE:
+            raise UploadError('File exceeds the maximum upload size.', status=413)
+
+    session = UploadSession.objects.create(
+        project=project,
+        uploaded_by=user,
+        title=title[:255],
+        filename=filename[:255],
+        total_size=total_size,
+    )
+    path = temp_path(session)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    return session
+
+
+def append_chunk(session_id, index, stream):
+    """
+    Append chunk ``index`` read from ``stream`` to the session's file.
+
+    Re-sending an already stored chunk is acknowledged without writing, so
+    clients can safely retry after a dropped response. Chunks must otherwise
+    arrive in order.
+    """
+    with project_atomic():
+        session = UploadSession.objects.select_for_update().get(pk=session_id)
+        if index < session.next_chunk:
+            return session
+        if index > session.next_chunk:
+            raise UploadError(f'Expected chunk {session.next_chunk}, got {index}.', status=409)
+
+        path = temp_path(session)
+        hasher = _hasher_for(session, path)
+        chunk_limit = settings.DOCUMENT_UPLOAD_CHUNK_SIZE
+        size_limit = session.total_size if session.total_size is not None else settings.DOCUMENT_UPLOAD_MAX_SIZE
+
+        written = 0
+        # Drop any tail left by an earlier, interrupted write of this chunk.
+        with path.open('r+b') as fh:
+            fh.truncate(session.received_bytes)
+            fh.seek(session.received_bytes)
+            while block := stream.read(READ_BLOCK_SIZE):
+                written += len(block)
+                if written > chunk_limit:
+                    raise UploadError('Chunk exceeds the maximum chunk size.', status=413)
+                if session.received_bytes + written > size_limit:
+                    raise UploadError('Upload exceeds the declared or maximum size.', status=413)
+                fh.write(block)
+                hasher.update(block)
+        if not written:
+            raise UploadError('Empty chunk.')
+
+        session.received_bytes += written
+        session.next_chunk += 1
+        session.save(update_fields=['received_bytes', 'next_chunk', 'updated_at'])
+    _remember_hasher(session, hasher)
+    return session
+
+
+class _SessionFile(File):
+    """A File whose bytes already sit on disk, so FileSystemStorage moves instead of copying."""
+
+    def __init__(self, path, name, sha256=None):
+        super().__init__(open(path, 'rb'), name=name)
+        self._path = str(path)
+        self.sha256 = sha256
+
+    def temporary_file_path(self):
+        return self._path
+
+
+def complete_session(session_id, expected_sha256=None):
+    """Verify the assembled file and turn it into a Document. Returns ``(document, sha256)``."""
+    with project_atomic():
+        session = UploadSession.objects.select_for_update().select_related('project').get(pk=session_id)
+        if session.total_size is not None and session.received_bytes != session.total_size:
+            raise UploadError(
+                f'Upload incomplete: {session.received_bytes} of {session.total_size} bytes received.',
+                status=409,
+            )
+        if not session.received_bytes:
+            raise UploadError('No data has been uploaded.', status=409)
+
+        path = temp_path(session)
+        digest = _hasher_for(session, path).hexdigest()
+        if expected_sha256 and expected_sha256.lower() != digest:
+            raise UploadError('Checksum mismatch; restart the upload.', status=422)
+
+        document = Document(
+            project=session.project,
+            uploaded_by_id=session.uploaded_by_id,
+            title=session.title,
+            original_name=session.filename,
+        )
+        content = _SessionFile(path, session.filename, sha256=digest)
+        try:
+            document.file.save(session.filename, content, save=False)
+        finally:
+            content.close()
+            # Moved into storage, unless the backend copied it or it was a duplicate.
+            path.unlink(missing_ok=True)
+        document.save()
+        session.delete()
+    _forget_hasher(session)
+    return document, digest
+
+
+def abort_session(session):
+    """Discard a session and its partial file."""
+    _forget_hasher(session)
+    temp_path(session).unlink(missing_ok=True)
+    session.delete()
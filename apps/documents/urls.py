@@ -7,6 +7,19 @@ app_name = 'documents'
 urlpatterns = [
     path('project/<int:project_id>/', views.document_list, name='document_list'),
     path('project/<int:project_id>/upload/', views.document_upload, name='document_upload'),
+    path('project/<int:project_id>/uploads/', views.upload_session_start, name='upload_session_start'),
+    path('project/<int:project_id>/uploads/<uuid:session_id>/', views.upload_session, name='upload_session'),
+    path(
+        'project/<int:project_id>/uploads/<uuid:session_id>/chunks/<int:index>/',
+        views.upload_session_chunk,
+        name='upload_session_chunk',
+    ),
+    path(
+        'project/<int:project_id>/uploads/<uuid:session_id>/complete/',
+        views.upload_session_complete,
+        name='upload_session_complete',
+    ),
+    path('project/<int:project_id>/download/<int:document_id>/', views.document_download, name='document_download'),
     path('project/<int:project_id>/delete/<int:document_id>/', views.document_delete, name='document_delete'),
 ]
 
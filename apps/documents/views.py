@@ -1,23 +1,26 @@
+import json
+
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseForbidden
-from django.shortcuts import get_object_or_404, redirect, render
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Substr
+from django.http import Http404, HttpResponseForbidden, JsonResponse
+from django.shortcuts import aget_object_or_404, get_object_or_404, redirect, render
+from django.urls import reverse
+from django.views.decorators.http import require_http_methods, require_POST, require_safe
 
-from apps.accounts.models import Profile
+from apps.documents import uploads
 from apps.documents.forms import DocumentUploadForm
-from apps.documents.models import Document
+from apps.documents.models import Document, DocumentText, UploadSession
+from apps.documents.serving import serve_document
+from apps.projects.access import ais_admin, arequest_user, auser_can_access_project, is_admin, user_can_access_project
+from apps.projects.conditional import not_modified, project_validators, with_validators
 from apps.projects.models import ResearchProject
+from apps.projects.sharding import project_atomic
+from researchcollab.instrumentation import query_budget
 
-
-# ──────────────────────────────────────────────
-# Helpers
-# ──────────────────────────────────────────────
-
-def _user_can_access_project(user, project):
-    """Return True if the user is ADMIN or an assigned researcher."""
-    if user.profile.role == Profile.Role.ADMIN:
-        return True
-    return user in project.researchers.all()
+PREVIEW_CHARS = 200
 
 
 # ──────────────────────────────────────────────
@@ -25,30 +28,70 @@ def _user_can_access_project(user, project):
 # ──────────────────────────────────────────────
 
 @login_required
-def document_list(request, project_id):
+@query_budget(6)
+async def document_list(request, project_id):
     """
     Show all documents for a project.
     ADMIN → can view any project's documents.
     RESEARCHER → can view only if assigned to the project.
+    Unchanged pages are answered with a 304 (see apps/projects/conditional.py).
     """
-    project = get_object_or_404(ResearchProject, pk=project_id)
+    user = await arequest_user(request)
+    project = await aget_object_or_404(ResearchProject, pk=project_id)
 
-    if not _user_can_access_project(request.user, project):
+    if not await auser_can_access_project(user, project):
         return HttpResponseForbidden(
             '<h3 style="text-align:center;margin-top:60px;">'
             '403 — You do not have permission to view these documents.'
             '</h3>'
         )
 
-    documents = project.documents.select_related('uploaded_by').all()
-    is_admin = request.user.profile.role == Profile.Role.ADMIN
+    admin = await ais_admin(user)
+    etag, last_modified = project_validators(request, project, admin)
+    if response := not_modified(request, etag, last_modified):
+        return response
+
+    first_chunk = DocumentText.objects.filter(document=OuterRef('pk'), index=0).values('text')[:1]
+    documents = [
+        document async for document in
+        project.documents
+        .select_related('uploaded_by')
+        .annotate(preview=Substr(Subquery(first_chunk), 1, PREVIEW_CHARS))
+    ]
 
     context = {
         'project': project,
         'documents': documents,
-        'is_admin': is_admin,
+        'is_admin': admin,
     }
-    return render(request, 'documents/document_list.html', context)
+    response = render(request, 'documents/document_list.html', context)
+    return with_validators(request, response, etag, last_modified)
+
+
+# ──────────────────────────────────────────────
+# Document Download
+# ──────────────────────────────────────────────
+
+@login_required
+@require_safe
+def document_download(request, project_id, document_id):
+    """
+    Stream a document's file to a user who can access its project.
+    Supports conditional GET (304), byte ranges (206) and proxy offload.
+    """
+    document = get_object_or_404(Document, pk=document_id, project_id=project_id)
+
+    if not user_can_access_project(request.user, document.project_id):
+        return HttpResponseForbidden(
+            '<h3 style="text-align:center;margin-top:60px;">'
+            '403 — You do not have permission to download this document.'
+            '</h3>'
+        )
+
+    if not document.file or not document.file.storage.exists(document.file.name):
+        raise Http404('The file for this document is missing.')
+
+    return serve_document(request, document)
 
 
 # ──────────────────────────────────────────────
@@ -64,7 +107,7 @@ def document_upload(request, project_id):
     """
     project = get_object_or_404(ResearchProject, pk=project_id)
 
-    if not _user_can_access_project(request.user, project):
+    if not user_can_access_project(request.user, project):
         return HttpResponseForbidden(
             '<h3 style="text-align:center;margin-top:60px;">'
             '403 — You do not have permission to upload documents to this project.'
@@ -77,7 +120,10 @@ def document_upload(request, project_id):
             document = form.save(commit=False)
             document.project = project
             document.uploaded_by = request.user
-            document.save()
+            # One transaction for the row, its index entry and the queued
+            # text-extraction task.
+            with project_atomic(project.pk):
+                document.save()
             messages.success(request, f'Document "{document.title}" uploaded successfully.')
             return redirect('documents:document_list', project_id=project.pk)
     else:
@@ -86,10 +132,147 @@ def document_upload(request, project_id):
     context = {
         'form': form,
         'project': project,
+        'chunk_size': settings.DOCUMENT_UPLOAD_CHUNK_SIZE,
+        'max_size': settings.DOCUMENT_UPLOAD_MAX_SIZE,
     }
     return render(request, 'documents/document_upload.html', context)
 
 
+# ──────────────────────────────────────────────
+# Chunked Uploads  (JSON API used by the upload page for large files)
+# ──────────────────────────────────────────────
+
+def _json_error(message, status):
+    return JsonResponse({'error': message}, status=status)
+
+
+def _session_payload(session):
+    project_id = session.project_id
+    return {
+        'id': str(session.pk),
+        'title': session.title,
+        'filename': session.filename,
+        'size': session.total_size,
+        'received_bytes': session.received_bytes,
+        'next_chunk': session.next_chunk,
+        'chunk_size': settings.DOCUMENT_UPLOAD_CHUNK_SIZE,
+        'url': reverse('documents:upload_session', args=[project_id, session.pk]),
+        'complete_url': reverse('documents:upload_session_complete', args=[project_id, session.pk]),
+    }
+
+
+def _get_upload_session(request, project_id, session_id):
+    """
+    Return the caller's own session for this project, or an error response.
+    Access is re-checked on every call so removed members cannot finish uploads.
+    """
+    if not user_can_access_project(request.user, project_id):
+        return None, _json_error('You do not have permission to upload documents to this project.', 403)
+    session = UploadSession.objects.filter(
+        pk=session_id, project_id=project_id, uploaded_by=request.user,
+    ).first()
+    if session is None:
+        return None, _json_error('Upload session not found.', 404)
+    return session, None
+
+
+@login_required
+@require_POST
+def upload_session_start(request, project_id):
+    """
+    Start a chunked upload. Body: ``{"title", "filename", "size"}``.
+    Responds 201 with the session state, including the URLs to PUT chunks to.
+    """
+    project = get_object_or_404(ResearchProject, pk=project_id)
+
+    if not user_can_access_project(request.user, project):
+        return _json_error('You do not have permission to upload documents to this project.', 403)
+
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return _json_error('Request body must be JSON.', 400)
+    if not isinstance(data, dict):
+        return _json_error('Request body must be a JSON object.', 400)
+
+    try:
+        session = uploads.start_session(
+            project, request.user, data.get('title'), data.get('filename'), data.get('size'),
+        )
+    except uploads.UploadError as exc:
+        return _json_error(str(exc), exc.status)
+    return JsonResponse(_session_payload(session), status=201)
+
+
+@login_required
+@require_http_methods(['GET', 'DELETE'])
+def upload_session(request, project_id, session_id):
+    """
+    GET → progress, so an interrupted client can resume from ``next_chunk``.
+    DELETE → abort the upload and discard what was received.
+    """
+    session, error = _get_upload_session(request, project_id, session_id)
+    if error:
+        return error
+
+    if request.method == 'DELETE':
+        uploads.abort_session(session)
+        return JsonResponse({'aborted': True})
+    return JsonResponse(_session_payload(session))
+
+
+@login_required
+@require_http_methods(['PUT'])
+def upload_session_chunk(request, project_id, session_id, index):
+    """
+    Append chunk ``index`` (raw request body, at most DOCUMENT_UPLOAD_CHUNK_SIZE).
+    The body is streamed to disk, never buffered whole in memory.
+    """
+    session, error = _get_upload_session(request, project_id, session_id)
+    if error:
+        return error
+
+    try:
+        session = uploads.append_chunk(session.pk, index, request)
+    except UploadSession.DoesNotExist:
+        return _json_error('Upload session not found.', 404)
+    except uploads.UploadError as exc:
+        return _json_error(str(exc), exc.status)
+    return JsonResponse(_session_payload(session))
+
+
+@login_required
+@require_POST
+def upload_session_complete(request, project_id, session_id):
+    """
+    Finalise an upload and create the Document.
+    An optional ``{"sha256": "..."}`` body is checked against the received bytes.
+    """
+    session, error = _get_upload_session(request, project_id, session_id)
+    if error:
+        return error
+
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return _json_error('Request body must be JSON.', 400)
+    expected = data.get('sha256') if isinstance(data, dict) else None
+
+    try:
+        document, digest = uploads.complete_session(session.pk, expected)
+    except UploadSession.DoesNotExist:
+        return _json_error('Upload session not found.', 404)
+    except uploads.UploadError as exc:
+        return _json_error(str(exc), exc.status)
+
+    messages.success(request, f'Document "{document.title}" uploaded successfully.')
+    return JsonResponse({
+        'document_id': document.pk,
+        'sha256': digest,
+        'redirect': reverse('documents:document_list', args=[project_id]),
+    }, status=201)
+
+
 # ──────────────────────────────────────────────
 # Document Delete
 # ──────────────────────────────────────────────
@@ -104,10 +287,9 @@ def document_delete(request, project_id, document_id):
     project = get_object_or_404(ResearchProject, pk=project_id)
     document = get_object_or_404(Document, pk=document_id, project=project)
 
-    is_admin = request.user.profile.role == Profile.Role.ADMIN
-    is_uploader = document.uploaded_by == request.user
+    is_uploader = document.uploaded_by_id == request.user.pk
 
-    if not (is_admin or is_uploader):
+    if not (is_admin(request.user) or is_uploader):
         return HttpResponseForbidden(
             '<h3 style="text-align:center;margin-top:60px;">'
             '403 — You do not have permission to delete this document.'
@@ -116,8 +298,10 @@ def document_delete(request, project_id, document_id):
 
     if request.method == 'POST':
         title = document.title
-        document.file.delete(save=False)  # Delete the actual file from storage
-        document.delete()
+        # Files are shared by content: the post_delete signal releases this
+        # document's reference and a background task removes unused bytes.
+        with project_atomic(project.pk):
+            document.delete()
         messages.success(request, f'Document "{title}" deleted successfully.')
         return redirect('documents:document_list', project_id=project.pk)
 
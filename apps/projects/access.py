@@ -0,0 +1,102 @@
+from apps.accounts.models import Profile
+from apps.projects.models import ResearchProject
+
+
+# ──────────────────────────────────────────────
+# Project access
+#
+# Single source of truth for "may this user see this project?". Membership
+# is answered with an EXISTS on the researchers through table (covered by its
+# unique (researchproject_id, user_id) index) and memoized on the user object,
+# which lives exactly as long as the request. Any change to the researchers
+# M2M bumps a generation counter (see apps/projects/signals.py) so memos
+# taken before the change are discarded.
+#
+# The ``a``-prefixed coroutines are the same checks for async views; they
+# share the memo and load the profile without blocking the event loop.
+# ──────────────────────────────────────────────
+
+_membership_generation = 0
+
+
+def invalidate_project_access():
+    """Discard memoized membership answers (called on researchers M2M changes)."""
+    global _membership_generation
+    _membership_generation += 1
+
+
+def is_admin(user):
+    """Return True if the user holds the ADMIN profile role."""
+    return user.is_authenticated and user.profile.role == Profile.Role.ADMIN
+
+
+def _membership_memo(user):
+    memo = getattr(user, '_project_access_memo', None)
+    if memo is None or memo[0] != _membership_generation:
+        memo = (_membership_generation, {})
+        user._project_access_memo = memo
+    return memo[1]
+
+
+def is_project_member(user, project):
+    """Return True if the user is assigned to ``project`` (a project or its id)."""
+    if not user.is_authenticated:
+        return False
+    project_id = getattr(project, 'pk', project)
+    memo = _membership_memo(user)
+    if project_id not in memo:
+        memo[project_id] = ResearchProject.researchers.through.objects.filter(
+            researchproject_id=project_id,
+            user_id=user.pk,
+        ).exists()
+    return memo[project_id]
+
+
+def user_can_access_project(user, project):
+    """Return True if the user is ADMIN or an assigned researcher."""
+    return is_admin(user) or is_project_member(user, project)
+
+
+async def _aload_profile(user):
+    if not Profile.user.field.remote_field.is_cached(user):
+        user.profile = await Profile.objects.aget(user=user)
+    return user.profile
+
+
+async def arequest_user(request):
+    """
+    Resolve the requesting user (with profile) from an async view.
+
+    The user is also installed as ``request.user``: templates render
+    synchronously and read it through the auth context processor, which
+    would otherwise query the database from the event loop.
+    """
+    user = await request.auser()
+    if user.is_authenticated:
+        await _aload_profile(user)
+    request.user = user
+    return user
+
+
+async def ais_admin(user):
+    """Async ``is_admin``."""
+    return user.is_authenticated and (await _aload_profile(user)).role == Profile.Role.ADMIN
+
+
+async def ais_project_member(user, project):
+    """Async ``is_project_member``."""
+    if not user.is_authenticated:
+        return False
+    project_id = getattr(project, 'pk', project)
+    memo = _membership_memo(user)
+    if project_id not in memo:
+        memo[project_id] = await ResearchProject.researchers.through.objects.filter(
+            researchproject_id=project_id,
+            user_id=user.pk,
+        ).aexists()
+    return memo[project_id]
+
+
+async def auser_can_access_project(user, project):
+    """Async ``user_can_access_project``."""
+    return await ais_admin(user) or await ais_project_member(user, project)
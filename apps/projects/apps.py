@@ -6,3 +6,5 @@ class ProjectsConfig(AppConfig):
     name = 'apps.projects'
     verbose_name = 'Projects'
 
+    def ready(self):
+        import apps.projects.signals  # noqa: F401
@@ -0,0 +1,71 @@
+import hashlib
+import time
+
+from django.contrib.messages import get_messages
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+# ──────────────────────────────────────────────
+# Conditional responses
+#
+# ``ResearchProject.updated_at`` moves whenever anything shown on a project's
+# pages changes: the project and its team, its documents and messages, and
+# the names of the users on them (see apps/projects/signals.py). Views that
+# load the project anyway answer If-None-Match / If-Modified-Since from that
+# row with a 304, before any further query or rendering.
+#
+# The ETag also covers what differs between viewers: the user, whatever the
+# view passes (e.g. the admin flag) and the CSRF token embedded in forms.
+# It is weak: the page may go out compressed (researchcollab/compression.py),
+# and a 304 must carry the same ETag as the 200 it validates.
+# Requests with flash messages waiting are never answered with a 304, or
+# the messages would be shown on some later page instead.
+#
+# HTTP dates have whole seconds, and two changes may fall within one. A
+# request with If-None-Match is judged by the ETag alone. Otherwise the page
+# counts as modified until the first whole second after ``updated_at``, so an
+# If-Modified-Since equal to the change's own second gets the page again.
+# Last-Modified is only sent once that second has passed; a copy fetched
+# earlier carries no date that could later validate it.
+# ──────────────────────────────────────────────
+
+def project_validators(request, project, *parts):
+    """Return ``(etag, last_modified)`` for a page about ``project`` as ``request.user`` sees it."""
+    key = ':'.join(str(part) for part in (
+        project.pk, project.version, project.updated_at.isoformat(),
+        request.user.pk, request.META.get('CSRF_COOKIE', ''), *parts,
+    ))
+    return f'W/"{hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()}"', project.updated_at
+
+
+def not_modified(request, etag, last_modified):
+    """A 304 (or 412) response when the client's copy is still current, else None."""
+    if request.method not in ('GET', 'HEAD') or len(get_messages(request)):
+        return None
+    # Django ignores If-Modified-Since when If-None-Match is present.
+    response = get_conditional_response(request, etag=etag, last_modified=_date_stamp(last_modified))
+    if response is not None:
+        _set_validators(response, etag, last_modified)
+    return response
+
+
+def _date_stamp(last_modified):
+    """The first whole second after ``last_modified``: the earliest date that can vouch for it."""
+    return int(last_modified.timestamp()) + 1
+
+
+def _set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    stamp = _date_stamp(last_modified)
+    if time.time() >= stamp:
+        response['Last-Modified'] = http_date(stamp)
+    # Revalidate every time, and never from a shared cache: pages are per user.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def with_validators(request, response, etag, last_modified):
+    """Add the ETag / Last-Modified of ``project_validators`` to a full GET response."""
+    if request.method not in ('GET', 'HEAD') or response.status_code != 200:
+        return response
+    return _set_validators(response, etag, last_modified)
@@ -0,0 +1,84 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+# ──────────────────────────────────────────────
+# Versioned fragment caching
+#
+# Lists render one small template per row (project rows, message bubbles).
+# Each row's HTML is cached under a key built from the object's id and
+# ``version`` — bumped by signals whenever anything the row shows changes —
+# plus whatever else varies the output (counts, viewer role). A changed row
+# simply gets a new key, so nothing is ever invalidated explicitly and stale
+# entries age out of the cache.
+#
+# A page costs one ``get_many`` and, for rows that missed, one ``set_many``.
+# ──────────────────────────────────────────────
+
+
+def fragment_key(template_name, *parts):
+    """Cache key for one rendering of ``template_name`` varying on ``parts``."""
+    raw = ':'.join(str(part) for part in parts)
+    digest = hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+    return f'fragment:{template_name}:{digest}'
+
+
+def render_fragments(request, template_name, items, name, key_parts, context=None, prepare=None):
+    """
+    Return the rendered HTML of ``template_name`` for each of ``items``, in order.
+
+    name      → context variable each item is exposed as.
+    key_parts → ``item -> tuple`` of everything besides the template that the
+                output depends on (normally ``pk``, ``version`` and viewer flags).
+    prepare   → optional ``callable(missed_items)`` that loads what rendering
+                needs, so related data is only fetched for rows not in cache.
+    """
+    items = list(items)
+    keys = [fragment_key(template_name, *key_parts(item)) for item in items]
+    cached = cache.get_many(keys)
+
+    missed = [item for item, key in zip(items, keys) if key not in cached]
+    if missed and prepare is not None:
+        prepare(missed)
+
+    fragments, rendered = _render_missing(request, template_name, items, keys, cached, name, context)
+    if rendered:
+        cache.set_many(rendered, settings.FRAGMENT_CACHE_TIMEOUT)
+    return fragments
+
+
+async def arender_fragments(request, template_name, items, name, key_parts, context=None, prepare=None):
+    """
+    Async ``render_fragments`` for async views.
+
+    The cache round trips are awaited and ``prepare``, if given, must be a
+    coroutine function (e.g. wrapping ``aprefetch_related_objects``).
+    """
+    items = list(items)
+    keys = [fragment_key(template_name, *key_parts(item)) for item in items]
+    cached = await cache.aget_many(keys)
+
+    missed = [item for item, key in zip(items, keys) if key not in cached]
+    if missed and prepare is not None:
+        await prepare(missed)
+
+    fragments, rendered = _render_missing(request, template_name, items, keys, cached, name, context)
+    if rendered:
+        await cache.aset_many(rendered, settings.FRAGMENT_CACHE_TIMEOUT)
+    return fragments
+
+
+def _render_missing(request, template_name, items, keys, cached, name, context):
+    """Return ``(fragments, newly_rendered_by_key)``, rendering what ``cached`` lacks."""
+    template = get_template(template_name)
+    rendered = {}
+    fragments = []
+    for item, key in zip(items, keys):
+        html = cached.get(key)
+        if html is None:
+            html = rendered[key] = template.render({**(context or {}), name: item}, request)
+        fragments.append(mark_safe(html))
+    return fragments, rendered
@@ -0,0 +1,268 @@
+import json
+import logging
+import re
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Substr
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from apps.accounts.models import Profile
+from apps.communication.views import MESSAGES_PER_PAGE
+from apps.documents.models import DocumentText
+from apps.documents.views import PREVIEW_CHARS
+from apps.projects.models import ResearchProject
+from apps.projects.pagination import keyset_paginate
+from apps.projects.views import PROJECTS_PER_PAGE, _project_list_queryset
+from apps.search.query import search
+from apps.stats import rollups
+from apps.stats.models import Rollup
+from researchcollab.instrumentation import QueryBudgetExceeded
+from researchcollab.views import ROUTES
+
+# Routes that change the session or cannot be replayed without a form.
+SKIPPED_URLS = {'/logout/'}
+PLACEHOLDER_RE = re.compile(r'<(\w+)>')
+OVER_BUDGET = 'over budget'
+
+
+async def _drain(chunks):
+    # Async streams (e.g. the JSON API) can't be iterated from a sync client.
+    async for _chunk in chunks:
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Time every GET route listed on /routes/ and the key querysets behind '
+        'them against the current database (see seed_scale), reporting query '
+        'count, wall time and peak Python memory. Fails when a view exceeds its '
+        '@query_budget and, with --baseline, when a query count grows or a '
+        'timing regresses beyond --tolerance.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--researcher', help='Researcher to browse as (default: the most-assigned one).')
+        parser.add_argument('--admin', help='Admin to browse as (default: the first one).')
+        parser.add_argument('--terms', default='analysis', help='Search terms (default: "analysis").')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per target (default: 5).')
+        parser.add_argument('--only', choices=['views', 'querysets'], help='Benchmark only one kind of target.')
+        parser.add_argument('--save', help='Write results as JSON to this path.')
+        parser.add_argument('--baseline', help='Compare against results saved earlier with --save.')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.5,
+            help='Allowed slowdown against the baseline median, as a fraction (default: 0.5).',
+        )
+        parser.add_argument(
+            '--min-ms', type=float, default=5.0,
+            help='Timings below this are too noisy to flag as regressions (default: 5).',
+        )
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be positive.')
+        if settings.DEBUG:
+            self.stderr.write(self.style.WARNING('DEBUG is on; timings will not match production.'))
+
+        researcher = self._user(options['researcher'], Profile.Role.RESEARCHER)
+        admin = self._user(options['admin'], Profile.Role.ADMIN)
+        project = self._busiest_project(researcher)
+        document = project.documents.order_by('-uploaded_at').first() if project else None
+        values = {
+            'id': project and project.pk,
+            'project_id': project and project.pk,
+            'document_id': document and document.pk,
+            'terms': options['terms'].replace(' ', '+'),
+        }
+
+        targets = []
+        if options['only'] != 'querysets':
+            targets += self._view_targets({'researcher': researcher, 'admin': admin}, values)
+        if options['only'] != 'views':
+            targets += self._queryset_targets(researcher, admin, project, options['terms'])
+
+        results = {}
+        # Expected 403s/404s and the per-request timing lines would otherwise
+        # be logged on every run.
+        quiet = {name: logging.getLogger(name) for name in ('django.request', 'researchcollab.performance')}
+        levels = {name: logger.level for name, logger in quiet.items()}
+        for logger in quiet.values():
+            logger.setLevel(logging.ERROR)
+        try:
+            with override_settings(QUERY_BUDGET_STRICT=True):
+                for name, fn in targets:
+                    results[name] = self._measure(fn, options['repeat'])
+                    self._report(name, results[name])
+        finally:
+            for name, logger in quiet.items():
+                logger.setLevel(levels[name])
+
+        if options['save']:
+            Path(options['save']).write_text(json.dumps(results, indent=2, sort_keys=True))
+            self.stdout.write(f'Results written to {options["save"]}.')
+        over_budget = [name for name, result in results.items() if result['status'] == OVER_BUDGET]
+        if over_budget:
+            raise CommandError('Views over their @query_budget:\n  ' + '\n  '.join(over_budget))
+        if options['baseline']:
+            self._compare(results, options)
+
+    # ──────────────────────────────────────────────
+    # Fixtures
+    # ──────────────────────────────────────────────
+
+    def _user(self, username, role):
+        users = User.objects.filter(profile__role=role)
+        if username:
+            user = users.filter(username=username).first()
+            if user is None:
+                raise CommandError(f'No {role.lower()} named "{username}".')
+            return user
+        if role == Profile.Role.RESEARCHER:
+            # The researcher with the most assignments sees the heaviest pages.
+            users = users.annotate(assignments=Count('assigned_projects')).order_by('-assignments', 'pk')
+        else:
+            users = users.order_by('pk')
+        user = users.first()
+        if user is None:
+            raise CommandError(f'No {role.lower()} users exist; run seed_scale first.')
+        return user
+
+    def _busiest_project(self, researcher):
+        """The researcher's project with the longest thread, from the stats rollups."""
+        project_ids = list(researcher.assigned_projects.values_list('pk', flat=True))
+        ranked = (
+            Rollup.objects
+            .filter(bucket__in=[rollups.project_bucket(pk) for pk in project_ids], metric=rollups.MESSAGES)
+            .order_by('-value')
+            .values_list('bucket', flat=True)
+            .first()
+        )
+        pk = int(ranked.split(':', 1)[1]) if ranked else (project_ids[0] if project_ids else None)
+        return ResearchProject.objects.filter(pk=pk).first()
+
+    # ──────────────────────────────────────────────
+    # Targets
+    # ──────────────────────────────────────────────
+
+    def _view_targets(self, users, values):
+        targets = []
+        for role, user in users.items():
+            client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+            client.force_login(user)
+            for section in ROUTES:
+                for item in section['items']:
+                    if 'GET' not in item['method'] or item['url'] in SKIPPED_URLS:
+                        continue
+                    url = PLACEHOLDER_RE.sub(lambda m: str(values.get(m.group(1)) or ''), item['url'])
+                    if '//' in url.split('?')[0]:
+                        # A placeholder had nothing to fill it (e.g. no documents yet).
+                        continue
+                    targets.append((f'view {role}: {item["name"]}', self._get(client, url)))
+        return targets
+
+    def _get(self, client, url):
+        def fetch():
+            try:
+                response = client.get(url)
+            except QueryBudgetExceeded:
+                return OVER_BUDGET
+            if response.streaming and response.is_async:
+                async_to_sync(_drain)(response.streaming_content)
+            elif response.streaming:
+                for _chunk in response.streaming_content:
+                    pass
+            response.close()
+            return response.status_code
+        return fetch
+
+    def _queryset_targets(self, researcher, admin, project, terms):
+        targets = [
+            ('qs: project page (researcher)', lambda: list(keyset_paginate(
+                _project_list_queryset(researcher.assigned_projects.all()), per_page=PROJECTS_PER_PAGE,
+            ))),
+            ('qs: project page (admin)', lambda: list(keyset_paginate(
+                _project_list_queryset(ResearchProject.objects.all()), per_page=PROJECTS_PER_PAGE,
+            ))),
+            ('qs: search (researcher)', lambda: search(researcher, terms)),
+            ('qs: search (admin)', lambda: search(admin, terms)),
+            ('qs: dashboard rollups', lambda: (
+                rollups.read(rollups.GLOBAL, rollups.user_bucket(researcher.pk)),
+                rollups.daily_series([rollups.MESSAGES, rollups.DOCUMENTS]),
+                rollups.top_projects(rollups.MESSAGES),
+            )),
+        ]
+        if project is not None:
+            first_chunk = DocumentText.objects.filter(document=OuterRef('pk'), index=0).values('text')[:1]
+            targets += [
+                ('qs: document list with previews', lambda: list(
+                    project.documents.select_related('uploaded_by')
+                    .annotate(preview=Substr(Subquery(first_chunk), 1, PREVIEW_CHARS))
+                )),
+                ('qs: newest thread page', lambda: list(keyset_paginate(
+                    project.messages.all(), per_page=MESSAGES_PER_PAGE,
+                ))),
+            ]
+        return targets
+
+    # ──────────────────────────────────────────────
+    # Measurement
+    # ──────────────────────────────────────────────
+
+    def _measure(self, fn, repeat):
+        """Run ``fn`` once to warm up, ``repeat`` times timed, then once under tracemalloc."""
+        status = fn()
+        timings = []
+        for _ in range(repeat):
+            # The query log is capped; once full, captured slices come back empty.
+            reset_queries()
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                fn()
+                timings.append((time.perf_counter() - start) * 1000)
+        # Tracing slows execution, so memory gets a run of its own.
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return {
+            'status': status if isinstance(status, (int, str)) else None,
+            'queries': len(queries.captured_queries),
+            'median_ms': round(statistics.median(timings), 2),
+            'min_ms': round(min(timings), 2),
+            'peak_kib': round(peak / 1024, 1),
+        }
+
+    def _report(self, name, result):
+        status = f'[{result["status"]}] ' if result['status'] else ''
+        self.stdout.write(
+            f'{name:<48} {status}{result["queries"]:>4} queries  '
+            f'{result["median_ms"]:>9.2f} ms median  {result["min_ms"]:>9.2f} ms min  '
+            f'{result["peak_kib"]:>9.1f} KiB peak'
+        )
+
+    def _compare(self, results, options):
+        baseline = json.loads(Path(options['baseline']).read_text())
+        regressions = []
+        for name, result in results.items():
+            before = baseline.get(name)
+            if before is None:
+                continue
+            if result['queries'] > before['queries']:
+                regressions.append(f'{name}: {before["queries"]} → {result["queries"]} queries')
+            limit = before['median_ms'] * (1 + options['tolerance'])
+            if result['median_ms'] > max(limit, options['min_ms']):
+                regressions.append(f'{name}: {before["median_ms"]:.2f} → {result["median_ms"]:.2f} ms')
+        if regressions:
+            raise CommandError('Performance regressions:\n  ' + '\n  '.join(regressions))
+        self.stdout.write(self.style.SUCCESS(f'No regressions against {options["baseline"]}.'))
@@ -0,0 +1,283 @@
+import asyncio
+import logging
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from apps.accounts.models import Profile
+
+STACKS = ('wsgi', 'asgi')
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the throughput of the sync (WSGI) and async (ASGI) serving '
+        'stacks on the read-mostly project pages. Simulated clients request '
+        'the project list, a project, its documents and its discussion '
+        'back to back. WSGI gets a fixed pool of --workers, each serving one '
+        'request at a time, like gunicorn sync workers. ASGI serves every '
+        'client from one event loop, as a uvicorn worker does. Both run in '
+        'this one process, so the comparison measures concurrency on slow '
+        'I/O rather than CPU parallelism; use --db-latency-ms to model a '
+        'slow or remote database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--researcher', help='Researcher to browse as (default: the most-assigned one).')
+        parser.add_argument('--requests', type=int, default=400, help='Requests per stack (default: 400).')
+        parser.add_argument('--concurrency', type=int, default=50, help='Simultaneous clients (default: 50).')
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Sync workers for the WSGI stack (default: 4).',
+        )
+        parser.add_argument(
+            '--db-latency-ms', type=float, default=0.0,
+            help='Extra delay added to every query (default: 0).',
+        )
+        parser.add_argument('--only', choices=STACKS, help='Benchmark only one stack.')
+
+    def handle(self, *args, **options):
+        for name in ('requests', 'concurrency', 'workers'):
+            if options[name] < 1:
+                raise CommandError(f'--{name} must be positive.')
+        if settings.DEBUG:
+            self.stderr.write(self.style.WARNING('DEBUG is on; timings will not match production.'))
+
+        user, paths = self._login(options['researcher'])
+
+        # Each client issues its share of the requests, cycling through the pages.
+        schedule = [
+            [paths[(client_no + n) % len(paths)] for n in range(share)]
+            for client_no, share in enumerate(self._shares(options['requests'], options['concurrency']))
+        ]
+        self.stdout.write(
+            f'{options["requests"]} requests from {options["concurrency"]} clients as {user.username}, '
+            f'+{options["db_latency_ms"]:g} ms per query.'
+        )
+
+        results = {}
+        quiet = logging.getLogger('researchcollab.performance')
+        level = quiet.level
+        quiet.setLevel(logging.WARNING)
+        try:
+            with _db_latency(options['db_latency_ms'] / 1000):
+                if options['only'] != 'asgi':
+                    results['wsgi'] = self._run_wsgi(schedule, options['workers'])
+                    self._report(f'wsgi ({options["workers"]} workers)', results['wsgi'])
+                if options['only'] != 'wsgi':
+                    results['asgi'] = asyncio.run(self._run_asgi(schedule))
+                    self._report('asgi (1 event loop)', results['asgi'])
+        finally:
+            quiet.setLevel(level)
+            connections.close_all()
+
+        if len(results) == 2 and results['wsgi']['throughput']:
+            ratio = results['asgi']['throughput'] / results['wsgi']['throughput']
+            self.stdout.write(self.style.SUCCESS(f'ASGI throughput is {ratio:.2f}× WSGI.'))
+
+    # ──────────────────────────────────────────────
+    # Fixtures
+    # ──────────────────────────────────────────────
+
+    def _login(self, username):
+        """Log the researcher in for the simulated clients; return it and the pages to request."""
+        user = self._researcher(username)
+        project = user.assigned_projects.order_by('pk').first()
+        if project is None:
+            raise CommandError(f'{user.username} is not assigned to any project; run seed_scale first.')
+        client = Client()
+        client.force_login(user)
+        self.cookie = f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+        self.host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'
+        return user, [
+            reverse('projects:project_list'),
+            reverse('projects:project_detail', kwargs={'pk': project.pk}),
+            reverse('documents:document_list', kwargs={'project_id': project.pk}),
+            reverse('communication:project_messages', kwargs={'project_id': project.pk}),
+        ]
+
+    def _researcher(self, username):
+        users = User.objects.filter(profile__role=Profile.Role.RESEARCHER)
+        if username:
+            user = users.filter(username=username).first()
+            if user is None:
+                raise CommandError(f'No researcher named "{username}".')
+            return user
+        user = users.annotate(assignments=Count('assigned_projects')).order_by('-assignments', 'pk').first()
+        if user is None:
+            raise CommandError('No researchers exist; run seed_scale first.')
+        return user
+
+    @staticmethod
+    def _shares(total, clients):
+        clients = min(clients, total)
+        return [total // clients + (1 if n < total % clients else 0) for n in range(clients)]
+
+    # ──────────────────────────────────────────────
+    # Stacks
+    # ──────────────────────────────────────────────
+
+    def _run_wsgi(self, schedule, workers):
+        handler = WSGIHandler()
+        latencies, statuses = [], []
+        lock = threading.Lock()
+
+        def serve(path):
+            environ = {
+                'REQUEST_METHOD': 'GET',
+                'PATH_INFO': path,
+                'QUERY_STRING': '',
+                'SERVER_NAME': self.host,
+                'SERVER_PORT': '80',
+                'SERVER_PROTOCOL': 'HTTP/1.1',
+                'HTTP_HOST': self.host,
+                'HTTP_COOKIE': self.cookie,
+                'wsgi.url_scheme': 'http',
+                'wsgi.input': BytesIO(),
+                'wsgi.errors': BytesIO(),
+                'wsgi.multithread': True,
+                'wsgi.multiprocess': False,
+                'wsgi.run_once': False,
+            }
+            status = []
+            body = handler(environ, lambda line, headers, exc_info=None: status.append(int(line.split()[0])))
+            try:
+                for _chunk in body:
+                    pass
+            finally:
+                body.close()
+            return status[0]
+
+        def client(paths):
+            for path in paths:
+                start = time.perf_counter()
+                status = pool.submit(serve, path).result()
+                with lock:
+                    latencies.append(time.perf_counter() - start)
+                    statuses.append(status)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            threads = [threading.Thread(target=client, args=(paths,)) for paths in schedule]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+        return self._summary(latencies, statuses, elapsed)
+
+    async def _run_asgi(self, schedule):
+        handler = ASGIHandler()
+        latencies, statuses = [], []
+
+        async def serve(path):
+            finished = asyncio.Event()
+            sent_body = False
+            status = []
+
+            async def receive():
+                nonlocal sent_body
+                if not sent_body:
+                    sent_body = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await finished.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    status.append(message['status'])
+
+            scope = {
+                'type': 'http',
+                'asgi': {'version': '3.0'},
+                'http_version': '1.1',
+                'method': 'GET',
+                'scheme': 'http',
+                'path': path,
+                'raw_path': path.encode(),
+                'root_path': '',
+                'query_string': b'',
+                'headers': [(b'host', self.host.encode()), (b'cookie', self.cookie.encode())],
+                'client': ('127.0.0.1', 0),
+                'server': (self.host, 80),
+            }
+            try:
+                await handler(scope, receive, send)
+            finally:
+                finished.set()
+            return status[0]
+
+        async def client(paths):
+            for path in paths:
+                start = time.perf_counter()
+                status = await serve(path)
+                latencies.append(time.perf_counter() - start)
+                statuses.append(status)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client(paths) for paths in schedule))
+        return self._summary(latencies, statuses, time.perf_counter() - start)
+
+    # ──────────────────────────────────────────────
+    # Reporting
+    # ──────────────────────────────────────────────
+
+    @staticmethod
+    def _summary(latencies, statuses, elapsed):
+        latencies = sorted(latencies)
+        return {
+            'errors': sum(1 for status in statuses if status != 200),
+            'elapsed': elapsed,
+            'throughput': len(latencies) / elapsed if elapsed else 0,
+            'p50_ms': statistics.median(latencies) * 1000,
+            'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000 if len(latencies) > 1 else latencies[0] * 1000,
+        }
+
+    def _report(self, name, result):
+        errors = self.style.ERROR(f'  {result["errors"]} errors') if result['errors'] else ''
+        self.stdout.write(
+            f'{name:<22} {result["throughput"]:>8.1f} req/s  {result["p50_ms"]:>9.1f} ms p50  '
+            f'{result["p95_ms"]:>9.1f} ms p95  {result["elapsed"]:>7.2f} s{errors}'
+        )
+
+
+@contextmanager
+def _db_latency(seconds):
+    """Delay every query by ``seconds`` on all connections, including ones opened meanwhile."""
+    if not seconds:
+        yield
+        return
+
+    def delay(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def install(connection, **kwargs):
+        # Fires on every reconnect of a wrapper, not only its first.
+        if delay not in connection.execute_wrappers:
+            connection.execute_wrappers.append(delay)
+
+    connection_created.connect(install)
+    for connection in connections.all(initialized_only=True):
+        install(connection)
+    try:
+        yield
+    finally:
+        connection_created.disconnect(install)
+        for connection in connections.all(initialized_only=True):
+            if delay in connection.execute_wrappers:
+                connection.execute_wrappers.remove(delay)
@@ -0,0 +1,49 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.projects.membership import (
+    MembershipError, apply_membership_changes, read_membership_rows, resolve_membership_rows,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Add and remove researchers across projects from a CSV or JSON file. '
+        'Columns/keys: project_id, username (or user_id), action (add or remove, '
+        'default add). Links that are already as asked are left alone.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (with header row) or JSON array file to import.')
+        parser.add_argument(
+            '--format', choices=['csv', 'json'],
+            help='Input format (default: inferred from the file extension).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Links inserted per bulk_create (default: 1000).',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Report the changes without making them.')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'{path} does not exist.')
+        fmt = options['format'] or ('json' if path.suffix.lower() == '.json' else 'csv')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+
+        try:
+            add, remove = resolve_membership_rows(read_membership_rows(path.read_text(encoding='utf-8'), fmt))
+            counts = apply_membership_changes(
+                add, remove, dry_run=options['dry_run'], batch_size=options['batch_size'],
+            )
+        except MembershipError as exc:
+            raise CommandError(str(exc))
+
+        add_verb, remove_verb = ('Would add', 'remove') if options['dry_run'] else ('Added', 'removed')
+        self.stdout.write(self.style.SUCCESS(
+            f'{add_verb} {counts["added"]} and {remove_verb} {counts["removed"]} researcher link(s); '
+            f'{counts["unchanged"]} unchanged.'
+        ))
@@ -0,0 +1,190 @@
+import asyncio
+import runpy
+import threading
+import time
+import weakref
+
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+
+from apps.projects.management.commands import benchmark_serving
+from researchcollab.warmup import check_connection_limits
+
+
+class Command(benchmark_serving.Command):
+    help = (
+        'Load the project pages through the ASGI stack at rising concurrency '
+        'and report the peak number of database connections at each level. '
+        'With DB_POOL on (PostgreSQL, psycopg 3) the peak should stay within '
+        'the pool\'s max size however many clients there are. Without a pool '
+        'it grows with concurrency. Connections are counted on the server '
+        'from pg_stat_activity; on other databases, this process\'s open '
+        'connections are counted. It then checks that --processes pooled '
+        'processes (by default the gunicorn workers gunicorn.conf.py would start '
+        'here plus TASK_WORKER_PROCESSES) fit within each PostgreSQL server\'s '
+        'connection limit, and fails if they do not.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--researcher', help='Researcher to browse as (default: the most-assigned one).')
+        parser.add_argument(
+            '--levels', default='1,5,10,25,50',
+            help='Comma-separated numbers of simultaneous clients (default: 1,5,10,25,50).',
+        )
+        parser.add_argument(
+            '--requests-per-client', type=int, default=8,
+            help='Requests each client makes per level (default: 8).',
+        )
+        parser.add_argument(
+            '--db-latency-ms', type=float, default=20.0,
+            help='Extra delay added to every query, so connections are held long enough to overlap (default: 20).',
+        )
+        parser.add_argument(
+            '--max-connections', type=int,
+            help='Fail if any level peaks above this (default: the pool\'s max size when pooling is on).',
+        )
+        parser.add_argument(
+            '--processes', type=int,
+            help='Processes sharing the database server (default: gunicorn workers plus task workers).',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in options['levels'].split(',')]
+        except ValueError:
+            raise CommandError('--levels must be comma-separated integers.')
+        if not levels or min(levels) < 1 or options['requests_per_client'] < 1:
+            raise CommandError('--levels and --requests-per-client must be positive.')
+        processes = options['processes'] or self._deployed_processes()
+        if processes < 1:
+            raise CommandError('--processes must be positive.')
+
+        pool = settings.DATABASES['default'].get('OPTIONS', {}).get('pool')
+        limit = options['max_connections']
+        if limit is None and isinstance(pool, dict):
+            limit = pool.get('max_size')
+
+        _, paths = self._login(options['researcher'])
+        # The command's own connection must not be counted as load.
+        connection.close()
+
+        sampler = _ServerConnections() if connection.vendor == 'postgresql' else _ProcessConnections()
+        if not pool:
+            pooling = 'off'
+        elif isinstance(pool, dict):
+            pooling = f'on, max_size={pool.get("max_size", "default")}'
+        else:
+            pooling = 'on'
+        self.stdout.write(
+            f'Pooling {pooling}; counting {sampler.description}; '
+            f'+{options["db_latency_ms"]:g} ms per query.'
+        )
+        self.stdout.write(f'{"clients":>8} {"req/s":>9} {"p95 ms":>9} {"errors":>7} {"peak conns":>11}')
+
+        over, highest = [], 0
+        with benchmark_serving._db_latency(options['db_latency_ms'] / 1000), sampler:
+            for level in levels:
+                schedule = [
+                    [paths[(client_no + n) % len(paths)] for n in range(options['requests_per_client'])]
+                    for client_no in range(level)
+                ]
+                sampler.reset()
+                result = asyncio.run(self._run_asgi(schedule))
+                peak = sampler.peak
+                highest = max(highest, peak)
+                self.stdout.write(
+                    f'{level:>8} {result["throughput"]:>9.1f} {result["p95_ms"]:>9.1f} '
+                    f'{result["errors"]:>7} {peak:>11}'
+                )
+                if limit is not None and peak > limit:
+                    over.append(f'{level} clients: {peak} connections')
+                connections.close_all()
+
+        self.stdout.write(
+            f'{processes} processes at this peak would hold {processes * highest} connections'
+            + (f' (at most {processes * limit} by the pool size).' if limit is not None else '.')
+        )
+        if over:
+            raise CommandError(f'Connections exceeded {limit}:\n  ' + '\n  '.join(over))
+        exhausted = check_connection_limits(processes)
+        if exhausted:
+            raise CommandError(
+                f'{processes} processes could exhaust the database server:\n  ' + '\n  '.join(
+                    f'{server}: up to {needed} connections, limit {server_limit}'
+                    for server, (needed, server_limit) in exhausted.items()
+                )
+            )
+        if limit is not None:
+            self.stdout.write(self.style.SUCCESS(f'Connections stayed within {limit} at every level.'))
+
+    def _deployed_processes(self):
+        # What gunicorn.conf.py sizes for this machine, plus the task workers.
+        config = runpy.run_path(str(settings.BASE_DIR / 'gunicorn.conf.py'))
+        return config['workers'] + settings.TASK_WORKER_PROCESSES
+
+
+class _Sampler:
+    """Poll a connection count in a background thread and remember its peak."""
+    interval = 0.01
+
+    def __enter__(self):
+        self._stop = threading.Event()
+        self.peak = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def reset(self):
+        self.peak = 0
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.count())
+            time.sleep(self.interval)
+
+
+class _ServerConnections(_Sampler):
+    description = 'server-side client backends (pg_stat_activity)'
+
+    def __enter__(self):
+        # A raw connection of its own, outside Django's pool, excluded from the count.
+        self._connection = connection.Database.connect(**connection.get_connection_params())
+        self._connection.autocommit = True
+        return super().__enter__()
+
+    def __exit__(self, *exc_info):
+        super().__exit__(*exc_info)
+        self._connection.close()
+
+    def count(self):
+        with self._connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*) FROM pg_stat_activity WHERE datname = current_database() "
+                "AND backend_type = 'client backend' AND pid <> pg_backend_pid()"
+            )
+            return cursor.fetchone()[0]
+
+
+class _ProcessConnections(_Sampler):
+    description = 'connections open in this process'
+
+    def __enter__(self):
+        self._wrappers = weakref.WeakSet()
+        connection_created.connect(self._track)
+        return super().__enter__()
+
+    def __exit__(self, *exc_info):
+        super().__exit__(*exc_info)
+        connection_created.disconnect(self._track)
+
+    def _track(self, connection, **kwargs):
+        self._wrappers.add(connection)
+
+    def count(self):
+        return sum(1 for wrapper in list(self._wrappers) if wrapper.connection is not None)
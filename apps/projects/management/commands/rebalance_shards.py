@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from apps.projects.models import ProjectShard
+from apps.projects.sharding import move_project, place_project, project_databases
+
+PROCESS_LOCAL_CACHES = ('.LocMemCache', '.DummyCache')
+
+
+class Command(BaseCommand):
+    help = (
+        'Move projects, with their memberships, messages, documents and search '
+        'entries, between project databases. "rebalance_shards 12 57 --to shard2" '
+        'moves the given projects; "rebalance_shards --drain default" empties a '
+        'database, sending each project where its id places it among the other '
+        'shards (or to --to). Without arguments, prints how many projects each '
+        'database holds. Running web and task workers see a move at once only '
+        'with a shared cache (REDIS_URL); with per-process caches each one '
+        'finds out when it next misses the project on its old database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('project_ids', nargs='*', type=int, help='Projects to move.')
+        parser.add_argument('--to', help='Target database alias.')
+        parser.add_argument('--drain', metavar='ALIAS', help='Move every project off this database.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows copied per batch (default: 1000).')
+        parser.add_argument('--dry-run', action='store_true', help='List the moves without making them.')
+
+    def handle(self, *args, **options):
+        if not settings.PROJECT_SHARDS:
+            raise CommandError('No project shards are configured (DATABASE_SHARD_URLS).')
+        databases = project_databases()
+        for alias in filter(None, (options['to'], options['drain'])):
+            if alias not in databases:
+                raise CommandError(f'"{alias}" is not a project database; choose from {", ".join(databases)}.')
+
+        if options['drain']:
+            if options['project_ids']:
+                raise CommandError('Give either project ids or --drain, not both.')
+            moves = self._drain_plan(options['drain'], options['to'])
+        elif options['project_ids']:
+            if not options['to']:
+                raise CommandError('--to is required when moving projects by id.')
+            moves = [(project_id, options['to']) for project_id in options['project_ids']]
+        else:
+            self._report()
+            return
+
+        if not options['dry_run'] and settings.CACHES['default']['BACKEND'].endswith(PROCESS_LOCAL_CACHES):
+            self.stderr.write(self.style.WARNING(
+                'The cache is per process: other processes keep their cached shard of a moved '
+                'project until a lookup misses there. Set REDIS_URL to share the directory cache.'
+            ))
+        for project_id, target in moves:
+            if options['dry_run']:
+                self.stdout.write(f'Would move project {project_id} to {target}.')
+                continue
+            try:
+                rows = move_project(project_id, target, batch_size=options['batch_size'])
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(f'Project {project_id} → {target} ({rows} rows).')
+        if not options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'Moved {len(moves)} project(s).'))
+            self._report()
+
+    def _drain_plan(self, source, target):
+        remaining = [alias for alias in settings.PROJECT_SHARDS if alias != source]
+        if not target and not remaining:
+            raise CommandError(f'There is no other shard to move the projects on {source} to.')
+        project_ids = ProjectShard.objects.filter(database=source).order_by('pk').values_list('pk', flat=True)
+        return [
+            (project_id, target or place_project(project_id, remaining))
+            for project_id in project_ids
+        ]
+
+    def _report(self):
+        counts = dict(
+            ProjectShard.objects.values_list('database').annotate(n=Count('pk')).order_by()
+        )
+        for alias in project_databases():
+            self.stdout.write(f'  {alias}: {counts.get(alias, 0)} project(s)')
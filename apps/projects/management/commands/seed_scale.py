@@ -0,0 +1,277 @@
+import random
+import secrets
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.accounts.models import Profile
+from apps.communication.models import ProjectMessage
+from apps.documents.models import Blob, Document
+from apps.documents.storage import blob_hash, document_storage
+from apps.projects.models import ResearchProject
+from apps.projects.sharding import allocate_project_ids, database_for_project, replicate_users
+from apps.search.indexing import entry_for
+from apps.search.models import SearchEntry
+
+Membership = ResearchProject.researchers.through
+
+WORDS = (
+    'analysis', 'assay', 'baseline', 'bias', 'calibration', 'cohort', 'control', 'correlation',
+    'dataset', 'deviation', 'distribution', 'enzyme', 'estimate', 'experiment', 'field', 'findings',
+    'genome', 'hypothesis', 'imaging', 'interval', 'isotope', 'journal', 'lab', 'latency', 'method',
+    'model', 'noise', 'outlier', 'protein', 'protocol', 'quantile', 'reagent', 'regression', 'replicate',
+    'sample', 'sensor', 'sequence', 'signal', 'simulation', 'spectrum', 'statistic', 'survey', 'thesis',
+    'trial', 'variance', 'velocity', 'workflow', 'yield',
+)
+
+
+def _sentence(rng, low, high):
+    return ' '.join(rng.choices(WORDS, k=rng.randint(low, high))).capitalize()
+
+
+@contextmanager
+def _explicit_timestamps(*fields):
+    """
+    Let bulk_create keep the timestamps we assign instead of ``now()``.
+
+    ``auto_now_add`` fields overwrite any value on insert; seeded rows need
+    history spread over time for pagination and date filters to mean anything.
+    """
+    saved = [(field, field.auto_now_add) for field in fields]
+    for field, _ in saved:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in saved:
+            field.auto_now_add = value
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a production-sized synthetic dataset for profiling, e.g. '
+        '"seed_scale --projects 50000 --messages 5000000". Rows are written with '
+        'bulk_create in batches, bypassing per-row signals; search entries, blob '
+        'reference counts and statistics rollups are written in bulk alongside. '
+        'Never run this against production.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Researchers to create (default: 1000).')
+        parser.add_argument('--projects', type=int, default=500, help='Projects to create (default: 500).')
+        parser.add_argument(
+            '--researchers-per-project', type=int, default=5,
+            help='Researchers assigned to each project (default: 5).',
+        )
+        parser.add_argument('--documents', type=int, default=2000, help='Documents to create (default: 2000).')
+        parser.add_argument('--messages', type=int, default=50000, help='Messages to create (default: 50000).')
+        parser.add_argument(
+            '--distinct-files', type=int, default=32,
+            help='Distinct file contents shared by the documents (default: 32).',
+        )
+        parser.add_argument('--days', type=int, default=365, help='Spread timestamps over this many days (default: 365).')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk_create (default: 5000).')
+        parser.add_argument('--seed', type=int, help='Random seed, for reproducible datasets.')
+        parser.add_argument(
+            '--password',
+            help='Password for every generated user. Without it they get an unusable password.',
+        )
+        parser.add_argument('--no-index', action='store_true', help='Skip writing search index entries.')
+
+    def handle(self, *args, **options):
+        for name in ('users', 'projects', 'documents', 'messages', 'researchers_per_project'):
+            if options[name] < 0:
+                raise CommandError(f'--{name.replace("_", "-")} cannot be negative.')
+        for name in ('batch_size', 'days', 'distinct_files'):
+            if options[name] < 1:
+                raise CommandError(f'--{name.replace("_", "-")} must be positive.')
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.index = not options['no_index']
+        self.now = timezone.now()
+        self.span = timedelta(days=options['days']).total_seconds()
+        # Keeps usernames unique across repeated runs against the same database.
+        self.run = secrets.token_hex(3)
+
+        admin, users = self._create_users(options['users'], options['password'])
+        members = self._create_projects(options['projects'], admin, users, options['researchers_per_project'])
+        self._create_documents(options['documents'], members, options['distinct_files'])
+        self._create_messages(options['messages'], members)
+
+        self.stdout.write('Reconciling statistics rollups…')
+        call_command('reconcile_stats', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded run "{self.run}". Admin user: {admin.username}. '
+            'Run extract_document_text to extract the seeded documents.'
+        ))
+
+    # ──────────────────────────────────────────────
+    # Helpers
+    # ──────────────────────────────────────────────
+
+    def _timestamp(self):
+        return self.now - timedelta(seconds=self.rng.random() * self.span)
+
+    def _batches(self, total):
+        """Yield the size of each batch needed to write ``total`` rows."""
+        for start in range(0, total, self.batch_size):
+            yield min(self.batch_size, total - start)
+
+    def _write_index(self, instances, database):
+        if self.index:
+            SearchEntry.objects.using(database).bulk_create([entry_for(instance) for instance in instances])
+
+    def _by_database(self, rows, project_attribute='project_id'):
+        """Group rows by the database of their project (see apps/projects/sharding.py)."""
+        groups = {}
+        for row in rows:
+            groups.setdefault(self.databases[getattr(row, project_attribute)], []).append(row)
+        return groups.items()
+
+    def _progress(self, label, done, total):
+        self.stdout.write(f'  {label}: {done}/{total}', ending='\r' if done < total else '\n')
+        self.stdout.flush()
+
+    # ──────────────────────────────────────────────
+    # Generators
+    # ──────────────────────────────────────────────
+
+    def _create_users(self, count, password):
+        # Hashing is deliberately slow (PBKDF2); do it once for everyone.
+        password = make_password(password) if password else make_password(None)
+        admin = User.objects.create(username=f'seed_{self.run}_admin', password=password)
+        Profile.objects.filter(user=admin).update(role=Profile.Role.ADMIN)
+        users = []
+        for batch in self._batches(count):
+            offset = len(users)
+            chunk = [
+                User(username=f'seed_{self.run}_{offset + n}', email=f'seed_{self.run}_{offset + n}@example.org', password=password)
+                for n in range(batch)
+            ]
+            with transaction.atomic():
+                User.objects.bulk_create(chunk)
+                # bulk_create skips post_save, so profiles are created here too.
+                Profile.objects.bulk_create([Profile(user_id=user.pk, role=Profile.Role.RESEARCHER) for user in chunk])
+                replicate_users(chunk)
+            users.extend(chunk)
+            self._progress('users', len(users), count)
+        return admin, users
+
+    def _create_projects(self, count, admin, users, per_project):
+        """Create projects and assignments; return ``{project_id: [member User, …]}``."""
+        members = {}
+        self.databases = {}
+        created = 0
+        statuses = [ResearchProject.Status.ACTIVE] * 4 + [ResearchProject.Status.COMPLETED]
+        with _explicit_timestamps(ResearchProject._meta.get_field('created_at')):
+            for batch in self._batches(count):
+                projects = [
+                    ResearchProject(
+                        title=_sentence(self.rng, 2, 6),
+                        description=_sentence(self.rng, 10, 40),
+                        created_by=admin,
+                        status=self.rng.choice(statuses),
+                        created_at=self._timestamp(),
+                    )
+                    for _ in range(batch)
+                ]
+                # Ids come from the shard directory, which also places each project.
+                for project, project_id in zip(projects, allocate_project_ids(batch)):
+                    project.pk = project_id
+                    self.databases[project_id] = database_for_project(project_id)
+                for database, group in self._by_database(projects, 'pk'):
+                    with transaction.atomic(using=database):
+                        ResearchProject.objects.using(database).bulk_create(group)
+                        links = []
+                        for project in group:
+                            team = self.rng.sample(users, min(per_project, len(users)))
+                            # Unstaffed projects get their creator as the only poster.
+                            members[project.pk] = team or [admin]
+                            links.extend(Membership(researchproject_id=project.pk, user_id=user.pk) for user in team)
+                        Membership.objects.using(database).bulk_create(links, batch_size=self.batch_size)
+                        self._write_index(group, database)
+                created += batch
+                self._progress('projects', created, count)
+        return members
+
+    def _create_documents(self, count, members, distinct):
+        if not count:
+            return
+        if not members:
+            raise CommandError('Documents need at least one project.')
+        storage = document_storage()
+        blobs = []
+        for n in range(distinct):
+            text = '\n'.join(_sentence(self.rng, 8, 20) for _ in range(self.rng.randint(5, 50)))
+            name = storage.save(f'seed-{n}.txt', ContentFile(text.encode()))
+            blobs.append((name, blob_hash(name), storage.size(name)))
+
+        references = dict.fromkeys((sha256 for _, sha256, _ in blobs), 0)
+        project_ids = list(members)
+        created = 0
+        with _explicit_timestamps(Document._meta.get_field('uploaded_at')):
+            for batch in self._batches(count):
+                documents = []
+                for _ in range(batch):
+                    project_id = self.rng.choice(project_ids)
+                    name, sha256, size = self.rng.choice(blobs)
+                    references[sha256] += 1
+                    title = _sentence(self.rng, 2, 5)
+                    documents.append(Document(
+                        project_id=project_id,
+                        uploaded_by_id=self.rng.choice(members[project_id]).pk,
+                        title=title,
+                        file=name,
+                        original_name=f'{title.lower().replace(" ", "-")}.txt',
+                        sha256=sha256,
+                        size=size,
+                        uploaded_at=self._timestamp(),
+                    ))
+                for database, group in self._by_database(documents):
+                    with transaction.atomic(using=database):
+                        Document.objects.using(database).bulk_create(group)
+                        self._write_index(group, database)
+                created += batch
+                self._progress('documents', created, count)
+
+        with transaction.atomic():
+            for name, sha256, size in blobs:
+                if references[sha256] and not Blob.objects.filter(pk=sha256).update(
+                    ref_count=F('ref_count') + references[sha256],
+                ):
+                    Blob.objects.create(sha256=sha256, size=size, ref_count=references[sha256])
+
+    def _create_messages(self, count, members):
+        if not count:
+            return
+        if not members:
+            raise CommandError('Messages need at least one project.')
+        project_ids = list(members)
+        created = 0
+        with _explicit_timestamps(ProjectMessage._meta.get_field('created_at')):
+            for batch in self._batches(count):
+                messages = []
+                for _ in range(batch):
+                    project_id = self.rng.choice(project_ids)
+                    messages.append(ProjectMessage(
+                        project_id=project_id,
+                        # The sender object (not just its id) is what the search entry reads.
+                        sender=self.rng.choice(members[project_id]),
+                        message=_sentence(self.rng, 4, 40),
+                        created_at=self._timestamp(),
+                    ))
+                for database, group in self._by_database(messages):
+                    with transaction.atomic(using=database):
+                        ProjectMessage.objects.using(database).bulk_create(group)
+                        self._write_index(group, database)
+                created += batch
+                self._progress('messages', created, count)
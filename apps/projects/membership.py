@@ -0,0 +1,171 @@
+import csv
+import io
+import json
+
+from django.contrib.auth.models import User
+from django.dispatch import Signal
+
+from apps.accounts.models import Profile
+from apps.projects.models import ResearchProject
+from apps.projects.sharding import database_atomic, database_for_project
+
+# ──────────────────────────────────────────────
+# Bulk membership
+#
+# Adds and removes researchers across many projects at once, from rows of
+# ``project_id``, ``username`` (or ``user_id``) and ``action`` (``add``, the
+# default, or ``remove``) given as CSV or a JSON array of objects.
+#
+# The rows are diffed against the researchers through table, then only the
+# missing links are inserted (one bulk_create) and only the existing ones
+# deleted (one DELETE), in one transaction per project database. Rather than
+# an m2m_changed per project, receivers get one ``membership_changed`` per
+# database naming every link that actually changed.
+# ──────────────────────────────────────────────
+
+Membership = ResearchProject.researchers.through
+
+ACTIONS = ('add', 'remove')
+
+# Sent inside the transaction, after the changes, with ``using`` and the
+# ``added`` and ``removed`` (project_id, user_id) pairs.
+membership_changed = Signal()
+
+
+class MembershipError(Exception):
+    """A bulk membership change that cannot be applied."""
+
+
+def read_membership_rows(data, fmt):
+    """Yield ``(line_no, row)`` from CSV text (with a header row) or a JSON array."""
+    if fmt == 'csv':
+        yield from enumerate(csv.DictReader(io.StringIO(data)), start=2)
+        return
+    try:
+        rows = json.loads(data)
+    except ValueError as exc:
+        raise MembershipError(f'Invalid JSON ({exc}).')
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise MembershipError('JSON input must be an array of objects.')
+    yield from enumerate(rows, start=1)
+
+
+def _row_value(row, key):
+    value = row.get(key)
+    return value.strip() if isinstance(value, str) else value
+
+
+def _row_id(row, key, line_no):
+    """``row[key]`` as an integer: a JSON integer or a string of digits, never a bool or float."""
+    value = _row_value(row, key)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    raise MembershipError(f'Row {line_no}: {key} must be an integer.')
+
+
+def resolve_membership_rows(rows):
+    """
+    Turn ``read_membership_rows`` output into ``(add, remove)`` sets of
+    (project_id, user_id) pairs, looking usernames up in one query.
+    """
+    parsed = []
+    usernames = set()
+    for line_no, row in rows:
+        action = _row_value(row, 'action') or 'add'
+        if not isinstance(action, str) or action.lower() not in ACTIONS:
+            raise MembershipError(f'Row {line_no}: action must be one of {", ".join(ACTIONS)}.')
+        action = action.lower()
+        project_id = _row_id(row, 'project_id', line_no)
+        username = _row_value(row, 'username')
+        if _row_value(row, 'user_id') not in (None, ''):
+            user = _row_id(row, 'user_id', line_no)
+        elif username and isinstance(username, str):
+            user = username
+            usernames.add(user)
+        elif username:
+            raise MembershipError(f'Row {line_no}: username must be a string.')
+        else:
+            raise MembershipError(f'Row {line_no}: username or user_id is required.')
+        parsed.append((action, project_id, user))
+
+    ids = dict(User.objects.filter(username__in=usernames).values_list('username', 'pk'))
+    unknown = usernames - ids.keys()
+    if unknown:
+        raise MembershipError(f'Unknown username(s): {", ".join(sorted(unknown))}.')
+
+    changes = {'add': set(), 'remove': set()}
+    for action, project_id, user in parsed:
+        changes[action].add((project_id, ids.get(user, user)))
+    return changes['add'], changes['remove']
+
+
+def _check_references(add, remove, by_database):
+    user_ids = {user_id for _, user_id in add | remove}
+    found = set(User.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+    if user_ids - found:
+        raise MembershipError(f'Unknown user id(s): {", ".join(map(str, sorted(user_ids - found)))}.')
+    # Same rule as ResearchProjectForm: only researchers are assigned.
+    adding = {user_id for _, user_id in add}
+    researchers = set(
+        Profile.objects.filter(user_id__in=adding, role=Profile.Role.RESEARCHER).values_list('user_id', flat=True)
+    )
+    if adding - researchers:
+        raise MembershipError(
+            f'Only researchers can be assigned; not user id(s) {", ".join(map(str, sorted(adding - researchers)))}.'
+        )
+    for database, project_ids in by_database.items():
+        found = set(ResearchProject.objects.using(database).filter(pk__in=project_ids).values_list('pk', flat=True))
+        if project_ids - found:
+            raise MembershipError(
+                f'Unknown project id(s): {", ".join(map(str, sorted(project_ids - found)))}.'
+            )
+
+
+def apply_membership_changes(add=(), remove=(), dry_run=False, batch_size=1000):
+    """
+    Assign the (project_id, user_id) pairs in ``add`` and unassign those in
+    ``remove``, skipping links that are already as asked. Returns the counts
+    of links ``added``, ``removed`` and ``unchanged``.
+    """
+    add, remove = set(add), set(remove)
+    if add & remove:
+        pair = min(add & remove)
+        raise MembershipError(f'User {pair[1]} is both added to and removed from project {pair[0]}.')
+
+    by_database = {}
+    for project_id in {project_id for project_id, _ in add | remove}:
+        by_database.setdefault(database_for_project(project_id), set()).add(project_id)
+    _check_references(add, remove, by_database)
+
+    counts = {'added': 0, 'removed': 0, 'unchanged': 0}
+    for database, project_ids in by_database.items():
+        wanted = {pair for pair in add if pair[0] in project_ids}
+        unwanted = {pair for pair in remove if pair[0] in project_ids}
+        with database_atomic(database):
+            existing = {
+                (project_id, user_id): pk
+                for pk, project_id, user_id in Membership.objects.using(database).filter(
+                    researchproject_id__in=project_ids,
+                    user_id__in={user_id for _, user_id in wanted | unwanted},
+                ).values_list('pk', 'researchproject_id', 'user_id')
+            }
+            added = sorted(wanted - existing.keys())
+            removed = sorted(unwanted & existing.keys())
+            counts['added'] += len(added)
+            counts['removed'] += len(removed)
+            counts['unchanged'] += len(wanted) + len(unwanted) - len(added) - len(removed)
+            if dry_run or not (added or removed):
+                continue
+            Membership.objects.using(database).bulk_create(
+                [Membership(researchproject_id=project_id, user_id=user_id) for project_id, user_id in added],
+                batch_size=batch_size, ignore_conflicts=True,
+            )
+            if removed:
+                Membership.objects.using(database).filter(pk__in=[existing[pair] for pair in removed]).delete()
+            membership_changed.send(sender=Membership, using=database, added=added, removed=removed)
+    return counts
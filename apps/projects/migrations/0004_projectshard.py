@@ -0,0 +1,44 @@
+# Generated by Django 5.2.11 on 2026-10-18 16:02
+
+from django.core.management.color import no_style
+from django.db import migrations, models, router
+
+
+def register_existing_projects(apps, schema_editor):
+    """Record every existing project on ``default`` and start new ids after them."""
+    ProjectShard = apps.get_model('projects', 'ProjectShard')
+    ResearchProject = apps.get_model('projects', 'ResearchProject')
+    connection = schema_editor.connection
+    # The directory lives on default only; shards have nothing to register.
+    if not router.allow_migrate_model(connection.alias, ProjectShard):
+        return
+    project_ids = ResearchProject.objects.using(connection.alias).values_list('pk', flat=True)
+    ProjectShard.objects.using(connection.alias).bulk_create(
+        [ProjectShard(pk=pk, database='default') for pk in project_ids],
+        batch_size=1000,
+    )
+    with connection.cursor() as cursor:
+        for statement in connection.ops.sequence_reset_sql(no_style(), [ProjectShard]):
+            cursor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_researchproject_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('database', models.CharField(db_index=True, max_length=100)),
+            ],
+            options={
+                'verbose_name': 'Project Shard',
+                'verbose_name_plural': 'Project Shards',
+            },
+        ),
+        migrations.RunPython(register_existing_projects, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.11 on 2026-10-18 17:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_projectshard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='researchproject',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
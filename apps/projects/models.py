@@ -1,6 +1,8 @@
 from django.contrib.auth.models import User
 from django.db import models
 
+from apps.projects.sharding import ShardedQuerySet, allocate_project_ids, database_for_project, project_scope
+
 
 class ResearchProject(models.Model):
     class Status(models.TextChoices):
@@ -25,12 +27,56 @@ class ResearchProject(models.Model):
         default=Status.ACTIVE,
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped by apps/projects/signals.py whenever the project or its team
+    # changes; keys cached fragments (apps/projects/fragments.py).
+    version = models.PositiveIntegerField(default=1, editable=False)
+    # Moves whenever anything shown on the project's pages changes, including
+    # its documents and messages; answers conditional GETs (apps/projects/conditional.py).
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Retries lookups that miss after the project moved shard (apps/projects/sharding.py).
+    objects = ShardedQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination walks (created_at, id) — see apps/projects/pagination.py
+            models.Index(fields=['created_at', 'id'], name='project_created_id_idx'),
+        ]
         verbose_name = 'Research Project'
         verbose_name_plural = 'Research Projects'
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # Ids come from the shard directory, so they are unique across
+        # databases and decide where the project lives.
+        if self._state.adding and self.pk is None:
+            self.pk = allocate_project_ids()[0]
+            # Skip the UPDATE Django tries first when the pk is already set.
+            kwargs.setdefault('force_insert', True)
+            # objects.create() passes the database it routed to before the
+            # project had an id.
+            kwargs['using'] = database_for_project(self.pk)
+        # Signal receivers' queries follow the project to its database.
+        with project_scope(self.pk):
+            super().save(*args, **kwargs)
+
+
+class ProjectShard(models.Model):
+    """
+    Directory entry: the database holding a project and all its rows.
+
+    Inserting an entry allocates the project's id. Always stored on
+    ``default``; see apps/projects/sharding.py.
+    """
+    database = models.CharField(max_length=100, db_index=True)
+
+    class Meta:
+        verbose_name = 'Project Shard'
+        verbose_name_plural = 'Project Shards'
+
+    def __str__(self):
+        return f'Project {self.pk} → {self.database}'
+
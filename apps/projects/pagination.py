@@ -0,0 +1,157 @@
+import base64
+import binascii
+import heapq
+import itertools
+import json
+from dataclasses import dataclass, field
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+# ──────────────────────────────────────────────
+# Keyset (cursor) pagination
+#
+# Pages are addressed by the (timestamp, id) pair of the row at the page
+# boundary instead of an OFFSET, so page 500 costs the same index range scan
+# as page 1. Results are always walked newest → oldest.
+#
+# Given ``databases``, the page query runs on each of them and the rows are
+# merged in order, for lists spanning project shards (apps/projects/sharding.py).
+# ──────────────────────────────────────────────
+
+DEFAULT_PAGE_SIZE = 25
+
+
+@dataclass
+class KeysetPage:
+    """A single page of results plus the cursors needed to reach its neighbours."""
+    items: list = field(default_factory=list)
+    next_cursor: str | None = None      # older rows
+    prev_cursor: str | None = None      # newer rows
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+
+def encode_cursor(obj, time_field='created_at'):
+    """Encode the (timestamp, id) position of ``obj`` as an opaque URL-safe token."""
+    payload = json.dumps([getattr(obj, time_field).isoformat(), obj.pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a token produced by ``encode_cursor``.
+
+    Returns a ``(datetime, id)`` tuple, or None if the token is malformed —
+    a tampered or stale cursor simply falls back to the first page.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        timestamp, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        moment = parse_datetime(timestamp)
+        pk = int(pk)
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        return None
+    if moment is None:
+        return None
+    return moment, pk
+
+
+def _keyset_plan(queryset, after, before, per_page, time_field):
+    """
+    Return ``(rows_queryset, build_page, newest_first)`` for one keyset page.
+
+    Evaluating ``rows_queryset`` is the single query; ``build_page(rows)``
+    turns its rows into the ``KeysetPage``. ``newest_first`` is the order
+    of the rows.
+    """
+    after_key = decode_cursor(after)
+    before_key = decode_cursor(before)
+
+    if before_key and not after_key:
+        moment, pk = before_key
+        rows_qs = (
+            queryset
+            .filter(Q(**{f'{time_field}__gt': moment}) | Q(**{time_field: moment, 'pk__gt': pk}))
+            .order_by(time_field, 'pk')[:per_page + 1]
+        )
+
+        def build_page(rows):
+            has_more = len(rows) > per_page
+            items = rows[:per_page][::-1]
+            return KeysetPage(
+                items=items,
+                next_cursor=encode_cursor(items[-1], time_field) if items else after,
+                prev_cursor=encode_cursor(items[0], time_field) if has_more else None,
+            )
+        return rows_qs, build_page, False
+
+    page_qs = queryset.order_by(f'-{time_field}', '-pk')
+    if after_key:
+        moment, pk = after_key
+        page_qs = page_qs.filter(Q(**{f'{time_field}__lt': moment}) | Q(**{time_field: moment, 'pk__lt': pk}))
+
+    def build_page(rows):
+        has_more = len(rows) > per_page
+        items = rows[:per_page]
+        return KeysetPage(
+            items=items,
+            next_cursor=encode_cursor(items[-1], time_field) if has_more else None,
+            prev_cursor=encode_cursor(items[0], time_field) if after_key and items else None,
+        )
+    return page_qs[:per_page + 1], build_page, True
+
+
+def _merge(row_lists, per_page, time_field, newest_first):
+    """Merge rows fetched from several databases, each list already in page order."""
+    merged = heapq.merge(*row_lists, key=lambda row: (getattr(row, time_field), row.pk), reverse=newest_first)
+    return list(itertools.islice(merged, per_page + 1))
+
+
+def keyset_paginate(
+    queryset, after=None, before=None, per_page=DEFAULT_PAGE_SIZE, time_field='created_at', databases=None,
+):
+    """
+    Return a ``KeysetPage`` of ``queryset`` ordered by ``(-time_field, -id)``.
+
+    after  → cursor of the last row already seen; returns the next *older* page.
+    before → cursor of the first row already seen; returns the next *newer* page.
+    Neither → the newest page.
+
+    Exactly one query is issued (``per_page + 1`` rows are fetched to detect
+    whether another page exists) — one per database given in ``databases``.
+    """
+    rows_qs, build_page, newest_first = _keyset_plan(queryset, after, before, per_page, time_field)
+    if databases is None:
+        return build_page(list(rows_qs))
+    row_lists = [list(rows_qs.using(database)) for database in databases]
+    return build_page(_merge(row_lists, per_page, time_field, newest_first))
+
+
+async def akeyset_paginate(
+    queryset, after=None, before=None, per_page=DEFAULT_PAGE_SIZE, time_field='created_at', databases=None,
+):
+    """Async ``keyset_paginate`` for async views; same arguments and result."""
+    rows_qs, build_page, newest_first = _keyset_plan(queryset, after, before, per_page, time_field)
+    if databases is None:
+        return build_page([row async for row in rows_qs])
+    row_lists = [[row async for row in rows_qs.using(database)] for database in databases]
+    return build_page(_merge(row_lists, per_page, time_field, newest_first))
@@ -0,0 +1,518 @@
+"""
+Sharding projects across several databases.
+
+A research project and every row that hangs off it — memberships, messages,
+documents and their text, upload sessions, search entries — live together
+in one database. The ``ProjectShard`` directory (always on ``default``)
+records which; new projects are placed on ``PROJECT_SHARDS[id % N]`` (see
+DATABASE_SHARD_URLS in settings) and ``rebalance_shards`` moves them later.
+Project ids come from the directory, so they are unique across databases.
+
+``ProjectShardRouter`` sends queries on sharded models to:
+
+- the project's database, when the query comes with a sharded instance
+  (saving or deleting it, its related managers, lazy foreign keys);
+- otherwise the database of the current scope: the project named in the
+  request URL (``ProjectShardMiddleware``) or an explicit
+  ``project_scope(project_id)`` / ``database_scope(alias)`` block;
+- otherwise ``default``.
+
+Queries spanning projects (the project list, search, statistics) run once
+per database in ``project_databases()`` and merge the results.
+
+Users stay on ``default``, but every shard keeps a copy of auth_user so
+foreign keys to a message's sender or a project's creator, and joins such
+as ``select_related('created_by')``, work there. The copies are refreshed
+on every save (apps/projects/signals.py) and when a shard is migrated.
+
+Messages, documents and the other child rows get ids that are unique
+across databases too: each shard's sequences start at ``n * SHARD_ID_SPAN``
+(``shard<n>``), so caches, search entries and queued tasks that name a row
+by id never confuse two of them.
+
+Each process caches directory entries. ``move_project`` clears the entry
+in the cache, so with a shared cache (REDIS_URL) every process sees a move
+at once. With per-process caches, other processes keep their stale entry
+until a ``get()`` through ``ShardedQuerySet`` finds nothing on the cached
+database; that re-reads the directory and retries on the new database.
+
+Not covered: a transaction cannot span databases; the admin changelists
+show projects on ``default`` only; adding researchers from the user side
+(``user.assigned_projects.add(...)``) needs a ``project_scope``.
+
+With DATABASE_SHARD_URLS unset the router stands aside entirely and
+``project_databases()`` is ``[None]``: one query, routed as usual.
+"""
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import QuerySet
+from django.db.models.deletion import Collector
+
+# Sharded models, parents first, with the lookup from each to its project.
+SHARDED_MODELS = {
+    'projects.researchproject': 'pk',
+    'projects.researchproject_researchers': 'researchproject_id',
+    'communication.projectmessage': 'project_id',
+    'documents.document': 'project_id',
+    'documents.documenttext': 'document__project_id',
+    'documents.uploadsession': 'project_id',
+    'search.searchentry': 'project_id',
+}
+SHARDED_APPS = {label.partition('.')[0] for label in SHARDED_MODELS}
+
+# Migrated onto every shard, so sharded rows can reference users.
+REFERENCE_APPS = {'auth', 'contenttypes'}
+
+SHARD_ID_SPAN = 10 ** 12
+DIRECTORY_CACHE_SECONDS = 300
+
+_scope = ContextVar('project_shard_scope', default=None)
+
+
+class ShardScope:
+    """The database that unhinted queries on sharded models use, and the project it is for."""
+
+    def __init__(self, database=None, project_id=None):
+        self.database = database
+        self.project_id = project_id
+
+
+def is_sharded(model):
+    return model._meta.label_lower in SHARDED_MODELS
+
+
+def sharded_models():
+    """The sharded model classes, parents first."""
+    return [apps.get_model(label) for label in SHARDED_MODELS]
+
+
+def project_databases():
+    """
+    The databases to query for rows spanning projects: ``default`` (which
+    keeps the projects created before sharding) and every shard. Without
+    shards, ``[None]`` — a single query, sent wherever the routers choose.
+    """
+    if not settings.PROJECT_SHARDS:
+        return [None]
+    return [DEFAULT_DB_ALIAS, *settings.PROJECT_SHARDS]
+
+
+# ──────────────────────────────────────────────
+# Directory
+# ──────────────────────────────────────────────
+
+def _directory_key(project_id):
+    return f'project-shard:{project_id}'
+
+
+def place_project(project_id, databases=None):
+    """Where a project goes by its id: one of ``databases`` (default: the shards)."""
+    databases = databases or settings.PROJECT_SHARDS or [DEFAULT_DB_ALIAS]
+    return databases[project_id % len(databases)]
+
+
+def allocate_project_ids(count=1):
+    """Reserve ``count`` new project ids and place each on a shard; return the ids."""
+    from apps.projects.models import ProjectShard
+
+    with transaction.atomic(using=DEFAULT_DB_ALIAS):
+        entries = ProjectShard.objects.using(DEFAULT_DB_ALIAS).bulk_create(
+            [ProjectShard(database=DEFAULT_DB_ALIAS) for _ in range(count)],
+        )
+        ids = [entry.pk for entry in entries]
+        by_database = {}
+        for project_id in ids:
+            by_database.setdefault(place_project(project_id), []).append(project_id)
+        for database, project_ids in by_database.items():
+            if database != DEFAULT_DB_ALIAS:
+                ProjectShard.objects.using(DEFAULT_DB_ALIAS).filter(pk__in=project_ids).update(database=database)
+    if settings.PROJECT_SHARDS:
+        cache.set_many({_directory_key(pk): place_project(pk) for pk in ids}, DIRECTORY_CACHE_SECONDS)
+    return ids
+
+
+def database_for_project(project_id):
+    """The alias of the database holding ``project_id`` (``default`` for unknown projects)."""
+    if not settings.PROJECT_SHARDS or project_id is None:
+        return DEFAULT_DB_ALIAS
+    from apps.projects.models import ProjectShard
+
+    key = _directory_key(project_id)
+    database = cache.get(key)
+    if database is None:
+        # Never from a replica: a project created a moment ago must be found.
+        database = (
+            ProjectShard.objects.using(DEFAULT_DB_ALIAS)
+            .filter(pk=project_id).values_list('database', flat=True).first()
+        )
+        if database is None:
+            return DEFAULT_DB_ALIAS
+        cache.set(key, database, DIRECTORY_CACHE_SECONDS)
+    return database
+
+
+def refresh_project_database(project_id):
+    """
+    Re-read where ``project_id`` lives, replacing this process's cached
+    entry and updating the current scope if it is for that project. Returns
+    True if the project had moved since the entry was cached.
+    """
+    if not settings.PROJECT_SHARDS or project_id is None:
+        return False
+    key = _directory_key(project_id)
+    cached = cache.get(key)
+    cache.delete(key)
+    database = database_for_project(project_id)
+    scope = _scope.get()
+    if scope is not None and scope.project_id == project_id:
+        scope.database = database
+    return cached is not None and cached != database
+
+
+def _instance_project_id(instance):
+    lookup = SHARDED_MODELS[instance._meta.label_lower]
+    if lookup == 'pk':
+        return instance.pk
+    if '__' not in lookup:
+        return getattr(instance, lookup)
+    # Document text: only if its document is already loaded.
+    parent = instance._state.fields_cache.get(lookup.partition('__')[0])
+    return getattr(parent, 'project_id', None)
+
+
+def _instance_database(instance):
+    project_id = _instance_project_id(instance)
+    if project_id is not None:
+        return database_for_project(project_id)
+    if instance._state.db in project_databases():
+        return instance._state.db
+    return None
+
+
+# ──────────────────────────────────────────────
+# Scopes
+# ──────────────────────────────────────────────
+
+@contextmanager
+def database_scope(database, project_id=None):
+    """Send unhinted queries on sharded models to ``database`` for the duration of the block."""
+    token = _scope.set(ShardScope(database, project_id))
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def project_scope(project_id):
+    """``database_scope`` for the database holding ``project_id``."""
+    return database_scope(database_for_project(project_id), project_id)
+
+
+@contextmanager
+def project_atomic(project_id=None):
+    """
+    ``transaction.atomic`` for a project's rows (``project_id``, else the
+    current scope's) together with what they cause on ``default``: queued
+    tasks, blob references, statistics.
+
+    The project's database commits first, so a queued task never finds its
+    rows missing. Without shards this is a single transaction.
+    """
+    if project_id is not None:
+        database = database_for_project(project_id)
+    else:
+        scope = _scope.get()
+        database = (scope.database if scope is not None else None) or DEFAULT_DB_ALIAS
+    with database_atomic(database):
+        yield
+
+
+@contextmanager
+def database_atomic(database):
+    """``project_atomic`` for every project on ``database``."""
+    if database == DEFAULT_DB_ALIAS:
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            yield
+        return
+    with transaction.atomic(using=DEFAULT_DB_ALIAS), transaction.atomic(using=database):
+        yield
+
+
+# ──────────────────────────────────────────────
+# Router
+# ──────────────────────────────────────────────
+
+class ProjectShardRouter:
+    """Route sharded models by project (see module docstring); defers on everything else."""
+
+    def _route(self, model, hints, reference):
+        if not settings.PROJECT_SHARDS:
+            return None
+        instance = hints.get('instance')
+        if instance is not None and is_sharded(instance.__class__):
+            # A project's researchers are read through its own membership
+            # table, so users are read where the project is.
+            if is_sharded(model) or (reference and model._meta.app_label in REFERENCE_APPS):
+                database = _instance_database(instance)
+                if database is not None:
+                    return database
+        if not is_sharded(model):
+            return None
+        scope = _scope.get()
+        return scope.database if scope is not None else None
+
+    def db_for_read(self, model, **hints):
+        return self._route(model, hints, reference=True)
+
+    def db_for_write(self, model, **hints):
+        # Users are written on default and copied to the shards afterwards.
+        return self._route(model, hints, reference=False)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if not settings.PROJECT_SHARDS:
+            return None
+        models = (obj1.__class__, obj2.__class__)
+        if any(is_sharded(model) for model in models) and all(
+            is_sharded(model) or model._meta.app_label in REFERENCE_APPS for model in models
+        ):
+            # Placement follows the project id on save; users exist everywhere.
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db not in settings.PROJECT_SHARDS:
+            return None
+        if app_label in REFERENCE_APPS:
+            return True
+        if model_name is None:
+            # Data migrations of apps with sharded models.
+            return app_label in SHARDED_APPS
+        return f'{app_label}.{model_name}' in SHARDED_MODELS
+
+
+class ProjectShardMiddleware:
+    """Scope each request to the database of the project named in its URL, if any."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        # Replaced per request rather than reset afterwards, so a streamed
+        # response still reads from the project's database.
+        _scope.set(ShardScope())
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not settings.PROJECT_SHARDS:
+            return None
+        project_id = view_kwargs.get('project_id')
+        if project_id is None and request.resolver_match.namespace == 'projects':
+            project_id = view_kwargs.get('pk')
+        if project_id is None:
+            # The admin's change and delete pages of a project.
+            model_admin = getattr(view_func, 'model_admin', None)
+            if model_admin is not None and model_admin.model._meta.label_lower == 'projects.researchproject':
+                project_id = view_kwargs.get('object_id')
+        try:
+            project_id = int(project_id)
+        except (TypeError, ValueError):
+            return None
+        scope = _scope.get()
+        scope.project_id = project_id
+        scope.database = database_for_project(project_id)
+        return None
+
+
+class ShardedQuerySet(QuerySet):
+    """
+    Retries a ``get()`` that finds nothing when the project's directory
+    entry in this process's cache may be out of date (see the module
+    docstring). The project is the current scope's, or the one looked up
+    by pk.
+    """
+
+    def get(self, *args, **kwargs):
+        try:
+            return super().get(*args, **kwargs)
+        except self.model.DoesNotExist:
+            project_id = self._scoped_project_id(kwargs)
+            if self._db is not None or not refresh_project_database(project_id):
+                raise
+            return self.using(database_for_project(project_id)).get(*args, **kwargs)
+
+    def _scoped_project_id(self, lookups):
+        scope = _scope.get()
+        if scope is not None and scope.project_id is not None:
+            return scope.project_id
+        if SHARDED_MODELS.get(self.model._meta.label_lower) == 'pk':
+            try:
+                return int(lookups.get('pk', lookups.get('id')))
+            except (TypeError, ValueError):
+                return None
+        return None
+
+
+# ──────────────────────────────────────────────
+# Shard maintenance
+# ──────────────────────────────────────────────
+
+def replicate_users(users, databases=None):
+    """Insert or refresh copies of ``users`` on every shard (or ``databases``); sends no signals."""
+    fields = [field for field in User._meta.concrete_fields if not field.primary_key]
+    users = list(users)
+    for alias in databases if databases is not None else settings.PROJECT_SHARDS:
+        if alias == DEFAULT_DB_ALIAS or not users:
+            continue
+        copies = [
+            User(pk=user.pk, **{field.attname: getattr(user, field.attname) for field in fields})
+            for user in users
+        ]
+        User.objects.using(alias).bulk_create(
+            copies, batch_size=1000,
+            update_conflicts=True, unique_fields=['id'], update_fields=[field.name for field in fields],
+        )
+
+
+class _ShardCollector(Collector):
+    """Cascades like the ORM, but only into tables that exist on a shard."""
+
+    def related_objects(self, related_model, related_fields, objs):
+        if not (is_sharded(related_model) or related_model._meta.app_label in REFERENCE_APPS):
+            return related_model._base_manager.none()
+        return super().related_objects(related_model, related_fields, objs)
+
+
+def delete_user_copies(user_ids, databases=None):
+    """Delete the copies of these users, and whatever cascades from them, on every shard."""
+    for alias in databases if databases is not None else settings.PROJECT_SHARDS:
+        if alias == DEFAULT_DB_ALIAS:
+            continue
+        users = User.objects.using(alias).filter(pk__in=user_ids)
+        collector = _ShardCollector(using=alias, origin=users)
+        collector.collect(users)
+        collector.delete()
+
+
+def _offset_sequences(alias, start):
+    """Make new child rows on ``alias`` take ids from ``start`` upwards."""
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        for model in sharded_models():
+            pk = model._meta.pk
+            # Project ids come from the directory; upload sessions use UUIDs.
+            if model._meta.label_lower == 'projects.researchproject' or not pk.get_internal_type().endswith('AutoField'):
+                continue
+            table, column = model._meta.db_table, pk.column
+            if connection.vendor == 'postgresql':
+                cursor.execute(
+                    f'SELECT setval(pg_get_serial_sequence(%s, %s), '
+                    f'GREATEST(%s, (SELECT COALESCE(MAX({connection.ops.quote_name(column)}), 0) '
+                    f'FROM {connection.ops.quote_name(table)})))',
+                    [table, column, start],
+                )
+            elif connection.vendor == 'sqlite':
+                cursor.execute('SELECT seq FROM sqlite_sequence WHERE name = %s', [table])
+                row = cursor.fetchone()
+                if row is None:
+                    cursor.execute('INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)', [table, start])
+                elif row[0] < start:
+                    cursor.execute('UPDATE sqlite_sequence SET seq = %s WHERE name = %s', [start, table])
+
+
+def prepare_shard(alias):
+    """Offset a freshly migrated shard's id sequences and copy every user to it."""
+    _offset_sequences(alias, (settings.PROJECT_SHARDS.index(alias) + 1) * SHARD_ID_SPAN)
+    users = User.objects.using(DEFAULT_DB_ALIAS).order_by('pk').iterator(chunk_size=1000)
+    for batch in _batched(users, 1000):
+        replicate_users(batch, [alias])
+
+
+@contextmanager
+def _stored_timestamps(model):
+    """Let bulk_create keep a model's auto_now / auto_now_add values instead of ``now()``."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _project_rows(model, project_id, alias):
+    return model._base_manager.using(alias).filter(**{SHARDED_MODELS[model._meta.label_lower]: project_id})
+
+
+def _delete_project_rows(project_id, alias):
+    # Children first, and without signals: the rows move, nothing is deleted
+    # as far as statistics, search or blob reference counts are concerned.
+    for model in reversed(sharded_models()):
+        queryset = _project_rows(model, project_id, alias)
+        queryset._raw_delete(alias)
+
+
+def move_project(project_id, target, batch_size=1000):
+    """
+    Move a project and all its rows to the ``target`` database; return the number of rows copied.
+
+    The rows are copied, the directory switched, then the originals deleted.
+    On PostgreSQL the project row stays locked until the end, which holds
+    back new messages and documents for it. An interrupted move can simply
+    be run again.
+    """
+    from apps.projects.models import ProjectShard
+
+    if target not in project_databases():
+        raise ValueError(f'"{target}" is not a project database.')
+    source = (
+        ProjectShard.objects.using(DEFAULT_DB_ALIAS)
+        .filter(pk=project_id).values_list('database', flat=True).first()
+    )
+    if source is None:
+        raise ValueError(f'Project {project_id} is not in the shard directory.')
+    if source == target:
+        return 0
+
+    copied = 0
+    # Rows whose ids nothing refers to take fresh ones on the target.
+    renumbered = {'projects.researchproject_researchers', 'documents.documenttext', 'search.searchentry'}
+    with transaction.atomic(using=source):
+        _project_rows(apps.get_model('projects.researchproject'), project_id, source).select_for_update().get()
+        with transaction.atomic(using=target):
+            _delete_project_rows(project_id, target)
+            for model in sharded_models():
+                queryset = _project_rows(model, project_id, source).order_by('pk')
+                with _stored_timestamps(model):
+                    for batch in _batched(queryset.iterator(chunk_size=batch_size), batch_size):
+                        if model._meta.label_lower in renumbered:
+                            for row in batch:
+                                row.pk = None
+                        model._base_manager.using(target).bulk_create(batch)
+                        copied += len(batch)
+        ProjectShard.objects.using(DEFAULT_DB_ALIAS).filter(pk=project_id).update(database=target)
+        cache.delete(_directory_key(project_id))
+        _delete_project_rows(project_id, source)
+    return copied
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
@@ -0,0 +1,152 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import F, Q
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.communication.models import ProjectMessage
+from apps.documents.models import Document
+from apps.projects.access import invalidate_project_access
+from apps.projects.membership import membership_changed
+from apps.projects.models import ResearchProject
+from apps.projects.sharding import delete_user_copies, prepare_shard, project_databases, replicate_users
+
+
+def bump_project_versions(*project_ids, using=None):
+    """Invalidate cached fragments and pages of the given projects (on database ``using``)."""
+    ResearchProject.objects.using(using).filter(pk__in=project_ids).update(
+        version=F('version') + 1, updated_at=timezone.now(),
+    )
+
+
+def touch_projects(*project_ids, using=None):
+    """Mark the pages of the given projects changed, keeping their cached fragments."""
+    ResearchProject.objects.using(using).filter(pk__in=project_ids).update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=ResearchProject.researchers.through)
+def researchers_changed(sender, instance, action, reverse, pk_set, using=None, **kwargs):
+    """Membership changed (from either side of the relation) — drop cached access answers."""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_project_access()
+    if action == 'pre_clear' and reverse:
+        # Afterwards there is no telling which projects the user was on.
+        instance._cleared_project_ids = list(instance.assigned_projects.using(using).values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        bump_project_versions(*(pk_set if reverse else [instance.pk]), using=using)
+    elif action == 'post_clear':
+        project_ids = getattr(instance, '_cleared_project_ids', ()) if reverse else [instance.pk]
+        bump_project_versions(*project_ids, using=using)
+
+
+@receiver(membership_changed)
+def researchers_bulk_changed(sender, using=None, added=(), removed=(), **kwargs):
+    """The same invalidation for a bulk membership change, once for all its projects."""
+    invalidate_project_access()
+    bump_project_versions(*{project_id for project_id, _ in (*added, *removed)}, using=using)
+
+
+@receiver(pre_save, sender=ResearchProject)
+def keep_stored_version(sender, instance, raw=False, **kwargs):
+    # A stale in-memory version must not overwrite bumps made since loading.
+    if not raw and not instance._state.adding:
+        instance.version = F('version')
+
+
+@receiver(post_save, sender=ResearchProject)
+def project_saved(sender, instance, created, raw=False, using=None, **kwargs):
+    if created or raw:
+        return
+    bump_project_versions(instance.pk, using=using)
+    # Reloaded from the database on next access.
+    instance.__dict__.pop('version', None)
+    instance.__dict__.pop('updated_at', None)
+
+
+# ──────────────────────────────────────────────
+# Documents and messages
+#
+# Project pages list them, so adding, editing or deleting one marks its
+# project's pages changed (see apps/projects/conditional.py).
+# ──────────────────────────────────────────────
+
+@receiver(post_save, sender=Document)
+@receiver(post_save, sender=ProjectMessage)
+def project_content_saved(sender, instance, raw=False, using=None, **kwargs):
+    if not raw:
+        touch_projects(instance.project_id, using=using)
+
+
+@receiver(post_delete, sender=Document)
+@receiver(post_delete, sender=ProjectMessage)
+def project_content_deleted(sender, instance, using=None, **kwargs):
+    touch_projects(instance.project_id, using=using)
+
+
+# ──────────────────────────────────────────────
+# Renamed users
+#
+# Project rows and message bubbles show usernames, so renaming a user
+# invalidates the fragments of their projects and messages. Project pages
+# also show full names, and the documents and messages of their authors.
+# ──────────────────────────────────────────────
+
+NAME_FIELDS = ('username', 'first_name', 'last_name')
+
+
+def _loaded_names(user):
+    # Only what was loaded: reading a deferred field would query (and init another user).
+    return {name: user.__dict__[name] for name in NAME_FIELDS if name in user.__dict__}
+
+
+@receiver(post_init, sender=User)
+def remember_names(sender, instance, **kwargs):
+    instance._loaded_names = _loaded_names(instance)
+
+
+@receiver(post_save, sender=User)
+def user_renamed(sender, instance, created, raw=False, **kwargs):
+    if created or raw or _loaded_names(instance).items() <= instance._loaded_names.items():
+        return
+    instance._loaded_names = _loaded_names(instance)
+    now = timezone.now()
+    for database in project_databases():
+        ResearchProject.objects.using(database).filter(
+            Q(created_by=instance) | Q(researchers=instance)
+        ).update(version=F('version') + 1, updated_at=now)
+        ResearchProject.objects.using(database).filter(
+            Q(messages__sender=instance) | Q(documents__uploaded_by=instance)
+        ).update(updated_at=now)
+        ProjectMessage.objects.using(database).filter(sender=instance).update(version=F('version') + 1)
+
+
+# ──────────────────────────────────────────────
+# Shards
+#
+# Every shard keeps a copy of each user for its foreign keys and joins (see
+# apps/projects/sharding.py). Deleting a user deletes the copies, which
+# cascades to the user's projects, messages and documents on each shard.
+# ──────────────────────────────────────────────
+
+@receiver(post_save, sender=User)
+def copy_user_to_shards(sender, instance, raw=False, using=None, update_fields=None, **kwargs):
+    # Logins only touch last_login, which the copies don't need.
+    if raw or using != DEFAULT_DB_ALIAS or (update_fields and set(update_fields) <= {'last_login'}):
+        return
+    replicate_users([instance])
+
+
+@receiver(post_delete, sender=User)
+def delete_user_from_shards(sender, instance, using=None, **kwargs):
+    if using != DEFAULT_DB_ALIAS:
+        return
+    delete_user_copies([instance.pk])
+
+
+@receiver(post_migrate)
+def prepare_migrated_shard(sender, using=None, **kwargs):
+    # Sent once per app; the projects app is enough, once its tables exist.
+    if sender.label == 'projects' and using in settings.PROJECT_SHARDS:
+        prepare_shard(using)
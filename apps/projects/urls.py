@@ -9,5 +9,6 @@ urlpatterns = [
     path('create/', views.project_create, name='project_create'),
     path('<int:pk>/', views.project_detail, name='project_detail'),
     path('<int:pk>/edit/', views.project_edit, name='project_edit'),
+    path('membership/', views.membership_bulk, name='membership_bulk'),
 ]
 
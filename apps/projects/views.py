@@ -1,12 +1,81 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseForbidden
-from django.shortcuts import get_object_or_404, redirect, render
-
-from apps.accounts.models import Profile
+from django.contrib.auth.models import User
+from django.db.models import Count, IntegerField, OuterRef, Prefetch, Subquery, aprefetch_related_objects
+from django.db.models.functions import Coalesce
+from django.http import HttpResponseForbidden, JsonResponse
+from django.shortcuts import aget_object_or_404, get_object_or_404, redirect, render
+from django.views.decorators.http import require_POST
+
+from apps.communication.models import ProjectMessage
+from apps.documents.models import Document
+from apps.projects.access import ais_admin, arequest_user, auser_can_access_project
+from apps.projects.conditional import not_modified, project_validators, with_validators
 from apps.projects.decorators import admin_required
 from apps.projects.forms import ResearchProjectForm
+from apps.projects.fragments import arender_fragments
+from apps.projects.membership import (
+    MembershipError, apply_membership_changes, read_membership_rows, resolve_membership_rows,
+)
 from apps.projects.models import ResearchProject
+from apps.projects.pagination import akeyset_paginate
+from apps.projects.sharding import project_atomic, project_databases
+from researchcollab.instrumentation import query_budget
+
+PROJECTS_PER_PAGE = 25
+
+
+# ──────────────────────────────────────────────
+# Helpers
+# ──────────────────────────────────────────────
+
+def _count_subquery(model, fk_field):
+    """Correlated COUNT(*) of ``model`` rows pointing at the outer project."""
+    counts = (
+        model.objects
+        .filter(**{fk_field: OuterRef('pk')})
+        .order_by()
+        .values(fk_field)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def _project_list_queryset(base_qs):
+    """
+    Attach everything a project row needs to be looked up in the fragment
+    cache: one query for the page of projects, creator joined and counts as
+    correlated subqueries. Researcher names are only loaded for rows that
+    have to be rendered (see ``_prefetch_researchers``).
+    """
+    return (
+        base_qs
+        .select_related('created_by')
+        .annotate(
+            researcher_count=_count_subquery(ResearchProject.researchers.through, 'researchproject'),
+            document_count=_count_subquery(Document, 'project'),
+            message_count=_count_subquery(ProjectMessage, 'project'),
+        )
+    )
+
+
+async def _prefetch_researchers(projects):
+    # One batch per database: a prefetch follows the first instance's database.
+    by_database = {}
+    for project in projects:
+        by_database.setdefault(project._state.db, []).append(project)
+    for batch in by_database.values():
+        await aprefetch_related_objects(
+            batch,
+            Prefetch('researchers', queryset=User.objects.only('id', 'username').order_by('username')),
+        )
+
+
+def _project_row_key(admin):
+    def key(project):
+        return project.pk, project.version, project.researcher_count, project.document_count, project.message_count, admin
+    return key
 
 
 # ──────────────────────────────────────────────
@@ -14,21 +83,44 @@ from apps.projects.models import ResearchProject
 # ──────────────────────────────────────────────
 
 @login_required
-def project_list(request):
+@query_budget(6, per_shard=2)
+async def project_list(request):
     """
     ADMIN  → sees every project.
     RESEARCHER → sees only projects they are assigned to.
+
+    Results are keyset-paginated newest first; ``?after=`` / ``?before=``
+    carry the cursor of the boundary row. With project shards each page is
+    fetched from every shard and merged.
     """
-    role = request.user.profile.role
+    user = await arequest_user(request)
+    admin = await ais_admin(user)
 
-    if role == Profile.Role.ADMIN:
+    if admin:
         projects = ResearchProject.objects.all()
     else:
-        projects = request.user.assigned_projects.all()
+        projects = user.assigned_projects.all()
+
+    page = await akeyset_paginate(
+        _project_list_queryset(projects),
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+        per_page=PROJECTS_PER_PAGE,
+        databases=project_databases(),
+    )
+
+    rows = await arender_fragments(
+        request, 'projects/_project_row.html', page, 'project',
+        key_parts=_project_row_key(admin),
+        context={'is_admin': admin},
+        prepare=_prefetch_researchers,
+    )
 
     context = {
-        'projects': projects,
-        'is_admin': role == Profile.Role.ADMIN,
+        'projects': page,
+        'rows': rows,
+        'page': page,
+        'is_admin': admin,
     }
     return render(request, 'projects/project_list.html', context)
 
@@ -46,8 +138,9 @@ def project_create(request):
         if form.is_valid():
             project = form.save(commit=False)
             project.created_by = request.user
-            project.save()
-            form.save_m2m()  # save ManyToMany (researchers)
+            with project_atomic():
+                project.save()
+                form.save_m2m()  # save ManyToMany (researchers)
             messages.success(request, f'Project "{project.title}" created successfully.')
             return redirect('projects:project_detail', pk=project.pk)
     else:
@@ -61,26 +154,37 @@ def project_create(request):
 # ──────────────────────────────────────────────
 
 @login_required
-def project_detail(request, pk):
+@query_budget(6)
+async def project_detail(request, pk):
     """
     ADMIN → can view any project.
     RESEARCHER → can view only if assigned to the project.
+    Unchanged pages are answered with a 304 (see apps/projects/conditional.py).
     """
-    project = get_object_or_404(ResearchProject, pk=pk)
-    role = request.user.profile.role
+    user = await arequest_user(request)
+    project = await aget_object_or_404(ResearchProject.objects.select_related('created_by'), pk=pk)
 
-    if role != Profile.Role.ADMIN and request.user not in project.researchers.all():
+    if not await auser_can_access_project(user, project):
         return HttpResponseForbidden(
             '<h3 style="text-align:center;margin-top:60px;">'
             '403 — You do not have permission to view this project.'
             '</h3>'
         )
 
+    admin = await ais_admin(user)
+    etag, last_modified = project_validators(request, project, admin)
+    if response := not_modified(request, etag, last_modified):
+        return response
+
+    # Templates render synchronously, so the team is loaded up front.
+    await aprefetch_related_objects([project], 'researchers')
+
     context = {
         'project': project,
-        'is_admin': role == Profile.Role.ADMIN,
+        'is_admin': admin,
     }
-    return render(request, 'projects/project_detail.html', context)
+    response = render(request, 'projects/project_detail.html', context)
+    return with_validators(request, response, etag, last_modified)
 
 
 # ──────────────────────────────────────────────
@@ -96,7 +200,8 @@ def project_edit(request, pk):
     if request.method == 'POST':
         form = ResearchProjectForm(request.POST, instance=project)
         if form.is_valid():
-            form.save()
+            with project_atomic(project.pk):
+                form.save()
             messages.success(request, f'Project "{project.title}" updated successfully.')
             return redirect('projects:project_detail', pk=project.pk)
     else:
@@ -108,3 +213,31 @@ def project_edit(request, pk):
     }
     return render(request, 'projects/project_edit.html', context)
 
+
+
+# ──────────────────────────────────────────────
+# Bulk Membership  (ADMIN only, JSON API)
+# ──────────────────────────────────────────────
+
+@login_required
+@admin_required
+@require_POST
+def membership_bulk(request):
+    """
+    Add and remove researchers across many projects in one request.
+
+    Body: a JSON array of ``{"project_id", "username" or "user_id", "action"}``
+    objects, or the same columns as CSV with ``Content-Type: text/csv``.
+    ``?dry_run=1`` reports the changes without making them. Responds with the
+    numbers of links ``added``, ``removed`` and ``unchanged``.
+    """
+    fmt = 'csv' if request.content_type == 'text/csv' else 'json'
+    try:
+        data = request.body.decode(request.encoding or 'utf-8')
+        add, remove = resolve_membership_rows(read_membership_rows(data, fmt))
+        counts = apply_membership_changes(add, remove, dry_run=request.GET.get('dry_run') in ('1', 'true'))
+    except UnicodeDecodeError:
+        return JsonResponse({'error': 'Request body must be UTF-8.'}, status=400)
+    except MembershipError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    return JsonResponse(counts)
@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from apps.search.models import SearchEntry
+
+
+@admin.register(SearchEntry)
+class SearchEntryAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'object_id', 'project', 'title', 'updated_at')
+    list_filter = ('kind',)
+    readonly_fields = ('kind', 'object_id', 'project', 'title', 'body', 'updated_at')
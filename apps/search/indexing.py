@@ -0,0 +1,61 @@
+from apps.communication.models import ProjectMessage
+from apps.documents.extraction import document_text_excerpt
+from apps.documents.models import Document
+from apps.projects.models import ResearchProject
+from apps.search.models import SearchEntry
+
+# ──────────────────────────────────────────────
+# What gets indexed
+#
+# Each indexed model maps to one SearchEntry: ``title`` is weighted above
+# ``body`` when ranking. The last element lists relations the field function
+# reads, for select_related() during bulk rebuilds.
+# ──────────────────────────────────────────────
+
+# Extracted text beyond this is not indexed (tsvector values are capped at 1 MB).
+DOCUMENT_TEXT_LIMIT = 200_000
+
+
+def _project_fields(project):
+    return project.pk, project.title, project.description
+
+
+def _document_fields(document):
+    body = document.filename
+    if document.text_status == Document.TextStatus.READY:
+        body += '\n' + document_text_excerpt(document, DOCUMENT_TEXT_LIMIT)
+    return document.project_id, document.title, body
+
+
+def _message_fields(message):
+    return message.project_id, message.sender.username, message.message
+
+
+INDEXED_MODELS = {
+    ResearchProject: (SearchEntry.Kind.PROJECT, _project_fields, ()),
+    Document: (SearchEntry.Kind.DOCUMENT, _document_fields, ()),
+    ProjectMessage: (SearchEntry.Kind.MESSAGE, _message_fields, ('sender',)),
+}
+
+
+def entry_for(instance):
+    """Build an unsaved SearchEntry for ``instance``."""
+    kind, fields, _related = INDEXED_MODELS[type(instance)]
+    project_id, title, body = fields(instance)
+    return SearchEntry(kind=kind, object_id=instance.pk, project_id=project_id, title=title[:255], body=body)
+
+
+def index_instance(instance, using=None):
+    """Insert or refresh the entry for ``instance`` (on database ``using``)."""
+    entry = entry_for(instance)
+    SearchEntry.objects.using(using).update_or_create(
+        kind=entry.kind,
+        object_id=entry.object_id,
+        defaults={'project_id': entry.project_id, 'title': entry.title, 'body': entry.body},
+    )
+
+
+def unindex_instance(instance, using=None):
+    """Remove the entry for ``instance``, if any."""
+    kind = INDEXED_MODELS[type(instance)][0]
+    SearchEntry.objects.using(using).filter(kind=kind, object_id=instance.pk).delete()
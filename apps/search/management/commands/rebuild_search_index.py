@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db import router, transaction
+
+from apps.projects.sharding import project_databases
+from apps.search.indexing import INDEXED_MODELS, entry_for
+from apps.search.models import SearchEntry
+
+
+class Command(BaseCommand):
+    help = (
+        'Backfill the search index from existing projects, documents and messages. '
+        'Only needed once after installing the search app (or to repair drift); '
+        'saves and deletes keep the index current on their own.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Entries written per batch (default: 1000).')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total = 0
+        # Each project database indexes its own rows.
+        for database in project_databases():
+            total += self._rebuild(database, batch_size)
+        self.stdout.write(self.style.SUCCESS(f'Search index rebuilt: {total} entries.'))
+
+    def _rebuild(self, database, batch_size):
+        total = 0
+        database = database or router.db_for_write(SearchEntry)
+        entries = SearchEntry.objects.using(database)
+        with transaction.atomic(using=database):
+            entries.all().delete()
+            for model, (_kind, _fields, related) in INDEXED_MODELS.items():
+                queryset = model.objects.using(database)
+                if related:
+                    queryset = queryset.select_related(*related)
+                batch = []
+                for instance in queryset.iterator(chunk_size=batch_size):
+                    batch.append(entry_for(instance))
+                    if len(batch) >= batch_size:
+                        entries.bulk_create(batch)
+                        total += len(batch)
+                        batch = []
+                entries.bulk_create(batch)
+                total += len(batch)
+                self.stdout.write(f'Indexed {model._meta.verbose_name_plural} ({database}).')
+        return total
@@ -0,0 +1,40 @@
+from django.db import models
+
+from apps.projects.models import ResearchProject
+
+
+class SearchEntry(models.Model):
+    """
+    Denormalised, searchable text for one project, document or message.
+
+    The full-text index itself is created by migration 0002 and is maintained
+    by the database: a generated ``tsvector`` column with a GIN index on
+    PostgreSQL, an external-content FTS5 table kept in sync by triggers on
+    SQLite. Rows here are upserted and deleted by apps/search/signals.py.
+    """
+
+    class Kind(models.TextChoices):
+        PROJECT = 'project', 'Project'
+        DOCUMENT = 'document', 'Document'
+        MESSAGE = 'message', 'Message'
+
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    object_id = models.PositiveBigIntegerField()
+    project = models.ForeignKey(
+        ResearchProject,
+        on_delete=models.CASCADE,
+        related_name='search_entries',
+    )
+    title = models.CharField(max_length=255, blank=True)
+    body = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Search Entry'
+        verbose_name_plural = 'Search Entries'
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='search_entry_kind_object_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.get_kind_display()} #{self.object_id}'
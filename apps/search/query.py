@@ -0,0 +1,129 @@
+import re
+
+from django.db import connections, router
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from apps.projects.access import is_admin
+from apps.projects.models import ResearchProject
+from apps.projects.sharding import project_databases
+from apps.search.models import SearchEntry
+
+# ──────────────────────────────────────────────
+# Full-text queries
+#
+# User input is reduced to word tokens, each matched as a prefix and all
+# required (``genom seq`` finds "genomic sequencing"). Ranking and matching
+# run in the database against the index created by migration 0002; results
+# are restricted to projects the user can access inside the same query.
+# With project shards, each database is searched and the results merged by
+# rank (each database ranks against its own statistics).
+# ──────────────────────────────────────────────
+
+MAX_TERMS = 8
+SNIPPET_RADIUS = 80
+
+ENTRY_TABLE = SearchEntry._meta.db_table
+FTS_TABLE = f'{ENTRY_TABLE}_fts'
+MEMBERSHIP = ResearchProject.researchers.through._meta
+
+
+def parse_terms(query):
+    """Return the lower-cased word tokens of ``query`` (at most MAX_TERMS)."""
+    return re.findall(r'\w+', (query or '').lower())[:MAX_TERMS]
+
+
+def _access_clause(user):
+    if is_admin(user):
+        return '', []
+    membership_table = MEMBERSHIP.db_table
+    project_column = MEMBERSHIP.get_field('researchproject').column
+    user_column = MEMBERSHIP.get_field('user').column
+    return (
+        f' AND e.project_id IN (SELECT {project_column} FROM {membership_table} WHERE {user_column} = %s)',
+        [user.pk],
+    )
+
+
+def _postgres_sql(terms, kind_clause, access_clause):
+    tsquery = ' & '.join(f'{term}:*' for term in terms)
+    sql = (
+        f'SELECT e.id, ts_rank(e.search_vector, q) AS rank '
+        f'FROM {ENTRY_TABLE} e, to_tsquery(\'english\', %s) q '
+        f'WHERE e.search_vector @@ q{kind_clause}{access_clause} '
+        f'ORDER BY rank DESC, e.updated_at DESC LIMIT %s'
+    )
+    return sql, [tsquery]
+
+
+def _sqlite_sql(terms, kind_clause, access_clause):
+    match = ' '.join(f'"{term}"*' for term in terms)
+    # bm25() is lower-is-better; weight title matches 10x body matches.
+    sql = (
+        f'SELECT e.id, -bm25({FTS_TABLE}, 10.0, 1.0) AS rank '
+        f'FROM {FTS_TABLE} JOIN {ENTRY_TABLE} e ON e.id = {FTS_TABLE}.rowid '
+        f'WHERE {FTS_TABLE} MATCH %s{kind_clause}{access_clause} '
+        f'ORDER BY rank DESC, e.updated_at DESC LIMIT %s'
+    )
+    return sql, [match]
+
+
+def search(user, query, kind=None, limit=50):
+    """
+    Return up to ``limit`` SearchEntry objects matching ``query`` that ``user``
+    may see, best match first. Each carries ``rank`` and ``snippet``.
+    """
+    terms = parse_terms(query)
+    if not terms:
+        return []
+
+    kind_clause, kind_params = '', []
+    if kind in SearchEntry.Kind.values:
+        kind_clause, kind_params = ' AND e.kind = %s', [kind]
+    access_clause, access_params = _access_clause(user)
+
+    ranked = []
+    for database in project_databases():
+        database = database or router.db_for_read(SearchEntry)
+        connection = connections[database]
+        build = _postgres_sql if connection.vendor == 'postgresql' else _sqlite_sql
+        sql, params = build(terms, kind_clause, access_clause)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params + kind_params + access_params + [limit])
+            ranked.extend((rank, database, pk) for pk, rank in cursor.fetchall())
+    ranked = sorted(ranked, key=lambda row: row[0], reverse=True)[:limit]
+
+    entries = {}
+    for database in {database for _rank, database, _pk in ranked}:
+        pks = [pk for _rank, in_database, pk in ranked if in_database == database]
+        entries[database] = SearchEntry.objects.using(database).select_related('project').in_bulk(pks)
+    results = []
+    for rank, database, pk in ranked:
+        entry = entries[database].get(pk)
+        if entry is None:
+            continue
+        entry.rank = rank
+        entry.snippet = highlight(entry.body, terms)
+        results.append(entry)
+    return results
+
+
+def highlight(text, terms):
+    """Return an escaped excerpt of ``text`` around the first match, with matches in <mark>."""
+    if not text:
+        return ''
+    pattern = re.compile(r'\b(?:' + '|'.join(re.escape(term) for term in terms) + r')\w*', re.IGNORECASE)
+    match = pattern.search(text)
+    start = max((match.start() if match else 0) - SNIPPET_RADIUS, 0)
+    end = min(start + 2 * SNIPPET_RADIUS, len(text))
+    excerpt = text[start:end]
+
+    parts, position = [], 0
+    for found in pattern.finditer(excerpt):
+        parts.append(escape(excerpt[position:found.start()]))
+        parts.append(f'<mark>{escape(found.group(0))}</mark>')
+        position = found.end()
+    parts.append(escape(excerpt[position:]))
+    prefix = '…' if start else ''
+    suffix = '…' if end < len(text) else ''
+    return mark_safe(prefix + ''.join(parts) + suffix)
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+
+from apps.search.indexing import INDEXED_MODELS, index_instance, unindex_instance
+
+
+def update_search_entry(sender, instance, raw=False, using=None, **kwargs):
+    """Keep the instance's SearchEntry in step with every save."""
+    if raw:
+        return
+    index_instance(instance, using)
+
+
+def remove_search_entry(sender, instance, using=None, **kwargs):
+    """Drop the SearchEntry of a deleted instance."""
+    unindex_instance(instance, using)
+
+
+for _model in INDEXED_MODELS:
+    post_save.connect(update_search_entry, sender=_model, dispatch_uid=f'search_index_{_model._meta.label_lower}')
+    post_delete.connect(remove_search_entry, sender=_model, dispatch_uid=f'search_unindex_{_model._meta.label_lower}')
@@ -0,0 +1,44 @@
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import render
+from django.urls import reverse
+
+from apps.search.models import SearchEntry
+from apps.search.query import parse_terms, search
+
+RESULTS_LIMIT = 50
+
+
+def _result_url(entry):
+    if entry.kind == SearchEntry.Kind.PROJECT:
+        return reverse('projects:project_detail', kwargs={'pk': entry.project_id})
+    if entry.kind == SearchEntry.Kind.DOCUMENT:
+        return reverse('documents:document_download', kwargs={'project_id': entry.project_id, 'document_id': entry.object_id})
+    return reverse('communication:project_messages', kwargs={'project_id': entry.project_id})
+
+
+# ──────────────────────────────────────────────
+# Search
+# ──────────────────────────────────────────────
+
+@login_required
+def search_view(request):
+    """
+    Ranked full-text search over projects, document titles and messages.
+    ADMIN → searches every project.
+    RESEARCHER → only projects they are assigned to.
+    """
+    query = request.GET.get('q', '').strip()
+    kind = request.GET.get('type', '')
+
+    results = search(request.user, query, kind=kind, limit=RESULTS_LIMIT) if query else []
+    for entry in results:
+        entry.url = _result_url(entry)
+
+    context = {
+        'query': query,
+        'kind': kind if kind in SearchEntry.Kind.values else '',
+        'kinds': SearchEntry.Kind.choices,
+        'results': results,
+        'searched': bool(parse_terms(query)),
+    }
+    return render(request, 'search/search_results.html', context)
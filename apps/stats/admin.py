@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from apps.stats.models import DailyActiveUser, Rollup
+
+
+@admin.register(Rollup)
+class RollupAdmin(admin.ModelAdmin):
+    list_display = ('bucket', 'metric', 'value', 'updated_at')
+    list_filter = ('metric',)
+    search_fields = ('bucket',)
+    readonly_fields = ('updated_at',)
+
+
+@admin.register(DailyActiveUser)
+class DailyActiveUserAdmin(admin.ModelAdmin):
+    list_display = ('day', 'user')
+    list_filter = ('day',)
+    raw_id_fields = ('user',)
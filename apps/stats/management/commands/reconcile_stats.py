@@ -0,0 +1,172 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.communication.models import ProjectMessage
+from apps.documents.models import Document
+from apps.projects.models import ResearchProject
+from apps.projects.sharding import project_databases
+from apps.stats.models import DailyActiveUser, Rollup
+from apps.stats.rollups import (
+    ACTIVE_PROJECTS, ACTIVE_USERS, DOCUMENTS, GLOBAL, MESSAGES, PROJECTS, RESEARCHERS, STORAGE_BYTES,
+    day_bucket, project_bucket, user_bucket,
+)
+
+Membership = ResearchProject.researchers.through
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute every statistics rollup from the source tables and fix any '
+        'counter that has drifted. Daily activity counters are only raised, '
+        'never lowered: they record what happened that day, including content '
+        'deleted since. The counters stay locked while the source tables are '
+        'counted, so new messages and uploads wait for it to finish: schedule it '
+        'off-peak (render.yaml runs it nightly). Counters created while it runs '
+        'are left for the next run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Daily buckets to rebuild (default: 30).')
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without writing.')
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('--days must be positive.')
+        since = timezone.localdate() - timedelta(days=options['days'] - 1)
+
+        with transaction.atomic():
+            # Lock the counters before counting. Every write saves its rows and
+            # bumps their counters in one transaction (see project_atomic), so
+            # a write that has to wait for the lock is not in the count yet:
+            # its increment lands on the corrected value afterwards.
+            rollups = Rollup.objects.all() if options['dry_run'] else Rollup.objects.select_for_update()
+            day_buckets = {day_bucket(since + timedelta(days=n)) for n in range(options['days'])}
+            existing = {
+                (row.bucket, row.metric): row
+                for row in rollups.exclude(bucket__startswith='day:').iterator()
+            }
+            existing.update({
+                (row.bucket, row.metric): row
+                for row in rollups.filter(bucket__in=day_buckets)
+            })
+            expected = self._expected_values(since)
+
+            to_create, to_update = {}, {}
+            for key, value in expected.items():
+                row = existing.pop(key, None)
+                if row is None:
+                    to_create[key] = value
+                elif row.value != value and not (key[0] in day_buckets and row.value > value):
+                    to_update[row] = value
+            to_delete = [
+                row.pk for (bucket, _metric), row in existing.items()
+                if row.value and bucket not in day_buckets
+            ]
+
+            for row, value in to_update.items():
+                self.stdout.write(f'  {row.bucket}/{row.metric}: {row.value} → {value}')
+            if not options['dry_run']:
+                # Corrected by the drift seen under the lock, never to the
+                # absolute count: whatever lands on a row since is kept.
+                by_delta = {}
+                for row, value in to_update.items():
+                    by_delta.setdefault(value - row.value, []).append(row.pk)
+                for delta, pks in by_delta.items():
+                    Rollup.objects.filter(pk__in=pks).update(value=F('value') + delta)
+                # A counter a signal created since the scan started already
+                # holds increments the count may include; it keeps them.
+                Rollup.objects.bulk_create(
+                    [Rollup(bucket=bucket, metric=metric, value=value) for (bucket, metric), value in to_create.items()],
+                    batch_size=1000,
+                    ignore_conflicts=True,
+                )
+                Rollup.objects.filter(pk__in=to_delete).delete()
+                self._store_daily_active()
+            else:
+                transaction.set_rollback(True)
+
+        verb = 'Would fix' if options['dry_run'] else 'Fixed'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {len(to_update)} drifted, {len(to_create)} missing and {len(to_delete)} stale counter(s).'
+        ))
+
+    def _expected_values(self, since):
+        values = {}
+
+        def put(bucket, metric, value):
+            # Summed: projects and their rows may be spread over several databases.
+            if value:
+                values[(bucket, metric)] = values.get((bucket, metric), 0) + value
+
+        active = set()
+        for database in project_databases():
+            self._count_database(database, since, put)
+            active.update(self._active_pairs(database, since))
+
+        active.update(DailyActiveUser.objects.filter(day__gte=since).values_list('day', 'user_id'))
+        per_day = {}
+        for day, _user_id in active:
+            per_day[day] = per_day.get(day, 0) + 1
+        for day, count in per_day.items():
+            put(day_bucket(day), ACTIVE_USERS, count)
+        self._active = active
+        return values
+
+    def _count_database(self, database, since, put):
+        projects = ResearchProject.objects.using(database)
+        documents = Document.objects.using(database)
+        messages = ProjectMessage.objects.using(database)
+        memberships = Membership.objects.using(database)
+
+        put(GLOBAL, PROJECTS, projects.count())
+        put(GLOBAL, ACTIVE_PROJECTS, projects.filter(status=ResearchProject.Status.ACTIVE).count())
+        totals = documents.aggregate(count=Count('id'), size=Sum('size'))
+        put(GLOBAL, DOCUMENTS, totals['count'])
+        put(GLOBAL, STORAGE_BYTES, totals['size'] or 0)
+        put(GLOBAL, MESSAGES, messages.count())
+
+        for project_id, count in memberships.values_list('researchproject_id').annotate(n=Count('id')):
+            put(project_bucket(project_id), RESEARCHERS, count)
+        for user_id, count in memberships.values_list('user_id').annotate(n=Count('id')):
+            put(user_bucket(user_id), PROJECTS, count)
+
+        for project_id, count, size in documents.values_list('project_id').annotate(n=Count('id'), s=Sum('size')):
+            put(project_bucket(project_id), DOCUMENTS, count)
+            put(project_bucket(project_id), STORAGE_BYTES, size or 0)
+        for user_id, count in documents.values_list('uploaded_by_id').annotate(n=Count('id')):
+            put(user_bucket(user_id), DOCUMENTS, count)
+
+        for project_id, count in messages.values_list('project_id').annotate(n=Count('id')):
+            put(project_bucket(project_id), MESSAGES, count)
+        for user_id, count in messages.values_list('sender_id').annotate(n=Count('id')):
+            put(user_bucket(user_id), MESSAGES, count)
+
+        recent_documents = documents.filter(uploaded_at__date__gte=since).annotate(day=TruncDate('uploaded_at'))
+        for day, count in recent_documents.values_list('day').annotate(n=Count('id')):
+            put(day_bucket(day), DOCUMENTS, count)
+        recent_messages = messages.filter(created_at__date__gte=since).annotate(day=TruncDate('created_at'))
+        for day, count in recent_messages.values_list('day').annotate(n=Count('id')):
+            put(day_bucket(day), MESSAGES, count)
+
+    def _active_pairs(self, database, since):
+        pairs = set(
+            Document.objects.using(database).filter(uploaded_at__date__gte=since)
+            .annotate(day=TruncDate('uploaded_at')).values_list('day', 'uploaded_by_id').distinct()
+        )
+        pairs.update(
+            ProjectMessage.objects.using(database).filter(created_at__date__gte=since)
+            .annotate(day=TruncDate('created_at')).values_list('day', 'sender_id').distinct()
+        )
+        return pairs
+
+    def _store_daily_active(self):
+        DailyActiveUser.objects.bulk_create(
+            [DailyActiveUser(day=day, user_id=user_id) for day, user_id in self._active],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.11 on 2026-10-18 14:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Rollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.CharField(max_length=40)),
+                ('metric', models.CharField(max_length=40)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Rollup',
+                'verbose_name_plural': 'Rollups',
+                'indexes': [models.Index(fields=['metric', '-value'], name='rollup_metric_value_idx')],
+                'constraints': [models.UniqueConstraint(fields=('bucket', 'metric'), name='rollup_bucket_metric_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyActiveUser',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Daily Active User',
+                'verbose_name_plural': 'Daily Active Users',
+                'constraints': [models.UniqueConstraint(fields=('day', 'user'), name='daily_active_user_uniq')],
+            },
+        ),
+    ]
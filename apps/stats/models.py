@@ -0,0 +1,50 @@
+from django.contrib.auth.models import User
+from django.db import models
+
+
+class Rollup(models.Model):
+    """
+    One precomputed counter, e.g. ("project:42", "messages") → 1031.
+
+    Buckets (see apps/stats/rollups.py):
+      global          platform-wide totals
+      project:<id>    per-project totals
+      user:<id>       per-user totals
+      day:<date>      daily activity
+    Values are adjusted by signals as data changes and repaired by
+    ``manage.py reconcile_stats``.
+    """
+    bucket = models.CharField(max_length=40)
+    metric = models.CharField(max_length=40)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Rollup'
+        verbose_name_plural = 'Rollups'
+        constraints = [
+            models.UniqueConstraint(fields=['bucket', 'metric'], name='rollup_bucket_metric_uniq'),
+        ]
+        indexes = [
+            # "Top N projects by <metric>" without scanning every bucket.
+            models.Index(fields=['metric', '-value'], name='rollup_metric_value_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.bucket}/{self.metric} = {self.value}'
+
+
+class DailyActiveUser(models.Model):
+    """Marks that a user posted or uploaded something on a given day."""
+    day = models.DateField()
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        verbose_name = 'Daily Active User'
+        verbose_name_plural = 'Daily Active Users'
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'user'], name='daily_active_user_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} on {self.day}'
@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.stats.models import DailyActiveUser, Rollup
+
+# ──────────────────────────────────────────────
+# Rollup counters
+#
+# Writes are relative (``value = value + delta``) so concurrent requests
+# never lose updates; reads fetch a handful of rows by their unique key, so
+# a dashboard costs the same few indexed lookups however large the tables
+# behind it grow.
+# ──────────────────────────────────────────────
+
+GLOBAL = 'global'
+
+PROJECTS = 'projects'
+ACTIVE_PROJECTS = 'active_projects'
+DOCUMENTS = 'documents'
+MESSAGES = 'messages'
+STORAGE_BYTES = 'storage_bytes'
+RESEARCHERS = 'researchers'
+ACTIVE_USERS = 'active_users'
+
+
+def project_bucket(project_id):
+    return f'project:{project_id}'
+
+
+def user_bucket(user_id):
+    return f'user:{user_id}'
+
+
+def day_bucket(day):
+    return f'day:{day.isoformat()}'
+
+
+def bump(changes):
+    """Apply ``{(bucket, metric): delta}`` increments, creating missing counters."""
+    for (bucket, metric), delta in changes.items():
+        if not delta:
+            continue
+        if Rollup.objects.filter(bucket=bucket, metric=metric).update(value=F('value') + delta):
+            continue
+        try:
+            with transaction.atomic():
+                Rollup.objects.create(bucket=bucket, metric=metric, value=delta)
+        except IntegrityError:
+            # Created concurrently; apply the delta to that row instead.
+            Rollup.objects.filter(bucket=bucket, metric=metric).update(value=F('value') + delta)
+
+
+def mark_active(user_id, day=None):
+    """Record activity by ``user_id`` today, counting each user once per day."""
+    day = day or timezone.localdate()
+    if DailyActiveUser.objects.filter(day=day, user_id=user_id).exists():
+        return
+    try:
+        with transaction.atomic():
+            DailyActiveUser.objects.create(day=day, user_id=user_id)
+    except IntegrityError:
+        return
+    bump({(day_bucket(day), ACTIVE_USERS): 1})
+
+
+def read(*buckets):
+    """Return ``{bucket: {metric: value}}`` for ``buckets`` in one query; missing → empty."""
+    values = {bucket: {} for bucket in buckets}
+    rows = Rollup.objects.filter(bucket__in=buckets).values_list('bucket', 'metric', 'value')
+    for bucket, metric, value in rows:
+        values[bucket][metric] = value
+    return values
+
+
+def daily_series(metrics, days=14):
+    """
+    Return ``[(date, {metric: value}), …]`` for the last ``days`` days, oldest
+    first, with a single query over the day buckets.
+    """
+    today = timezone.localdate()
+    dates = [today - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+    values = read(*(day_bucket(day) for day in dates))
+    return [
+        (day, {metric: values[day_bucket(day)].get(metric, 0) for metric in metrics})
+        for day in dates
+    ]
+
+
+def top_projects(metric, limit=5):
+    """Return ``[(project_id, value), …]`` of the projects with the highest ``metric``."""
+    rows = (
+        Rollup.objects
+        .filter(metric=metric, bucket__startswith='project:', value__gt=0)
+        .order_by('-value')
+        .values_list('bucket', 'value')[:limit]
+    )
+    return [(int(bucket.split(':', 1)[1]), value) for bucket, value in rows]
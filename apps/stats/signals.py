@@ -0,0 +1,178 @@
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.communication.models import ProjectMessage
+from apps.documents.models import Document
+from apps.projects.membership import membership_changed
+from apps.projects.models import ResearchProject
+from apps.projects.sharding import project_databases
+from apps.stats.models import Rollup
+from apps.stats.rollups import (
+    ACTIVE_PROJECTS, DOCUMENTS, GLOBAL, MESSAGES, PROJECTS, RESEARCHERS, STORAGE_BYTES,
+    bump, day_bucket, mark_active, project_bucket, user_bucket,
+)
+
+Membership = ResearchProject.researchers.through
+
+
+# ──────────────────────────────────────────────
+# Projects
+# ──────────────────────────────────────────────
+
+@receiver(pre_save, sender=ResearchProject)
+def remember_project_status(sender, instance, raw=False, using=None, **kwargs):
+    if raw or instance._state.adding:
+        return
+    instance._stats_old_status = sender.objects.using(using).filter(pk=instance.pk).values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=ResearchProject)
+def count_project(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    is_active = instance.status == ResearchProject.Status.ACTIVE
+    if created:
+        bump({(GLOBAL, PROJECTS): 1, (GLOBAL, ACTIVE_PROJECTS): int(is_active)})
+        return
+    was_active = getattr(instance, '_stats_old_status', None) == ResearchProject.Status.ACTIVE
+    if was_active != is_active:
+        bump({(GLOBAL, ACTIVE_PROJECTS): 1 if is_active else -1})
+
+
+@receiver(pre_delete, sender=ResearchProject)
+def remember_project_members(sender, instance, using=None, **kwargs):
+    # Membership rows are removed by cascade, which sends no m2m_changed.
+    instance._stats_member_ids = list(
+        Membership.objects.using(using).filter(researchproject_id=instance.pk).values_list('user_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=ResearchProject)
+def uncount_project(sender, instance, **kwargs):
+    changes = {(GLOBAL, PROJECTS): -1}
+    if instance.status == ResearchProject.Status.ACTIVE:
+        changes[(GLOBAL, ACTIVE_PROJECTS)] = -1
+    for user_id in getattr(instance, '_stats_member_ids', ()):
+        changes[(user_bucket(user_id), PROJECTS)] = -1
+    bump(changes)
+    Rollup.objects.filter(bucket=project_bucket(instance.pk)).delete()
+
+
+@receiver(m2m_changed, sender=Membership)
+def count_membership(sender, instance, action, reverse, pk_set, using=None, **kwargs):
+    """Track researchers per project and projects per researcher."""
+    if action in ('pre_remove', 'pre_clear'):
+        # pk_set may name pairs that don't exist; count only real links.
+        links = Membership.objects.using(using).filter(**{'user_id' if reverse else 'researchproject_id': instance.pk})
+        if action == 'pre_remove':
+            links = links.filter(**{'researchproject_id__in' if reverse else 'user_id__in': pk_set})
+        instance._stats_removed_links = list(links.values_list('researchproject_id', 'user_id'))
+        return
+
+    if action == 'post_add':
+        links = [(pk, instance.pk) if reverse else (instance.pk, pk) for pk in pk_set]
+        delta = 1
+    elif action in ('post_remove', 'post_clear'):
+        links = getattr(instance, '_stats_removed_links', [])
+        delta = -1
+    else:
+        return
+
+    changes = {}
+    _count_links(changes, links, delta)
+    bump(changes)
+
+
+@receiver(membership_changed)
+def count_bulk_membership(sender, added=(), removed=(), **kwargs):
+    changes = {}
+    _count_links(changes, added, 1)
+    _count_links(changes, removed, -1)
+    bump(changes)
+
+
+def _count_links(changes, links, delta):
+    for project_id, user_id in links:
+        for key in ((project_bucket(project_id), RESEARCHERS), (user_bucket(user_id), PROJECTS)):
+            changes[key] = changes.get(key, 0) + delta
+
+
+# ──────────────────────────────────────────────
+# Documents and messages
+# ──────────────────────────────────────────────
+
+@receiver(post_save, sender=Document)
+def count_document(sender, instance, created, raw=False, **kwargs):
+    if not created or raw:
+        return
+    bump({
+        (GLOBAL, DOCUMENTS): 1,
+        (GLOBAL, STORAGE_BYTES): instance.size,
+        (project_bucket(instance.project_id), DOCUMENTS): 1,
+        (project_bucket(instance.project_id), STORAGE_BYTES): instance.size,
+        (user_bucket(instance.uploaded_by_id), DOCUMENTS): 1,
+        (day_bucket(timezone.localdate()), DOCUMENTS): 1,
+    })
+    mark_active(instance.uploaded_by_id)
+
+
+@receiver(post_delete, sender=Document)
+def uncount_document(sender, instance, **kwargs):
+    bump({
+        (GLOBAL, DOCUMENTS): -1,
+        (GLOBAL, STORAGE_BYTES): -instance.size,
+        (project_bucket(instance.project_id), DOCUMENTS): -1,
+        (project_bucket(instance.project_id), STORAGE_BYTES): -instance.size,
+        (user_bucket(instance.uploaded_by_id), DOCUMENTS): -1,
+    })
+
+
+@receiver(post_save, sender=ProjectMessage)
+def count_message(sender, instance, created, raw=False, **kwargs):
+    if not created or raw:
+        return
+    bump({
+        (GLOBAL, MESSAGES): 1,
+        (project_bucket(instance.project_id), MESSAGES): 1,
+        (user_bucket(instance.sender_id), MESSAGES): 1,
+        (day_bucket(timezone.localdate()), MESSAGES): 1,
+    })
+    mark_active(instance.sender_id)
+
+
+@receiver(post_delete, sender=ProjectMessage)
+def uncount_message(sender, instance, **kwargs):
+    bump({
+        (GLOBAL, MESSAGES): -1,
+        (project_bucket(instance.project_id), MESSAGES): -1,
+        (user_bucket(instance.sender_id), MESSAGES): -1,
+    })
+
+
+# ──────────────────────────────────────────────
+# Users
+# ──────────────────────────────────────────────
+
+@receiver(pre_delete, sender=User)
+def remember_user_projects(sender, instance, using=None, **kwargs):
+    # The copies of a user on project shards are deleted afterwards; the
+    # user is only counted out once, here.
+    if using != DEFAULT_DB_ALIAS:
+        return
+    instance._stats_project_ids = [
+        project_id
+        for database in project_databases()
+        for project_id in Membership.objects.using(database).filter(user_id=instance.pk)
+        .values_list('researchproject_id', flat=True)
+    ]
+
+
+@receiver(post_delete, sender=User)
+def drop_user_rollups(sender, instance, using=None, **kwargs):
+    if using != DEFAULT_DB_ALIAS:
+        return
+    bump({(project_bucket(project_id), RESEARCHERS): -1 for project_id in getattr(instance, '_stats_project_ids', ())})
+    Rollup.objects.filter(bucket=user_bucket(instance.pk)).delete()
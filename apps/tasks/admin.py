@@ -0,0 +1,20 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from apps.tasks.models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'priority', 'attempts', 'max_attempts', 'run_after', 'locked_by')
+    list_filter = ('status', 'name')
+    readonly_fields = ('created_at', 'locked_by', 'locked_at', 'last_error')
+    actions = ['retry_tasks']
+
+    @admin.action(description='Retry selected tasks now')
+    def retry_tasks(self, request, queryset):
+        """Put failed (or delayed) tasks back at the front of the queue."""
+        updated = queryset.exclude(status=Task.Status.RUNNING).update(
+            status=Task.Status.QUEUED, attempts=0, run_after=timezone.now(), last_error='',
+        )
+        self.message_user(request, f'{updated} task(s) re-queued.')
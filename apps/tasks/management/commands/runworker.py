@@ -0,0 +1,41 @@
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.tasks.queue import registered_tasks
+from apps.tasks.worker import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        'Run a background task worker backed by the database queue. '
+        'Start as many as needed; they coordinate through row locks.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=2, help='Tasks run at once by this worker (default: 2).')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds between polls when idle (default: 1).')
+        parser.add_argument('--burst', action='store_true', help='Exit once the queue is empty instead of waiting for work.')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency must be positive.')
+        worker = Worker(
+            concurrency=options['concurrency'],
+            poll_interval=options['poll_interval'],
+            burst=options['burst'],
+        )
+
+        def shutdown(signum, frame):
+            self.stdout.write('Stopping: finishing running tasks…')
+            worker.stop()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        self.stdout.write(
+            f'Worker {worker.worker_id} started with concurrency {worker.concurrency}; '
+            f'{len(registered_tasks())} task type(s) registered.'
+        )
+        worker.run()
+        self.stdout.write('Worker stopped.')
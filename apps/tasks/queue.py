@@ -0,0 +1,97 @@
+import logging
+from datetime import timedelta
+
+from django.utils import timezone
+
+from apps.tasks.models import Task
+
+logger = logging.getLogger(__name__)
+
+# ──────────────────────────────────────────────
+# Task registry and enqueueing
+#
+#   # apps/<app>/tasks.py
+#   @task(max_attempts=3, max_concurrency=2)
+#   def extract_text(document_id): ...
+#
+#   extract_text.enqueue(document.pk)          # runs in `manage.py runworker`
+#
+# Arguments must be JSON-serialisable; pass primary keys, not objects.
+# ──────────────────────────────────────────────
+
+_registry = {}
+
+
+class TaskFunction:
+    """A registered task: still callable directly, plus ``enqueue``."""
+
+    def __init__(self, func, name, priority, max_attempts, max_concurrency, retry_delay):
+        self.func = func
+        self.name = name
+        self.priority = priority
+        self.max_attempts = max_attempts
+        self.max_concurrency = max_concurrency
+        self.retry_delay = retry_delay
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __repr__(self):
+        return f'<task {self.name}>'
+
+    def enqueue(self, *args, **kwargs):
+        """Queue a call with the task's default priority. Returns the Task row."""
+        return enqueue(self, args=args, kwargs=kwargs)
+
+    def retry_backoff(self, attempts):
+        """Seconds to wait before attempt ``attempts + 1``: exponential, capped at an hour."""
+        return min(self.retry_delay * 2 ** max(attempts - 1, 0), 3600)
+
+
+def task(func=None, *, name=None, priority=0, max_attempts=5, max_concurrency=None, retry_delay=10):
+    """
+    Register ``func`` as a background task.
+
+    priority        → higher runs first.
+    max_attempts    → total tries before the task is marked FAILED.
+    max_concurrency → most instances running at once across all workers (None: no limit).
+    retry_delay     → seconds before the first retry; doubles on each further failure.
+    """
+    def register(func):
+        task_name = name or f'{func.__module__}.{func.__qualname__}'
+        wrapped = TaskFunction(func, task_name, priority, max_attempts, max_concurrency, retry_delay)
+        _registry[task_name] = wrapped
+        return wrapped
+
+    return register(func) if func is not None else register
+
+
+def get_task(name):
+    """Return the registered TaskFunction called ``name``, or None."""
+    return _registry.get(name)
+
+
+def registered_tasks():
+    return dict(_registry)
+
+
+def enqueue(task_function, args=(), kwargs=None, priority=None, delay=None):
+    """
+    Queue ``task_function`` for a worker, in the current transaction.
+
+    ``delay`` (seconds or timedelta) postpones the earliest start.
+    """
+    if isinstance(task_function, str):
+        task_function = _registry[task_function]
+    run_after = timezone.now()
+    if delay:
+        run_after += delay if isinstance(delay, timedelta) else timedelta(seconds=delay)
+    return Task.objects.create(
+        name=task_function.name,
+        args=list(args),
+        kwargs=kwargs or {},
+        priority=task_function.priority if priority is None else priority,
+        max_attempts=task_function.max_attempts,
+        run_after=run_after,
+    )
@@ -0,0 +1,206 @@
+import logging
+import os
+import random
+import socket
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from apps.tasks.models import Task
+from apps.tasks.queue import get_task, registered_tasks
+
+logger = logging.getLogger(__name__)
+
+# ──────────────────────────────────────────────
+# Worker
+#
+# Claiming is a short transaction: queued rows are selected with
+# SELECT … FOR UPDATE SKIP LOCKED (so concurrent workers never block on, or
+# double-claim, the same row) and flipped to RUNNING. The task itself then
+# runs outside any lock in a thread of this worker. While it runs, the
+# worker renews its lease (settings.TASK_LEASE_SECONDS) every third of that
+# time, so a long task is never mistaken for a lost one. A worker that dies
+# mid-task stops renewing; its RUNNING row's lease expires and the task is
+# retried.
+#
+# Per-task ``max_concurrency`` is checked against the RUNNING rows at claim
+# time; two workers claiming at the same instant may overshoot it by one.
+# ──────────────────────────────────────────────
+
+
+def _release_expired_leases(now):
+    expired = now - timedelta(seconds=settings.TASK_LEASE_SECONDS)
+    stale = Task.objects.filter(status=Task.Status.RUNNING, locked_at__lt=expired)
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Task.Status.FAILED, locked_by='', last_error='Lease expired: the worker running it stopped responding.',
+    )
+    released = stale.update(status=Task.Status.QUEUED, locked_by='', run_after=now)
+    if released:
+        logger.warning('Re-queued %d task(s) whose worker lease expired.', released)
+
+
+def claim_tasks(worker_id, limit):
+    """Lock and mark up to ``limit`` runnable tasks as RUNNING for ``worker_id``."""
+    if limit <= 0:
+        return []
+    now = timezone.now()
+    _release_expired_leases(now)
+
+    limited = {name: fn.max_concurrency for name, fn in registered_tasks().items() if fn.max_concurrency}
+    running = dict(
+        Task.objects.filter(status=Task.Status.RUNNING, name__in=limited)
+        .values_list('name').annotate(count=Count('id'))
+    ) if limited else {}
+    headroom = {name: cap - running.get(name, 0) for name, cap in limited.items()}
+    saturated = [name for name, room in headroom.items() if room <= 0]
+
+    claimed = []
+    with transaction.atomic():
+        candidates = (
+            Task.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=Task.Status.QUEUED, run_after__lte=now)
+            .exclude(name__in=saturated)
+            .order_by('-priority', 'run_after', 'id')[:limit * 2]
+        )
+        for candidate in candidates:
+            if candidate.name in headroom:
+                if headroom[candidate.name] <= 0:
+                    continue
+                headroom[candidate.name] -= 1
+            # The status guard keeps claiming safe on backends without row locks (SQLite).
+            updated = Task.objects.filter(pk=candidate.pk, status=Task.Status.QUEUED).update(
+                status=Task.Status.RUNNING, locked_by=worker_id, locked_at=now, attempts=F('attempts') + 1,
+            )
+            if updated:
+                candidate.attempts += 1
+                claimed.append(candidate)
+            if len(claimed) >= limit:
+                break
+    return claimed
+
+
+def execute_task(task_row):
+    """Run one claimed task and record the outcome."""
+    close_old_connections()
+    try:
+        task_function = get_task(task_row.name)
+        if task_function is None:
+            _record_failure(task_row, None, f'No task registered as {task_row.name!r}.', retry=False)
+            return
+        try:
+            task_function(*task_row.args, **task_row.kwargs)
+        except Exception:
+            logger.exception('Task %s #%s failed (attempt %s/%s)', task_row.name, task_row.pk, task_row.attempts, task_row.max_attempts)
+            _record_failure(task_row, task_function, traceback.format_exc(), retry=True)
+        else:
+            Task.objects.filter(pk=task_row.pk).delete()
+    finally:
+        connections.close_all()
+
+
+def _record_failure(task_row, task_function, error, retry):
+    if retry and task_row.attempts < task_row.max_attempts:
+        delay = task_function.retry_backoff(task_row.attempts)
+        delay += random.uniform(0, delay * 0.1)  # jitter so failed batches don't retry in lockstep
+        Task.objects.filter(pk=task_row.pk).update(
+            status=Task.Status.QUEUED,
+            run_after=timezone.now() + timedelta(seconds=delay),
+            locked_by='',
+            last_error=error,
+        )
+    else:
+        Task.objects.filter(pk=task_row.pk).update(status=Task.Status.FAILED, locked_by='', last_error=error)
+
+
+class Worker:
+    """Poll the queue and run tasks on ``concurrency`` threads until stopped."""
+
+    def __init__(self, concurrency=1, poll_interval=1.0, burst=False):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.burst = burst
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self._stop = threading.Event()
+        self._idle = threading.Condition()
+        self._inflight = 0
+        self._running = set()
+
+    def stop(self):
+        """Stop claiming new tasks; running ones are allowed to finish."""
+        self._stop.set()
+        with self._idle:
+            self._idle.notify_all()
+
+    def _run(self, task_row):
+        try:
+            execute_task(task_row)
+        finally:
+            with self._idle:
+                self._inflight -= 1
+                self._running.discard(task_row.pk)
+                self._idle.notify_all()
+
+    def _heartbeat(self, done):
+        """Renew the leases of this worker's running tasks until ``done`` is set."""
+        while not done.wait(settings.TASK_LEASE_SECONDS / 3):
+            with self._idle:
+                running = list(self._running)
+            if not running:
+                continue
+            try:
+                Task.objects.filter(
+                    pk__in=running, status=Task.Status.RUNNING, locked_by=self.worker_id,
+                ).update(locked_at=timezone.now())
+            except Exception:
+                logger.exception('Could not renew task leases; retrying.')
+            finally:
+                connections.close_all()
+
+    def run(self):
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(done,), name='task-heartbeat', daemon=True)
+        heartbeat.start()
+        try:
+            self._poll()
+        finally:
+            # Only now have the running tasks finished.
+            done.set()
+            heartbeat.join()
+
+    def _poll(self):
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='task') as pool:
+            while not self._stop.is_set():
+                with self._idle:
+                    # Wait for a free thread before claiming anything.
+                    while self._inflight >= self.concurrency and not self._stop.is_set():
+                        self._idle.wait()
+                    free = self.concurrency - self._inflight
+                if self._stop.is_set():
+                    break
+
+                try:
+                    claimed = claim_tasks(self.worker_id, free)
+                except Exception:
+                    logger.exception('Could not claim tasks; retrying.')
+                    connections.close_all()
+                    claimed = []
+
+                with self._idle:
+                    self._inflight += len(claimed)
+                    self._running.update(task_row.pk for task_row in claimed)
+                for task_row in claimed:
+                    pool.submit(self._run, task_row)
+
+                if not claimed:
+                    with self._idle:
+                        if self.burst and self._inflight == 0:
+                            break
+                        self._idle.wait(self.poll_interval)
+        connections.close_all()
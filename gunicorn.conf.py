@@ -0,0 +1,138 @@
+"""
+Gunicorn configuration for the production ASGI deployment.
+
+Gunicorn manages the processes; each worker is a uvicorn event loop running
+``researchcollab.asgi:application``, so a single process serves many slow
+clients (and the long-lived event streams) concurrently instead of one
+request at a time. Read automatically by ``gunicorn`` from the working
+directory; see start.sh.
+
+Sizing is derived from the cores and memory actually available to the
+container; WEB_CONCURRENCY and the other WEB_* variables below override
+it.
+
+With more than one worker, server-sent events only reach every client
+through the real-time relay (REALTIME_BROKER in settings): start.sh runs
+``manage.py runbroker`` beside gunicorn and selects SocketBroker. The task
+worker (``manage.py runworker``) runs beside it too, since it reads the
+uploaded files on this service's disk.
+"""
+import os
+from pathlib import Path
+
+wsgi_app = 'researchcollab.asgi:application'
+worker_class = 'uvicorn_worker.UvicornWorker'
+
+bind = f'0.0.0.0:{os.environ.get("PORT", "8000")}'
+
+
+# ──────────────────────────────────────────────
+# Sizing
+# ──────────────────────────────────────────────
+
+def _cpu_count():
+    """Cores this process may use, honouring affinity and a cgroup v2 CPU quota."""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:  # not on Linux
+        cores = os.cpu_count() or 1
+    try:
+        quota, period = Path('/sys/fs/cgroup/cpu.max').read_text().split()
+        if quota != 'max':
+            cores = min(cores, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cores
+
+
+def _memory_mb():
+    """Memory available to the container in MiB (cgroup limit, else physical RAM), or None."""
+    for limit_file in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            value = Path(limit_file).read_text().strip()
+        except OSError:
+            continue
+        # cgroup v1 reports "no limit" as a huge number rather than "max".
+        if value != 'max' and int(value) < 1 << 50:
+            return int(value) // (1024 * 1024)
+    try:
+        for line in Path('/proc/meminfo').read_text().splitlines():
+            if line.startswith('MemTotal:'):
+                return int(line.split()[1]) // 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _workers(cores, memory):
+    if os.environ.get('WEB_CONCURRENCY'):
+        return int(os.environ['WEB_CONCURRENCY'])
+    workers = cores * 2 + 1
+    if memory:
+        # Leave room for the master, the relay and the task worker started by start.sh.
+        per_worker = int(os.environ.get('WEB_WORKER_MEMORY_MB', 160))
+        workers = min(workers, (memory - per_worker) // per_worker)
+    return max(1, workers)
+
+
+_cores = _cpu_count()
+workers = _workers(_cores, _memory_mb())
+
+# No ``threads``: gunicorn only reads it for gthread workers, and under ASGI
+# Django runs each request's sync code (the ORM, templates) on a thread of
+# that request's own. Database connections are bounded per worker by
+# DB_POOL_MAX_SIZE instead; further requests wait for one (see settings).
+
+
+# ──────────────────────────────────────────────
+# Lifecycle
+# ──────────────────────────────────────────────
+
+# Import Django, the URLconf and the templates once in the master; forked
+# workers share those pages copy-on-write instead of each loading its own.
+preload_app = True
+
+# Recycle workers to bound slow memory growth; the jitter keeps them from
+# all restarting at once.
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('WEB_MAX_REQUESTS_JITTER', max_requests // 10))
+
+# For uvicorn workers this is a liveness timeout for the worker process,
+# not a per-request limit, so event streams are not cut off.
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+# Render terminates TLS at its proxy; trust its X-Forwarded-* headers.
+forwarded_allow_ips = '*'
+
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    """Warm the preloaded app in the master; forked workers inherit the result."""
+    from django.conf import settings
+    from django.db import connections
+
+    from researchcollab.warmup import check_connection_limits, warm_up
+
+    warm_up(connect=False)
+    if workers > 1 and settings.REALTIME_BROKER['BACKEND'].endswith('.InProcessBroker'):
+        server.log.warning(
+            'REALTIME_BROKER is InProcessBroker with %d workers: live updates only reach clients '
+            'of the worker that published them. Run runbroker and use SocketBroker (see start.sh).',
+            workers,
+        )
+    # Every worker and task worker has its own pool on each database.
+    check_connection_limits(workers + settings.TASK_WORKER_PROCESSES)
+    # Nothing opened in the master may leak into the workers.
+    connections.close_all()
+    server.log.info('Serving with %d workers (%d cores).', workers, _cores)
+
+
+def post_worker_init(worker):
+    """Open this worker's own database and cache connections before it accepts requests."""
+    from researchcollab.warmup import open_connections
+
+    open_connections()
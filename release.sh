@@ -6,6 +6,14 @@ set -o errexit
 
 python manage.py migrate
 
+# Project shards (DATABASE_SHARD_URLS), if any; each gets a copy of the users
+for alias in $(python manage.py shell -c "from django.conf import settings; print(' '.join(settings.PROJECT_SHARDS))"); do
+    python manage.py migrate --database="$alias"
+done
+
+# The dashboard statistics rollups are reconciled by the nightly
+# researchcollab-reconcile-stats cron job (render.yaml), not on every deploy.
+
 # Auto-create superuser if it doesn't exist
 python manage.py shell -c "
 from django.contrib.auth import get_user_model
@@ -2,6 +2,8 @@
 ASGI config for researchcollab project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+This is the production entry point (gunicorn + uvicorn workers, see
+render.yaml); it is required for the live project event streams.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
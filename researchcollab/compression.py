@@ -0,0 +1,179 @@
+"""
+On-the-fly compression of dynamic responses.
+
+Static files are precompressed by WhiteNoise at collectstatic time; this
+middleware covers everything rendered per request. Brotli is preferred when
+the client accepts it and the ``brotli`` package is installed, otherwise
+gzip. Streaming responses are compressed chunk by chunk and flushed after
+each chunk, so pages still arrive progressively. Event streams, byte-range
+responses and non-text content are passed through untouched.
+
+Pages reflect user input next to secrets such as the CSRF token, so, like
+Django's GZipMiddleware, every compressed body carries up to
+``MAX_RANDOM_BYTES`` of random padding against BREACH: in the gzip header's
+file name, as Django does, and for brotli, which has no such field, in a
+trailing HTML comment. Brotli is therefore only offered for HTML.
+"""
+import re
+import secrets
+import zlib
+from gzip import GzipFile
+
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import StreamingBuffer
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+# Smaller bodies gain nothing once headers and framing are counted.
+MIN_SIZE = 200
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+)
+
+ACCEPT_ENCODING_RE = re.compile(r'\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?')
+
+
+MAX_RANDOM_BYTES = GZipMiddleware.max_random_bytes
+
+
+class GzipStream:
+    encoding = 'gzip'
+
+    def __init__(self):
+        self._buffer = StreamingBuffer()
+        self._file = GzipFile(
+            filename=b'a' * secrets.randbelow(MAX_RANDOM_BYTES),
+            mode='wb', compresslevel=6, fileobj=self._buffer, mtime=0,
+        )
+
+    def compress(self, data, flush=False):
+        self._file.write(data)
+        if flush:
+            self._file.flush(zlib.Z_SYNC_FLUSH)
+        return self._buffer.read()
+
+    def finish(self):
+        self._file.close()
+        return self._buffer.read()
+
+
+class BrotliStream:
+    encoding = 'br'
+
+    def __init__(self):
+        self._compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=5)
+
+    def compress(self, data, flush=False):
+        out = self._compressor.process(data)
+        return out + self._compressor.flush() if flush else out
+
+    def finish(self):
+        # Random characters, so the padding's length survives compression.
+        padding = secrets.token_urlsafe(MAX_RANDOM_BYTES)[:secrets.randbelow(MAX_RANDOM_BYTES)]
+        return self._compressor.process(f'<!-- {padding} -->'.encode()) + self._compressor.finish()
+
+
+def accepted_encodings(header):
+    """Return the codings a client accepts (q > 0), lower-cased."""
+    accepted = set()
+    for part in (header or '').split(','):
+        match = ACCEPT_ENCODING_RE.match(part)
+        if not match:
+            continue
+        coding, quality = match.group(1).lower(), match.group(2)
+        try:
+            if quality is None or float(quality) > 0:
+                accepted.add(coding)
+        except ValueError:
+            continue
+    return accepted
+
+
+def choose_stream(request, content_type):
+    """Pick the best compressor for ``request``, or None to send identity."""
+    accepted = accepted_encodings(request.headers.get('Accept-Encoding'))
+    if brotli is not None and content_type == 'text/html' and ('br' in accepted or '*' in accepted):
+        return BrotliStream
+    if 'gzip' in accepted or '*' in accepted:
+        return GzipStream
+    return None
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress HTML, JSON and other text responses with brotli or gzip.
+
+    Place it below WhiteNoise (static files are already compressed) and
+    above anything that produces response content.
+    """
+
+    def process_response(self, request, response):
+        if not self._compressible(response):
+            return response
+        # The body now depends on the request's Accept-Encoding.
+        patch_vary_headers(response, ('Accept-Encoding',))
+        stream_class = choose_stream(request, self._content_type(response))
+        if stream_class is None:
+            return response
+
+        stream = stream_class()
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self._acompress(stream, response.streaming_content)
+            else:
+                response.streaming_content = self._compress(stream, response.streaming_content)
+            del response['Content-Length']
+        else:
+            if len(response.content) < MIN_SIZE:
+                return response
+            compressed = stream.compress(response.content) + stream.finish()
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # The representation changed, so a strong validator no longer applies.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = stream.encoding
+        return response
+
+    def _compressible(self, response):
+        if response.has_header('Content-Encoding') or response.has_header('Content-Range'):
+            return False
+        if response.status_code == 206 or response.has_header('Accept-Ranges'):
+            # Byte ranges address the identity encoding.
+            return False
+        content_type = self._content_type(response)
+        if content_type == 'text/event-stream':
+            return False
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    @staticmethod
+    def _content_type(response):
+        return response.get('Content-Type', '').split(';')[0].strip().lower()
+
+    @staticmethod
+    def _compress(stream, chunks):
+        for chunk in chunks:
+            if chunk:
+                yield stream.compress(chunk, flush=True)
+        yield stream.finish()
+
+    @staticmethod
+    async def _acompress(stream, chunks):
+        async for chunk in chunks:
+            if chunk:
+                yield stream.compress(chunk, flush=True)
+        yield stream.finish()
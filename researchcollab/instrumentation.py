@@ -0,0 +1,214 @@
+"""
+Per-request performance instrumentation.
+
+``PerformanceMiddleware`` measures every request: database query count and
+time, template render time and total time. The figures go out in one
+structured log line on the ``researchcollab.performance`` logger and, when
+settings.SERVER_TIMING_HEADER is on (by default only with DEBUG), in a
+``Server-Timing`` header visible in the browser's network panel.
+
+Views may declare an upper bound on their queries with ``@query_budget``.
+Exceeding it logs a warning, or raises ``QueryBudgetExceeded`` when
+settings.QUERY_BUDGET_STRICT is on (tests, ``manage.py benchmark``).
+"""
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger('researchcollab.performance')
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A view ran more queries than its ``@query_budget`` allows."""
+
+
+class RequestMetrics:
+    """Counters for one request, shared by everything running in its context."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.rendering = False
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self.started
+
+
+def current_metrics():
+    """Return the ``RequestMetrics`` of the request being handled, or None."""
+    return _current.get()
+
+
+# ──────────────────────────────────────────────
+# Database
+# ──────────────────────────────────────────────
+
+def _time_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - start
+        metrics.queries += 1
+
+
+def _install_query_timer(connection, **kwargs):
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+connection_created.connect(_install_query_timer, dispatch_uid='researchcollab.instrumentation')
+
+
+# ──────────────────────────────────────────────
+# Templates
+# ──────────────────────────────────────────────
+
+class TimedTemplate:
+    """Wrap a backend template so its top-level render is timed."""
+
+    def __init__(self, template):
+        self._template = template
+
+    def __getattr__(self, name):
+        return getattr(self._template, name)
+
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None or metrics.rendering:
+            # Nested renders are already inside the outer measurement.
+            return self._template.render(context, request)
+        metrics.rendering = True
+        start = time.perf_counter()
+        try:
+            return self._template.render(context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - start
+            metrics.rendering = False
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, reporting render time to the request metrics."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+# ──────────────────────────────────────────────
+# Query budgets
+# ──────────────────────────────────────────────
+
+def query_budget(limit, methods=('GET', 'HEAD'), per_shard=0):
+    """
+    Declare that a view issues at most ``limit`` queries per request.
+
+    The count covers the whole request (session, user, view and template),
+    and only requests with one of ``methods`` are checked — writes usually
+    fan out to signals and are budgeted separately if at all. Views that
+    query every project shard add ``per_shard`` for each one configured.
+    """
+    def decorator(view_func):
+        # An attribute rather than a wrapper: functools.wraps copies it onto
+        # any decorator applied on top, and the middleware reads it back.
+        view_func.query_budget = (limit, frozenset(methods), per_shard)
+        return view_func
+    return decorator
+
+
+# ──────────────────────────────────────────────
+# Middleware
+# ──────────────────────────────────────────────
+
+class PerformanceMiddleware:
+    """
+    Measure each request and report it via Server-Timing and a log line.
+
+    Works under WSGI and ASGI. Keep it first in MIDDLEWARE so the total
+    covers every other middleware too.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        # Connections opened before this module was imported missed the signal.
+        for connection in connections.all(initialized_only=True):
+            _install_query_timer(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_budget = getattr(view_func, 'query_budget', None)
+
+    def _finish(self, request, response, metrics):
+        total = metrics.total_time
+        db_ms, tpl_ms, total_ms = metrics.db_time * 1000, metrics.template_time * 1000, total * 1000
+        app_ms = max(total_ms - db_ms - tpl_ms, 0)
+
+        if settings.SERVER_TIMING_HEADER:
+            response['Server-Timing'] = (
+                f'db;dur={db_ms:.1f};desc="{metrics.queries} queries", '
+                f'tpl;dur={tpl_ms:.1f};desc="templates", '
+                f'app;dur={app_ms:.1f};desc="python", '
+                f'total;dur={total_ms:.1f}'
+            )
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else ''
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'view': view,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            'db_ms': round(db_ms, 1),
+            'tpl_ms': round(tpl_ms, 1),
+            'total_ms': round(total_ms, 1),
+        }
+        logger.info(' '.join(f'{key}={value}' for key, value in fields.items()), extra={'performance': fields})
+
+        budget = getattr(request, '_query_budget', None)
+        limit = budget[0] + budget[2] * len(settings.PROJECT_SHARDS) if budget else None
+        if budget and request.method in budget[1] and metrics.queries > limit:
+            message = f'{view or request.path} ran {metrics.queries} queries; its budget is {limit}.'
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message, extra={'performance': fields})
+        return response
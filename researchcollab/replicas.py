@@ -0,0 +1,146 @@
+"""
+Read replicas with read-your-writes stickiness.
+
+``PrimaryReplicaRouter`` sends writes to ``default`` and, during a request,
+spreads reads across the ``replica*`` databases configured from
+DATABASE_REPLICA_URLS (see settings). Reads stay on the primary when:
+
+- the code is not running in a request (the task worker, management
+  commands, shells); those often read what they just wrote;
+- the request is not a safe method, or has already written something;
+- the primary has an open transaction, so reads see its uncommitted rows;
+- the client wrote within the last REPLICA_STICKY_SECONDS. For example, a
+  message posted a moment ago must still be there after the redirect,
+  whatever the replica lag.
+
+``ReplicaStickinessMiddleware`` tracks this state per request and marks
+writing clients with a short-lived cookie. A cookie rather than the
+session, because reading the session would itself need a database.
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+STICKY_COOKIE = 'rc_primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+_state = ContextVar('replica_routing', default=None)
+
+
+class RoutingState:
+    """Whether reads in the current request may use a replica."""
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+def replica_aliases():
+    """The configured replica aliases, in settings order."""
+    return [alias for alias in settings.DATABASES if alias.startswith('replica')]
+
+
+@contextmanager
+def use_primary():
+    """Read from the primary for the duration of the block, e.g. just after a write."""
+    state = _state.get()
+    if state is None:
+        # Outside a request everything reads from the primary anyway.
+        yield
+        return
+    pinned = state.pinned
+    state.pinned = True
+    try:
+        yield
+    finally:
+        state.pinned = pinned
+
+
+class PrimaryReplicaRouter:
+    """Writes to ``default``; reads to a random replica when it is safe to (see module docstring)."""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.pinned or state.wrote:
+            return DEFAULT_DB_ALIAS
+        replicas = replica_aliases()
+        if not replicas or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        aliases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema through replication.
+        if db in replica_aliases():
+            return False
+        return None
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Set up replica routing for each request and keep recent writers on the primary.
+
+    Place it before SessionMiddleware so the session is read from the right
+    database.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = self._start(request)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self._finish(state, response)
+
+    async def __acall__(self, request):
+        state = self._start(request)
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self._finish(state, response)
+
+    def _start(self, request):
+        try:
+            sticky_until = float(request.COOKIES.get(STICKY_COOKIE, 0))
+        except ValueError:
+            sticky_until = 0
+        return RoutingState(pinned=request.method not in SAFE_METHODS or sticky_until > time.time())
+
+    def _finish(self, state, response):
+        if state.wrote and replica_aliases():
+            window = settings.REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                STICKY_COOKIE, f'{time.time() + window:.3f}',
+                max_age=window, httponly=True, samesite='Lax',
+                secure=settings.SESSION_COOKIE_SECURE,
+            )
+        return response
@@ -33,6 +33,8 @@ urlpatterns = [
     path('projects/', include('apps.projects.urls')),
     path('documents/', include('apps.documents.urls')),
     path('communication/', include('apps.communication.urls')),
+    path('search/', include('apps.search.urls')),
+    path('api/v1/', include('apps.api.urls')),
 ]
 
 # Serve user-uploaded media files during development
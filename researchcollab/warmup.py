@@ -0,0 +1,151 @@
+"""
+Warm a freshly started process before it takes traffic.
+
+The first requests after a deploy otherwise pay for building the URL
+resolver's lookup tables, compiling templates, and connecting to the
+database and cache. gunicorn.conf.py runs ``warm_up(connect=False)`` in
+the master after the app is preloaded, so the results are shared with every
+forked worker. Each worker then runs ``open_connections()`` for itself,
+because connections cannot be shared across a fork. The master also
+checks that the workers' connection pools fit within each database
+server's connection limit (``check_connection_limits``).
+"""
+import logging
+import time
+from pathlib import Path
+
+from django.core.cache import caches
+from django.db import connections
+from django.template import TemplateSyntaxError, engines
+from django.urls import URLResolver, get_resolver
+
+logger = logging.getLogger('researchcollab.performance')
+
+
+def resolve_urls():
+    """Build the reverse/namespace tables of every resolver; return the number of patterns."""
+    def walk(resolver):
+        # Accessing reverse_dict populates the resolver's lookup tables.
+        resolver.reverse_dict
+        total = 0
+        for pattern in resolver.url_patterns:
+            total += walk(pattern) if isinstance(pattern, URLResolver) else 1
+        return total
+    return walk(get_resolver())
+
+
+def compile_templates():
+    """
+    Load every template the engines can find.
+
+    With the cached loader (the default when DEBUG is off) each compiled
+    template stays in memory for the life of the process. Returns
+    ``(compiled, failed)``.
+    """
+    compiled = failed = 0
+    for engine in engines.all():
+        seen = set()
+        for directory in engine.template_dirs:
+            root = Path(directory)
+            if not root.is_dir():
+                continue
+            for path in sorted(root.rglob('*')):
+                name = path.relative_to(root).as_posix()
+                if not path.is_file() or name in seen:
+                    continue
+                # Earlier directories shadow later ones, as in the loaders.
+                seen.add(name)
+                try:
+                    engine.get_template(name)
+                except (TemplateSyntaxError, UnicodeDecodeError) as exc:
+                    failed += 1
+                    logger.debug('warm-up could not compile %s: %s', name, exc)
+                else:
+                    compiled += 1
+    return compiled, failed
+
+
+def open_connections():
+    """
+    Connect to every configured database and cache; return the database aliases.
+
+    A pooled database opens its pool (``min_size`` connections); closing the
+    connection afterwards only hands it back to the pool.
+    """
+    opened = []
+    for connection in connections.all():
+        connection.ensure_connection()
+        connection.close()
+        opened.append(connection.alias)
+    for cache in caches.all():
+        cache.get('warmup')
+    return opened
+
+
+def pool_max_size(connection):
+    """The most connections one process's pool may hold for ``connection``, or None when unpooled."""
+    pool = connection.settings_dict.get('OPTIONS', {}).get('pool')
+    if connection.vendor != 'postgresql' or not pool:
+        return None
+    if pool is True:
+        pool = {}
+    # psycopg_pool's defaults: min_size 4, max_size equal to min_size.
+    return pool.get('max_size') or pool.get('min_size', 4)
+
+
+def check_connection_limits(processes):
+    """
+    Compare the connections ``processes`` pooled processes may open with
+    each PostgreSQL server's limit, and log the result.
+
+    Every process may hold its pool's max size for each database alias, and
+    aliases on the same server (shards, replicas) add up. The limit is
+    max_connections less the superuser reserve. Returns the servers that
+    could be exhausted as ``{"host:port": (needed, limit)}``.
+    """
+    needed, probes = {}, {}
+    for connection in connections.all():
+        max_size = pool_max_size(connection)
+        if max_size is None:
+            continue
+        server = f'{connection.settings_dict["HOST"] or "localhost"}:{connection.settings_dict["PORT"] or 5432}'
+        needed[server] = needed.get(server, 0) + processes * max_size
+        probes.setdefault(server, connection)
+
+    over = {}
+    for server, connection in probes.items():
+        try:
+            # A connection of its own: the pool must not open in this process.
+            raw = connection.Database.connect(**connection.get_connection_params())
+            try:
+                with raw.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT current_setting('max_connections')::int "
+                        "- current_setting('superuser_reserved_connections')::int"
+                    )
+                    limit = cursor.fetchone()[0]
+            finally:
+                raw.close()
+        except connection.Database.Error as exc:
+            logger.warning('connection check server=%s could not read the limit: %s', server, exc)
+            continue
+        if needed[server] > limit:
+            over[server] = (needed[server], limit)
+        logger.log(
+            logging.WARNING if needed[server] > limit else logging.INFO,
+            'connection check server=%s processes=%d pooled_max=%d limit=%d',
+            server, processes, needed[server], limit,
+        )
+    return over
+
+
+def warm_up(connect=True):
+    """Run every warm-up step and log what was done; ``connect=False`` skips connections."""
+    start = time.perf_counter()
+    patterns = resolve_urls()
+    compiled, failed = compile_templates()
+    databases = open_connections() if connect else []
+    logger.info(
+        'warm-up urls=%d templates=%d template_errors=%d databases=%s ms=%.1f',
+        patterns, compiled, failed, ','.join(databases) or '-', (time.perf_counter() - start) * 1000,
+    )
@@ -0,0 +1,43 @@
+#!/usr/bin/env bash
+# Render start script
+
+set -o errexit
+
+# Run "$@" until told to stop, restarting it whenever it exits. On SIGTERM
+# the command gets the signal too and is waited for, so the task worker
+# finishes its running tasks before the container goes away.
+supervise() {
+    local child
+    trap 'kill -TERM "$child" 2>/dev/null; wait "$child"; exit 0' TERM INT
+    while true; do
+        "$@" &
+        child=$!
+        wait "$child" || true
+        sleep 1
+    done
+}
+
+# Real-time relay: gunicorn runs several uvicorn workers, and a browser's
+# event stream only hears messages posted through another worker via this
+# relay (SocketBroker). It keeps no state.
+export REALTIME_BROKER_BACKEND="${REALTIME_BROKER_BACKEND:-apps.communication.realtime.SocketBroker}"
+supervise python manage.py runbroker &
+helpers=($!)
+
+# Background tasks (apps/tasks). Text extraction reads the uploaded files,
+# which live on this service's disk (STORAGES['documents']), so the worker
+# runs here rather than as a service of its own.
+supervise python manage.py runworker --concurrency 2 &
+helpers+=($!)
+
+# ASGI app on uvicorn workers; settings in gunicorn.conf.py
+gunicorn --config gunicorn.conf.py &
+server=$!
+
+trap 'kill -TERM "$server" "${helpers[@]}" 2>/dev/null' TERM INT
+status=0
+wait "$server" || status=$?
+# gunicorn exited (or a signal arrived): stop the helpers and wait for all.
+kill -TERM "$server" "${helpers[@]}" 2>/dev/null || true
+wait || true
+exit "$status"
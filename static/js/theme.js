@@ -0,0 +1,18 @@
+// Dark/light theme toggle, remembered in localStorage.
+(function(){
+    var html=document.documentElement;
+    var btn=document.getElementById('themeToggle');
+    var icon=document.getElementById('themeIcon');
+    var saved=localStorage.getItem('rc-theme');
+    function applyTheme(t){
+        html.setAttribute('data-bs-theme',t);
+        icon.className=t==='light'?'bi bi-sun-fill':'bi bi-moon-stars-fill';
+    }
+    applyTheme(saved==='light'?'light':'dark');
+    btn.addEventListener('click',function(){
+        var c=html.getAttribute('data-bs-theme');
+        var n=c==='dark'?'light':'dark';
+        localStorage.setItem('rc-theme',n);
+        applyTheme(n);
+    });
+})();